@@ -42,3 +42,64 @@ class ClientProfile(models.Model):
 
     def __str__(self):
         return f"ClientProfile for {self.user.get_username()}"
+
+
+class ClientDeletion(models.Model):
+    """
+    A client account being deleted in the background.
+
+    The owner's request only queues this row and deactivates the account;
+    ``process_client_deletions`` then removes the client's data in small
+    id-ordered chunks, recording progress here for the owner to see.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    # Cleared when the account itself is finally deleted.
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    client_name = models.CharField(max_length=150)
+    client_email = models.EmailField(blank=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="+",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+    )
+    stage = models.CharField(
+        max_length=40,
+        blank=True,
+        help_text="Data currently being removed.",
+    )
+    rows_deleted = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Deletion of {self.client_name} ({self.get_status_display()})"
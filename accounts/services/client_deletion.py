@@ -0,0 +1,217 @@
+"""
+Background deletion of client accounts.
+
+Deleting a long-term client in one transaction cascades through
+thousands of workout sets, messages and programme rows, holding locks
+the whole time. ``request_client_deletion`` only deactivates the account
+and queues a ClientDeletion. ``process_deletion`` (run by the
+``process_client_deletions`` command) then removes the client's rows in
+id-ordered chunks, children before parents, one short transaction per
+chunk. Every chunk is re-queried, so an interrupted job resumes where it
+stopped.
+"""
+
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from training.models import (
+    ArchivedRecord,
+    BodyMetricEntry,
+    ClientProgramme,
+    ConsultationRequest,
+    PersonalRecord,
+    ProgrammeBlock,
+    SupportMessage,
+    SupportTicket,
+    WeeklyClientSummary,
+    WorkoutSession,
+    WorkoutSet,
+    normalise_email,
+)
+
+from ..models import ClientDeletion
+
+# Rows removed per transaction.
+CHUNK_SIZE = 500
+
+# How long finished deletions stay listed for the owner.
+RECENT_DAYS = 7
+
+
+def request_client_deletion(client_user, requested_by):
+    """
+    Lock ``client_user`` out and queue their deletion (or requeue one
+    that failed). Returns the ClientDeletion.
+    """
+    with transaction.atomic():
+        job = ClientDeletion.objects.filter(
+            client=client_user, finished_at__isnull=True
+        ).first()
+        if job is None:
+            job = ClientDeletion.objects.create(
+                client=client_user,
+                client_name=(
+                    client_user.get_full_name() or client_user.username
+                ),
+                client_email=client_user.email,
+                requested_by=requested_by,
+            )
+        elif job.status == ClientDeletion.STATUS_FAILED:
+            job.status = ClientDeletion.STATUS_PENDING
+            job.save(update_fields=["status", "updated_at"])
+        if client_user.is_active:
+            client_user.is_active = False
+            client_user.save(update_fields=["is_active"])
+    return job
+
+
+def pending_deletions():
+    """Deletions still to run, oldest first (failed ones are retried)."""
+    return ClientDeletion.objects.filter(
+        finished_at__isnull=True
+    ).order_by("created_at")
+
+
+def recent_deletions(limit=10):
+    """Unfinished deletions and those finished in the last few days."""
+    since = timezone.now() - datetime.timedelta(days=RECENT_DAYS)
+    return ClientDeletion.objects.filter(
+        Q(finished_at__isnull=True) | Q(finished_at__gte=since)
+    )[:limit]
+
+
+def orphaned_copies():
+    """Tailored programme copies no client is assigned to any more."""
+    return ProgrammeBlock.objects.filter(
+        is_template=False,
+        parent_template__isnull=False,
+        assignments__isnull=True,
+    )
+
+
+def _archived(queryset):
+    """Archived copies (see training.services.archive) of these rows."""
+    return ArchivedRecord.objects.filter(
+        model=queryset.model._meta.label_lower,
+        object_id__in=queryset.values("pk"),
+    )
+
+
+def _stages(job):
+    """(stage, queryset) pairs for the job's client, children first."""
+    owned = {"client_id": job.client_id}
+    sessions = WorkoutSession.objects.filter(**owned)
+    messages = SupportMessage.objects.filter(ticket__client_id=job.client_id)
+    stages = [
+        (
+            "workout sets",
+            WorkoutSet.objects.filter(session__client_id=job.client_id),
+        ),
+        ("archived notes", _archived(sessions)),
+        ("workout sessions", sessions),
+        ("personal records", PersonalRecord.objects.filter(**owned)),
+        ("weekly summaries", WeeklyClientSummary.objects.filter(**owned)),
+        ("body metrics", BodyMetricEntry.objects.filter(**owned)),
+        ("archived messages", _archived(messages)),
+        ("support messages", messages),
+        ("support tickets", SupportTicket.objects.filter(**owned)),
+        ("programmes", ClientProgramme.objects.filter(**owned)),
+    ]
+    if job.client_email:
+        stages.append(
+            (
+                "consultations",
+                # The fingerprint narrows it down by index, but "+tag"
+                # addresses are other submissions: match the exact email.
+                ConsultationRequest.objects.filter(
+                    email_normalised=normalise_email(job.client_email),
+                    email__iexact=job.client_email.strip(),
+                ),
+            )
+        )
+    return stages
+
+
+def delete_chunk(queryset, size):
+    """
+    Delete the first ``size`` rows of ``queryset`` by id. Removing
+    programme assignments also removes the tailored copies they leave
+    unassigned. Returns the number of rows deleted, cascades included.
+    """
+    ids = list(queryset.order_by("pk").values_list("pk", flat=True)[:size])
+    if not ids:
+        return 0
+    model = queryset.model
+    block_ids = []
+    if model is ClientProgramme:
+        block_ids = list(
+            ClientProgramme.objects.filter(pk__in=ids).values_list(
+                "block_id", flat=True
+            )
+        )
+    deleted, _ = model.objects.filter(pk__in=ids).delete()
+    if block_ids:
+        deleted += orphaned_copies().filter(pk__in=block_ids).delete()[0]
+    return deleted
+
+
+def _record(job, **fields):
+    ClientDeletion.objects.filter(pk=job.pk).update(
+        updated_at=timezone.now(), **fields
+    )
+
+
+def process_deletion(job, chunk_size=CHUNK_SIZE):
+    """
+    Run ``job`` to the end, one transaction per chunk, recording the
+    stage and rows deleted as it goes. A database error marks the job
+    failed (it is retried on the next run). Returns True when done.
+    """
+    try:
+        if job.client_id is not None:
+            for stage, queryset in _stages(job):
+                while True:
+                    with transaction.atomic():
+                        deleted = delete_chunk(queryset, chunk_size)
+                        if deleted:
+                            _record(
+                                job,
+                                status=ClientDeletion.STATUS_RUNNING,
+                                stage=stage,
+                                rows_deleted=F("rows_deleted") + deleted,
+                            )
+                    if not deleted:
+                        break
+        with transaction.atomic():
+            # The profile, plus anything added since the job started,
+            # cascades from the account itself.
+            deleted, _ = get_user_model().objects.filter(
+                pk=job.client_id
+            ).delete()
+            _record(
+                job,
+                status=ClientDeletion.STATUS_DONE,
+                stage="",
+                error="",
+                rows_deleted=F("rows_deleted") + deleted,
+                finished_at=timezone.now(),
+            )
+    except DatabaseError as exc:
+        _record(job, status=ClientDeletion.STATUS_FAILED, error=str(exc))
+        return False
+    return True
+
+
+def sweep_orphaned_copies(chunk_size=CHUNK_SIZE):
+    """Delete every orphaned tailored copy, in chunks. Returns the count."""
+    total = 0
+    while True:
+        with transaction.atomic():
+            deleted = delete_chunk(orphaned_copies(), chunk_size)
+        if not deleted:
+            return total
+        total += deleted
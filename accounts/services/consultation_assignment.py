@@ -1,9 +1,13 @@
 """Service helpers for consultation assignment."""
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import PasswordResetForm
 from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.urls import reverse
+from django.utils import timezone
 
 from accounts.models import ClientProfile
 from training.models import ConsultationRequest
@@ -24,7 +28,10 @@ def _build_response(ok, redirect_name, redirect_kwargs, level, message):
 
 
 def _send_invite_email(request, user):
-    """Send a set-password invite email; return True on success."""
+    """
+    Send a set-password invite email; return True on success.
+    Without a request (management commands) links use SITE_DOMAIN.
+    """
     if not user or not user.email:
         return False
 
@@ -33,7 +40,10 @@ def _send_invite_email(request, user):
         if form.is_valid():
             form.save(
                 request=request,
-                use_https=request.is_secure(),
+                domain_override=None if request else settings.SITE_DOMAIN,
+                use_https=(
+                    request.is_secure() if request else not settings.DEBUG
+                ),
                 subject_template_name="emails/client_invite_subject.txt",
                 email_template_name="emails/client_invite.txt",
                 extra_email_context={"first_name": user.first_name or ""},
@@ -150,3 +160,158 @@ def assign_consultation_to_trainer(*, request, consultation, trainer_user):
         level="success",
         message="Client has been added to the trainer client list.",
     )
+
+
+def bulk_assign_consultations(*, request, consultation_ids, trainer_user):
+    """
+    Assign many consultations to one trainer in a fixed number of queries.
+
+    Users are resolved with one lookup, missing users and profiles are
+    created with bulk_create, consultations are saved with one
+    bulk_update, and invites go out once the transaction has committed.
+    Returns a summary dict of counts for the owner UI.
+    """
+    summary = {
+        "assigned": 0,
+        "users_created": 0,
+        "invites_sent": 0,
+        "invites_failed": 0,
+        "skipped_group": 0,
+        "skipped_taken": 0,
+        "skipped_conflict": 0,
+    }
+
+    consultations = list(
+        ConsultationRequest.objects.filter(id__in=consultation_ids)
+        .order_by("created_at", "id")
+    )
+
+    assignable = []
+    for consultation in consultations:
+        if consultation.coaching_option in ["small_group", "large_group"]:
+            summary["skipped_group"] += 1
+        elif (
+            consultation.assigned_trainer_id
+            and consultation.assigned_trainer_id != trainer_user.id
+            and not trainer_user.is_superuser
+        ):
+            summary["skipped_taken"] += 1
+        else:
+            assignable.append(consultation)
+
+    if not assignable:
+        return summary
+
+    invite_users = {}
+
+    with transaction.atomic():
+        # First consultation per email supplies the new user's name.
+        first_by_email = {}
+        for consultation in assignable:
+            email_val = (consultation.email or "").strip().lower()
+            if email_val:
+                first_by_email.setdefault(email_val, consultation)
+        emails = set(first_by_email)
+
+        # One lookup for both existing emails and usernames that would
+        # clash with the email-as-username convention.
+        users_by_email = {}
+        taken_usernames = set()
+        for user in User.objects.annotate(
+            email_lower=Lower("email")
+        ).filter(Q(email_lower__in=emails) | Q(username__in=emails)):
+            if user.email_lower in emails:
+                users_by_email.setdefault(user.email_lower, user)
+            taken_usernames.add(user.username)
+
+        new_users = []
+        for email_val in sorted(emails - set(users_by_email)):
+            if email_val in taken_usernames:
+                continue
+            first = first_by_email[email_val]
+            user = User(
+                username=email_val,
+                email=email_val,
+                first_name=first.first_name or "",
+                last_name=first.last_name or "",
+                is_active=True,
+            )
+            user.set_unusable_password()
+            new_users.append(user)
+
+        if new_users:
+            User.objects.bulk_create(new_users)
+            # Re-read so primary keys are available on every backend.
+            for user in User.objects.filter(
+                username__in=[u.username for u in new_users]
+            ):
+                users_by_email[user.email] = user
+                invite_users[user.pk] = user
+            summary["users_created"] = len(new_users)
+
+        profiles = {
+            p.user_id: p
+            for p in ClientProfile.objects.filter(
+                user__in=list(users_by_email.values())
+            )
+        }
+        new_profiles = []
+        changed_profiles = []
+        now = timezone.now()
+        assigned = []
+
+        for consultation in assignable:
+            email_val = (consultation.email or "").strip().lower()
+            user = users_by_email.get(email_val)
+            if email_val and user is None:
+                summary["skipped_conflict"] += 1
+                continue
+
+            if user:
+                profile = profiles.get(user.pk)
+                if profile is None:
+                    profile = ClientProfile(
+                        user=user,
+                        preferred_trainer=trainer_user,
+                        consultation_request=consultation,
+                    )
+                    profiles[user.pk] = profile
+                    new_profiles.append(profile)
+                elif profile.pk and (
+                    profile.preferred_trainer_id is None
+                    or profile.consultation_request_id is None
+                ):
+                    if profile.preferred_trainer_id is None:
+                        profile.preferred_trainer = trainer_user
+                    if profile.consultation_request_id is None:
+                        profile.consultation_request = consultation
+                    profile.updated_at = now
+                    changed_profiles.append(profile)
+                if not user.has_usable_password():
+                    invite_users[user.pk] = user
+
+            consultation.assigned_trainer = trainer_user
+            consultation.status = ConsultationRequest.STATUS_ASSIGNED
+            consultation.updated_at = now
+            assigned.append(consultation)
+
+        if new_profiles:
+            ClientProfile.objects.bulk_create(new_profiles)
+        if changed_profiles:
+            ClientProfile.objects.bulk_update(
+                changed_profiles,
+                ["preferred_trainer", "consultation_request", "updated_at"],
+            )
+        ConsultationRequest.objects.bulk_update(
+            assigned,
+            ["assigned_trainer", "status", "updated_at"],
+        )
+        summary["assigned"] = len(assigned)
+
+    for user in invite_users.values():
+        if _send_invite_email(request, user):
+            summary["invites_sent"] += 1
+        else:
+            summary["invites_failed"] += 1
+
+    return summary
@@ -0,0 +1,209 @@
+"""Automatic routing of new consultations to the least-loaded trainer."""
+
+import heapq
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+
+from training.models import ConsultationRequest, SupportTicket
+
+from .consultation_assignment import bulk_assign_consultations
+
+User = get_user_model()
+
+# Only 1:1 and online requests go to a trainer's client list; group
+# requests are handled through Current Classes instead.
+ROUTABLE_OPTIONS = ["1to1", "online"]
+
+# Weights for the trainer score (lower score = better candidate).
+PROGRAMME_WEIGHT = 1.0
+TICKET_WEIGHT = 0.5
+OPTION_FIT_BONUS = 1.0
+WINDOW_FIT_BONUS = 0.5
+
+
+def available_trainers():
+    """Active, non-owner staff annotated with their current load."""
+    return (
+        User.objects.filter(
+            is_active=True,
+            is_staff=True,
+            is_superuser=False,
+        )
+        .annotate(
+            active_programmes=Count(
+                "trainer_programmes",
+                filter=Q(trainer_programmes__status="active"),
+                distinct=True,
+            ),
+            open_tickets=Count(
+                "assigned_tickets",
+                filter=Q(
+                    assigned_tickets__status__in=[
+                        SupportTicket.STATUS_OPEN,
+                        SupportTicket.STATUS_WAITING,
+                    ]
+                ),
+                distinct=True,
+            ),
+        )
+        .order_by("id")
+    )
+
+
+def _fit_history(trainer_ids):
+    """
+    Map trainer id -> set of coaching options and time windows they
+    already look after, built from one grouped query.
+    """
+    options = defaultdict(set)
+    windows = defaultdict(set)
+    rows = (
+        ConsultationRequest.objects.filter(
+            assigned_trainer_id__in=trainer_ids,
+            status=ConsultationRequest.STATUS_ASSIGNED,
+        )
+        .values(
+            "assigned_trainer_id",
+            "coaching_option",
+            "preferred_time_window",
+        )
+        .annotate(n=Count("id"))
+    )
+    for row in rows:
+        trainer_id = row["assigned_trainer_id"]
+        if row["coaching_option"]:
+            options[trainer_id].add(row["coaching_option"])
+        if row["preferred_time_window"]:
+            windows[trainer_id].add(row["preferred_time_window"])
+    return options, windows
+
+
+def trainer_loads(trainers):
+    """Weighted load per trainer id from the annotated queryset."""
+    return {
+        t.id: (
+            PROGRAMME_WEIGHT * t.active_programmes
+            + TICKET_WEIGHT * t.open_tickets
+        )
+        for t in trainers
+    }
+
+
+def plan_routes(consultations, trainers, load=None):
+    """
+    Return a list of (consultation, trainer) pairs.
+
+    Consultations are grouped by (coaching option, time window) so every
+    trainer's fit bonus is constant inside a group. Each group then pops
+    the cheapest trainer from a heap and pushes them back with their new
+    load, keeping a batch of n requests at O(n log t).
+
+    ``load`` (trainer id -> score) is updated in place so callers can
+    carry it across batches.
+    """
+    trainers = list(trainers)
+    if not trainers:
+        return []
+
+    if load is None:
+        load = trainer_loads(trainers)
+    by_id = {t.id: t for t in trainers}
+    options, windows = _fit_history(list(by_id))
+
+    groups = defaultdict(list)
+    for consultation in consultations:
+        key = (
+            consultation.coaching_option,
+            consultation.preferred_time_window,
+        )
+        groups[key].append(consultation)
+
+    plan = []
+    for (option, window), group in groups.items():
+        bonus = {}
+        for trainer_id in by_id:
+            value = 0.0
+            if option and option in options[trainer_id]:
+                value += OPTION_FIT_BONUS
+            if window and window in windows[trainer_id]:
+                value += WINDOW_FIT_BONUS
+            bonus[trainer_id] = value
+
+        heap = [
+            (load[trainer_id] - bonus[trainer_id], trainer_id)
+            for trainer_id in by_id
+        ]
+        heapq.heapify(heap)
+
+        for consultation in group:
+            _, trainer_id = heapq.heappop(heap)
+            plan.append((consultation, by_id[trainer_id]))
+            load[trainer_id] += PROGRAMME_WEIGHT
+            heapq.heappush(
+                heap,
+                (load[trainer_id] - bonus[trainer_id], trainer_id),
+            )
+
+    return plan
+
+
+def route_new_consultations(*, request=None, batch_size=100, limit=None,
+                            dry_run=False):
+    """
+    Assign unassigned NEW consultations (oldest first) in batches.
+
+    Returns a summary dict with counts and the planned pairs.
+    """
+    pending_ids = list(
+        ConsultationRequest.objects.filter(
+            status=ConsultationRequest.STATUS_NEW,
+            assigned_trainer__isnull=True,
+            coaching_option__in=ROUTABLE_OPTIONS,
+        )
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)
+    )
+    if limit:
+        pending_ids = pending_ids[:limit]
+
+    summary = {"routed": 0, "failed": 0, "pairs": []}
+    if not pending_ids:
+        return summary
+
+    trainers = list(available_trainers())
+    if not trainers:
+        return summary
+    load = trainer_loads(trainers)
+
+    for start in range(0, len(pending_ids), batch_size):
+        batch_ids = pending_ids[start:start + batch_size]
+        batch = list(
+            ConsultationRequest.objects.filter(id__in=batch_ids)
+            .order_by("created_at", "id")
+        )
+        plan = plan_routes(batch, trainers, load)
+
+        ids_by_trainer = defaultdict(list)
+        trainers_by_id = {}
+        for consultation, trainer in plan:
+            summary["pairs"].append((consultation.id, trainer.id))
+            ids_by_trainer[trainer.id].append(consultation.id)
+            trainers_by_id[trainer.id] = trainer
+
+        if dry_run:
+            continue
+
+        # One bulk assignment per trainer keeps each batch to a fixed
+        # number of queries.
+        for trainer_id, ids in ids_by_trainer.items():
+            result = bulk_assign_consultations(
+                request=request,
+                consultation_ids=ids,
+                trainer_user=trainers_by_id[trainer_id],
+            )
+            summary["routed"] += result["assigned"]
+            summary["failed"] += len(ids) - result["assigned"]
+
+    return summary
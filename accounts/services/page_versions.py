@@ -0,0 +1,201 @@
+"""
+Conditional GET for authenticated pages.
+
+Each page depends on a few data areas (``DATA_SCOPES``). Any INSERT,
+UPDATE or DELETE on one of an area's tables bumps the area's version
+counter once the transaction commits. That includes the bulk_create,
+bulk_update and QuerySet.update() writes that send no model signals. A
+page's ETag digests the counters it depends on, so answering a repeat
+visit with 304 Not Modified costs one cache read and no queries. Each
+user also has a scope of their own, bumped when the user row is saved
+(accounts.signals), for the names and roles in the dashboard shell.
+
+The counters must be seen by every worker, so pages only get ETags with
+a shared cache (SHARED_CACHE). With a per-process cache, a write handled
+by one worker would leave the others answering 304 for stale pages.
+"""
+
+import functools
+import hashlib
+import re
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+# Data area -> models whose rows pages in that area show.
+DATA_SCOPES = {
+    "clients": (
+        settings.AUTH_USER_MODEL,
+        "accounts.ClientProfile",
+        "accounts.ClientDeletion",
+        "training.ClientProgramme",
+    ),
+    "programmes": (
+        "training.ProgrammeBlock",
+        "training.ProgrammeDay",
+        "training.ProgrammeExercise",
+        "training.ProgrammeExerciseOverride",
+        "training.ClientProgramme",
+    ),
+    "training_log": (
+        "training.WorkoutSession",
+        "training.WorkoutSet",
+        "training.PersonalRecord",
+        "training.WeeklyClientSummary",
+        "training.BodyMetricEntry",
+    ),
+    "support": (
+        "training.SupportTicket",
+        "training.SupportMessage",
+    ),
+    "leads": (
+        "training.ConsultationRequest",
+        "training.ContactQuery",
+    ),
+    "analytics": (
+        "training.DailyLeadStat",
+        "training.DailyTrainerStat",
+        "training.DailySupportStat",
+        "training.DailyTrainerSupportStat",
+    ),
+}
+
+_WRITE_SQL = re.compile(
+    r"\s*(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+[\"`]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def _version_key(scope):
+    return f"versions:v:{scope}"
+
+
+def get_version(scope):
+    """Current version number for a scope, starting at 1."""
+    key = _version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        # add() so two workers starting together agree on the same value.
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def get_versions(scopes):
+    """get_version() for several scopes in one cache round trip."""
+    keys = {scope: _version_key(scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    return [
+        found.get(key) or get_version(scope) for scope, key in keys.items()
+    ]
+
+
+def bump_version(scope):
+    """Change the ETag of every page that depends on ``scope``."""
+    key = _version_key(scope)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 2, timeout=None)
+
+
+def user_scope(user_id):
+    return f"user:{user_id}"
+
+
+def data_scope(area):
+    return f"data:{area}"
+
+
+@functools.cache
+def _table_scopes():
+    """{db table: data scopes}, built once the app registry is ready."""
+    tables = {}
+    for area, labels in DATA_SCOPES.items():
+        for label in labels:
+            table = apps.get_model(label)._meta.db_table
+            tables.setdefault(table, set()).add(data_scope(area))
+    return tables
+
+
+def track_writes(execute, sql, params, many, context):
+    """
+    Database execute wrapper: after a write to a tracked table, bump its
+    scopes when the transaction commits (straight away in autocommit).
+    """
+    result = execute(sql, params, many, context)
+    match = _WRITE_SQL.match(sql)
+    scopes = match and _table_scopes().get(match.group(1))
+    if scopes:
+        transaction.on_commit(
+            functools.partial(_bump_all, scopes),
+            using=context["connection"].alias,
+        )
+    return result
+
+
+def _bump_all(scopes):
+    for scope in scopes:
+        bump_version(scope)
+
+
+def page_etag(request, areas):
+    """
+    ETag for the page at this URL as ``request.user`` sees it today, or
+    None when the page must be rendered: no shared cache, anonymous
+    visitors, and flash messages waiting to be shown.
+    """
+    if not settings.SHARED_CACHE:
+        return None
+    user = request.user
+    # len() reads the messages without marking them as shown.
+    if not user.is_authenticated or len(messages.get_messages(request)):
+        return None
+    versions = get_versions(
+        [user_scope(user.pk), *(data_scope(area) for area in areas)]
+    )
+    parts = [
+        settings.CACHE_RELEASE,
+        str(user.pk),
+        request.get_full_path(),
+        timezone.localdate().isoformat(),
+        *(str(version) for version in versions),
+    ]
+    return hashlib.md5(
+        ":".join(parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+
+
+def conditional_page(*areas):
+    """
+    View decorator: answer a GET whose If-None-Match still matches with
+    304 Not Modified before the view runs. Apply it below the login
+    decorators so only allowed users get an ETag. Responses are marked
+    private and must be revalidated, so browsers never show a stale copy.
+    """
+
+    def etag_func(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return None
+        return page_etag(request, areas)
+
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_func)(view_func)
+
+        @functools.wraps(view_func)
+        def wrapped(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapped
+
+    return decorator
@@ -0,0 +1,229 @@
+"""
+Shared loading and assignment for the trainer and owner programme-detail
+pages.
+"""
+
+import datetime
+
+from django.db.models import Prefetch, Q
+from django.forms import modelformset_factory
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from training.forms import TailoredExerciseFormSet
+from training.models import (
+    ClientProgramme,
+    ProgrammeDay,
+    ProgrammeExercise,
+)
+from training.services.tailored_programmes import (
+    apply_overrides,
+    create_tailored_block,
+    override_map,
+)
+
+ExerciseFormSet = modelformset_factory(
+    ProgrammeExercise,
+    fields=("target_sets", "target_reps", "target_weight_kg"),
+    formset=TailoredExerciseFormSet,
+    extra=0,
+)
+
+# The tailored-block editors can rename exercises too.
+TailoredBlockFormSet = modelformset_factory(
+    ProgrammeExercise,
+    fields=(
+        "exercise_name",
+        "target_sets",
+        "target_reps",
+        "target_weight_kg",
+    ),
+    formset=TailoredExerciseFormSet,
+    extra=0,
+)
+
+ASSIGN_EXISTING = "existing"
+ASSIGN_CONVERTED = "converted"
+ASSIGN_CREATED = "created"
+
+
+class ProgrammeDetail:
+    """
+    A programme block as the detail pages show it: the template's days and
+    exercises, every assignment of the template and, once one is selected,
+    the tailored copy's days and the selected day's exercises.
+
+    Each part is one query however many days, exercises or clients the
+    programme has; role rules (whose assignments, who may assign) stay in
+    the views.
+    """
+
+    def __init__(self, block):
+        # ``block`` should come with parent_template selected.
+        self.block = block
+        self.template_block = block.parent_template or block
+        self.template_days = list(
+            ProgrammeDay.objects.filter(block=self.template_block)
+            .order_by("order")
+            .prefetch_related(
+                Prefetch(
+                    "exercises",
+                    queryset=ProgrammeExercise.objects.order_by("order"),
+                )
+            )
+        )
+        self.assignments = list(
+            ClientProgramme.objects.filter(
+                Q(block__parent_template=self.template_block)
+                | Q(block=self.template_block)
+            ).select_related("client", "block", "block__parent_template")
+        )
+        self.assignment = None
+        self.tailored_days = []
+        self.selected_day = None
+        self.overrides = {}
+
+    def assignments_for(self, trainer_id=None):
+        """Assignments, optionally only those run by ``trainer_id``."""
+        if trainer_id is None:
+            return list(self.assignments)
+        return [a for a in self.assignments if a.trainer_id == trainer_id]
+
+    @staticmethod
+    def find(assignments, assignment_id):
+        return next((a for a in assignments if a.id == assignment_id), None)
+
+    @staticmethod
+    def latest(assignments):
+        """The most recently started assignment, newest id on ties."""
+        return max(
+            assignments,
+            key=lambda a: (
+                a.start_date is not None,
+                a.start_date or datetime.date.min,
+                a.id,
+            ),
+            default=None,
+        )
+
+    @staticmethod
+    def by_client(assignments):
+        return sorted(assignments, key=lambda a: a.client.username)
+
+    def select(self, assignment, day_param=None):
+        """
+        Load the tailored tree for ``assignment`` and pick the day from
+        ``day_param`` (first day when missing or unknown).
+        """
+        self.assignment = assignment
+        if assignment is None:
+            return
+        tailored_block = assignment.block
+        if tailored_block.content_block_id == self.template_block.id:
+            # Copy-on-write copies (and legacy template assignments) use
+            # the template's days, already loaded.
+            self.tailored_days = self.template_days
+        else:
+            self.tailored_days = list(
+                tailored_block.programme_days().order_by("order")
+            )
+        if tailored_block.copy_on_write:
+            self.overrides = override_map([tailored_block.id])
+
+        if day_param and day_param.isdigit():
+            self.selected_day = next(
+                (d for d in self.tailored_days if d.id == int(day_param)),
+                None,
+            )
+        if self.selected_day is None and self.tailored_days:
+            self.selected_day = self.tailored_days[0]
+
+    @cached_property
+    def exercises_qs(self):
+        if self.selected_day is None:
+            return ProgrammeExercise.objects.none()
+        return (
+            ProgrammeExercise.objects.filter(day=self.selected_day)
+            .select_related("day")
+            .order_by("order")
+        )
+
+    @cached_property
+    def exercises(self):
+        """Selected day's exercises with the client's overrides applied."""
+        # Evaluates exercises_qs, so the formset reuses the same rows.
+        exercises = list(self.exercises_qs)
+        if self.assignment:
+            apply_overrides(self.assignment.block, exercises, self.overrides)
+        return exercises
+
+    def exercise_formset(self, data=None):
+        return ExerciseFormSet(
+            data,
+            queryset=self.exercises_qs,
+            prefix="ex",
+            block=self.assignment.block if self.assignment else None,
+            overrides=self.overrides,
+        )
+
+    def preview_days(self):
+        """Template days for the preview, narrowed to the selected day."""
+        days = self.template_days
+        if self.selected_day:
+            days = [d for d in days if d.order == self.selected_day.order]
+        return [
+            {"day": day, "exercises": list(day.exercises.all())}
+            for day in days
+        ]
+
+
+def tailor_assignment(assignment, template_block, staff_user, trainer=None):
+    """
+    Move an assignment of ``template_block`` itself onto a new tailored
+    copy made by ``staff_user`` (optionally handing it to ``trainer``)
+    and make it active.
+    """
+    assignment.block = create_tailored_block(
+        template_block, staff_user, assignment.client
+    )
+    if trainer is not None:
+        assignment.trainer = trainer
+    assignment.status = "active"
+    if not assignment.start_date:
+        assignment.start_date = timezone.now().date()
+    assignment.save()
+    return assignment
+
+
+def assign_template(template_block, staff_user, client_user):
+    """
+    Give ``client_user`` a tailored copy of ``template_block`` run by
+    ``staff_user``. Returns (assignment, outcome): ASSIGN_EXISTING when
+    they already have a copy, ASSIGN_CONVERTED when their assignment of
+    the template itself was moved onto a new copy, else ASSIGN_CREATED.
+    """
+    existing = ClientProgramme.objects.filter(
+        client=client_user,
+        block__parent_template=template_block,
+    ).select_related("block").first()
+    if existing:
+        return existing, ASSIGN_EXISTING
+
+    legacy = ClientProgramme.objects.filter(
+        client=client_user,
+        block=template_block,
+    ).select_related("block").first()
+    if legacy:
+        tailor_assignment(
+            legacy, template_block, staff_user, trainer=staff_user
+        )
+        return legacy, ASSIGN_CONVERTED
+
+    assignment = ClientProgramme.objects.create(
+        client=client_user,
+        block=create_tailored_block(template_block, staff_user, client_user),
+        trainer=staff_user,
+        status="active",
+        start_date=timezone.now().date(),
+    )
+    return assignment, ASSIGN_CREATED
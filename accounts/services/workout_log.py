@@ -0,0 +1,642 @@
+"""Service helpers for client workout logging (page form and JSON API)."""
+
+import uuid
+from decimal import Decimal, InvalidOperation
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from training.forms import WorkoutSessionForm
+from training.models import (
+    ClientProgramme,
+    ProgrammeDay,
+    WorkoutSession,
+    WorkoutSet,
+)
+from training.services.archive import with_archived_text
+from training.services.exercise_catalogue import link_catalogue
+from training.services.personal_records import rebuild_records, record_sets
+from training.services.tailored_programmes import (
+    apply_overrides,
+    override_map,
+)
+from training.services.weekly_summaries import schedule_week_refresh
+
+# Upper bounds for one exercise in a batched sets payload.
+MAX_SETS_PER_EXERCISE = 20
+MAX_REPS = 500
+MAX_WEIGHT_KG = Decimal("9999.99")
+
+# Notes always show at least this many set columns ("8 | 8 | -").
+NOTES_SET_COLUMNS = 3
+
+# Weeks offered when a session is not tied to a programme block.
+DEFAULT_MAX_WEEKS = 6
+
+# Most queued sessions accepted in one sync request.
+MAX_SYNC_BATCH = 50
+
+SYNC_CREATED = "created"
+SYNC_DUPLICATE = "duplicate"
+SYNC_CONFLICT = "conflict"
+SYNC_INVALID = "invalid"
+
+
+class WorkoutLogError(Exception):
+    """
+    A session payload could not be saved.
+
+    ``errors`` maps field names to messages; ``status`` is the HTTP status
+    the API should answer with; ``session`` is the clashing session for
+    week/day conflicts.
+    """
+
+    def __init__(self, errors, status=400, session=None):
+        super().__init__(errors)
+        self.errors = errors
+        self.status = status
+        self.session = session
+
+
+def _parse_weight(raw):
+    if raw in (None, ""):
+        return None
+    try:
+        weight = Decimal(str(raw).strip())
+    except InvalidOperation:
+        raise ValueError("Weight must be a number.")
+    if not weight.is_finite() or weight < 0 or weight > MAX_WEIGHT_KG:
+        raise ValueError("Weight is out of range.")
+    return weight
+
+
+def _parse_reps(raw):
+    if raw in (None, ""):
+        return None
+    if isinstance(raw, bool):
+        raise ValueError("Reps must be whole numbers.")
+    try:
+        reps = int(raw)
+    except (TypeError, ValueError):
+        raise ValueError("Reps must be whole numbers.")
+    if reps < 0 or reps > MAX_REPS:
+        raise ValueError("Reps are out of range.")
+    return reps
+
+
+def clean_entries(raw_entries, exercises):
+    """
+    Validate a batched sets payload against the day's exercises.
+
+    ``raw_entries`` is a list of
+    ``{"exercise_id": 5, "weight_kg": "60", "reps": [8, 8, 7]}``.
+    Returns {exercise_id: {"weight": Decimal|None, "reps": [int|None]}}
+    or raises WorkoutLogError.
+    """
+    if raw_entries in (None, ""):
+        return {}
+    if not isinstance(raw_entries, list):
+        raise WorkoutLogError({"sets": "Sets must be a list."})
+
+    by_id = {ex.id: ex for ex in exercises}
+    entries = {}
+    for raw in raw_entries:
+        if not isinstance(raw, dict):
+            raise WorkoutLogError({"sets": "Each entry must be an object."})
+        try:
+            exercise_id = int(raw.get("exercise_id"))
+        except (TypeError, ValueError):
+            exercise_id = None
+        if exercise_id not in by_id:
+            raise WorkoutLogError(
+                {"sets": "Exercise is not part of this session."}
+            )
+
+        reps_raw = raw.get("reps") or []
+        if not isinstance(reps_raw, list):
+            reps_raw = [reps_raw]
+        if len(reps_raw) > MAX_SETS_PER_EXERCISE:
+            raise WorkoutLogError(
+                {"sets": f"{by_id[exercise_id].exercise_name}: too many sets."}
+            )
+        try:
+            entries[exercise_id] = {
+                "weight": _parse_weight(raw.get("weight_kg")),
+                "reps": [_parse_reps(value) for value in reps_raw],
+            }
+        except ValueError as exc:
+            raise WorkoutLogError(
+                {"sets": f"{by_id[exercise_id].exercise_name}: {exc}"}
+            )
+    return entries
+
+
+def entries_from_post(data, exercises):
+    """
+    Read the page form's per-exercise inputs (ex_<id>_set1..3 and
+    ex_<id>_weight). Unparseable values are shown as "-" in the notes and
+    not stored as sets, as before.
+    """
+    entries = {}
+    for ex in exercises:
+        reps = []
+        for n in range(1, NOTES_SET_COLUMNS + 1):
+            try:
+                reps.append(_parse_reps(data.get(f"ex_{ex.id}_set{n}")))
+            except ValueError:
+                reps.append(None)
+        try:
+            weight = _parse_weight(data.get(f"ex_{ex.id}_weight"))
+        except ValueError:
+            weight = None
+        entries[ex.id] = {"weight": weight, "reps": reps}
+    return entries
+
+
+def build_session_notes(base_notes, exercises, entries):
+    """
+    Session notes in the format trainers read: the client's notes plus a
+    "Session details:" line per exercise.
+    """
+    base_notes = (base_notes or "").strip()
+    detail_lines = []
+    if exercises:
+        detail_lines.append("Session details:")
+
+    for ex in exercises:
+        entry = entries.get(ex.id) or {}
+        reps = list(entry.get("reps") or [])
+        reps += [None] * (NOTES_SET_COLUMNS - len(reps))
+        weight = entry.get("weight")
+
+        target_weight = ex.target_weight_kg or "-"
+        header = (
+            f"{ex.exercise_name} "
+            f"({ex.target_sets} x {ex.target_reps} "
+            f"@ {target_weight})"
+        )
+        results = " | ".join("-" if r is None else str(r) for r in reps)
+        weight_val = "-" if weight is None else weight
+        detail_lines.append(f"{header}: {results} (weight: {weight_val})")
+
+    compiled_details = "\n".join(detail_lines).strip()
+    if base_notes and compiled_details:
+        return f"{base_notes}\n\n{compiled_details}"
+    return compiled_details or base_notes
+
+
+def _client_notes(notes):
+    """The client's own part of notes made by build_session_notes."""
+    notes = notes or ""
+    if notes.startswith("Session details:"):
+        return ""
+    return notes.split("\n\nSession details:", 1)[0]
+
+
+def _session_details(notes):
+    """The "Session details:" part of notes made by build_session_notes."""
+    notes = notes or ""
+    if notes.startswith("Session details:"):
+        return notes
+    _, found, details = notes.partition("\n\nSession details:")
+    return f"Session details:{details}" if found else ""
+
+
+def _build_sets(session, exercises, entries):
+    rows = []
+    for ex in exercises:
+        entry = entries.get(ex.id) or {}
+        for set_number, reps in enumerate(entry.get("reps") or [], start=1):
+            if reps is None:
+                continue
+            rows.append(
+                WorkoutSet(
+                    session=session,
+                    exercise_name=ex.exercise_name,
+                    exercise_id=ex.exercise_id,
+                    set_number=set_number,
+                    reps=reps,
+                    weight_kg=entry.get("weight"),
+                )
+            )
+    return rows
+
+
+def parse_key(raw):
+    """Client idempotency key as a UUID, or None when missing/invalid."""
+    try:
+        return uuid.UUID(str(raw))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def resolve_day(user, day_id):
+    """
+    Return (programme_day, client_programme, exercises) for a day in one
+    of the user's active programmes. Raises WorkoutLogError otherwise.
+    """
+    days = resolve_days(user, [day_id])
+    if day_id not in days:
+        raise WorkoutLogError({"day": "Unknown programme day."})
+    return days[day_id]
+
+
+def resolve_days(user, day_ids):
+    """
+    Batch form of resolve_day: {day_id: (day, client_programme,
+    exercises)} for the days found in the user's active programmes.
+    """
+    day_ids = {day_id for day_id in day_ids if day_id}
+    if not day_ids:
+        return {}
+
+    programmes = {}
+    for assignment in (
+        ClientProgramme.objects.filter(
+            Q(block__days__id__in=day_ids)
+            | Q(
+                block__copy_on_write=True,
+                block__parent_template__days__id__in=day_ids,
+            ),
+            client=user,
+            status="active",
+        )
+        .select_related("block")
+        .order_by("start_date", "block__name")
+    ):
+        # First match wins, like the workout log page. Copy-on-write
+        # blocks log against their template's days.
+        programmes.setdefault(assignment.block.content_block_id, assignment)
+
+    days = list(
+        ProgrammeDay.objects.filter(
+            id__in=day_ids,
+            block_id__in=list(programmes),
+        ).prefetch_related("exercises")
+    )
+    overrides = override_map(
+        [programmes[day.block_id].block_id for day in days]
+    )
+    resolved = {}
+    for day in days:
+        client_programme = programmes[day.block_id]
+        exercises = apply_overrides(
+            client_programme.block,
+            sorted(day.exercises.all(), key=lambda ex: ex.order),
+            overrides,
+        )
+        resolved[day.id] = (day, client_programme, exercises)
+    return resolved
+
+
+def prepare_session(data, *, programme_day=None, client_programme=None,
+                    exercises=()):
+    """
+    Validate a session payload. Returns (form, week, entries) or raises
+    WorkoutLogError with field errors.
+    """
+    week = 1
+    week_raw = str(data.get("week") or "1")
+    if week_raw.isdigit():
+        week = int(week_raw)
+    max_weeks = (
+        client_programme.block.weeks
+        if client_programme
+        else DEFAULT_MAX_WEEKS
+    )
+    week = min(max(week, 1), max_weeks)
+
+    form = WorkoutSessionForm(
+        {
+            "date": data.get("date") or "",
+            "name": programme_day.name if programme_day else (
+                data.get("name") or ""
+            ),
+            "notes": data.get("notes") or "",
+        }
+    )
+    if not form.is_valid():
+        raise WorkoutLogError(
+            {field: errs[0] for field, errs in form.errors.items()}
+        )
+    return form, week, clean_entries(data.get("sets"), exercises)
+
+
+def count_sets(entries):
+    return sum(
+        len([reps for reps in entry["reps"] if reps is not None])
+        for entry in entries.values()
+    )
+
+
+def _conflict(session, week, programme_day):
+    logged = (
+        f"Week {week}/{programme_day.name}"
+        if programme_day
+        else "this session"
+    )
+    return WorkoutLogError(
+        {
+            "__all__": (
+                f"This session log already exist for {logged}. "
+                "Please edit session below if needed."
+            )
+        },
+        status=409,
+        session=session,
+    )
+
+
+def _new_session(*, user, form, programme_day, client_programme, week,
+                 exercises, entries, idempotency_key=None):
+    """Unsaved WorkoutSession built from a valid WorkoutSessionForm."""
+    session = form.save(commit=False)
+    if not session.date:
+        session.date = timezone.localdate()
+    session.client = user
+    session.client_programme = client_programme
+    session.programme_day = programme_day
+    session.week_number = week
+    if programme_day:
+        session.name = f"Week {week} - {programme_day.name}"
+    session.notes = build_session_notes(
+        form.cleaned_data.get("notes"),
+        exercises,
+        entries,
+    )
+    session.idempotency_key = idempotency_key
+    return session
+
+
+def log_session(*, user, form, programme_day, client_programme, week,
+                exercises, entries, idempotency_key=None):
+    """
+    Create a WorkoutSession and its WorkoutSet rows in one transaction.
+
+    ``form`` is a valid WorkoutSessionForm. Raises WorkoutLogError
+    (status 409) when the week/day has already been logged. A retry
+    whose ``idempotency_key`` was stored meanwhile gets that session.
+    """
+    with transaction.atomic():
+        if programme_day and client_programme:
+            existing = WorkoutSession.objects.filter(
+                client=user,
+                client_programme=client_programme,
+                programme_day=programme_day,
+                week_number=week,
+            ).first()
+            if existing:
+                raise _conflict(existing, week, programme_day)
+
+        session = _new_session(
+            user=user,
+            form=form,
+            programme_day=programme_day,
+            client_programme=client_programme,
+            week=week,
+            exercises=exercises,
+            entries=entries,
+            idempotency_key=idempotency_key,
+        )
+        try:
+            with transaction.atomic():
+                session.save()
+        except IntegrityError:
+            # A retry of this request, or another request for the same
+            # week/day, was stored first.
+            if idempotency_key:
+                stored = WorkoutSession.objects.filter(
+                    client=user, idempotency_key=idempotency_key
+                ).first()
+                if stored:
+                    return stored
+            existing = WorkoutSession.objects.filter(
+                client_programme=client_programme,
+                programme_day=programme_day,
+                week_number=week,
+            ).first()
+            raise _conflict(existing, week, programme_day)
+
+        sets = WorkoutSet.objects.bulk_create(
+            link_catalogue(_build_sets(session, exercises, entries))
+        )
+        record_sets(user.id, sets)
+    return session
+
+
+def sync_sessions(user, items):
+    """
+    Store a batch of sessions queued offline by the client app.
+
+    Each item is a create payload plus a client-generated "key" and the
+    "user" id of the account that queued it; items queued by another
+    account on a shared device are invalid. Returns one result per item,
+    in order:
+
+    - created: stored now
+    - duplicate: this key was stored by an earlier (retried) sync
+    - conflict: the week/day is already logged; the existing row wins
+    - invalid: the payload can never be stored (errors included)
+
+    Lookups are batched and all inserts happen in one transaction, so a
+    failed batch stores nothing and can simply be retried.
+    """
+    keyed = [(parse_key(item.get("key")), item) for item in items]
+    existing_by_key = {
+        session.idempotency_key: session
+        for session in WorkoutSession.objects.filter(
+            client=user,
+            idempotency_key__in=[key for key, _ in keyed if key],
+        )
+    }
+
+    day_ids = set()
+    for _, item in keyed:
+        day_raw = str(item.get("day") or "")
+        if day_raw.isdigit():
+            day_ids.add(int(day_raw))
+    days = resolve_days(user, day_ids)
+    logged = {
+        (
+            session.client_programme_id,
+            session.programme_day_id,
+            session.week_number,
+        ): session
+        for session in WorkoutSession.objects.filter(
+            client_programme__in=[cp for _, cp, _ in days.values()],
+            programme_day_id__in=list(days),
+        )
+    }
+
+    results = []
+    pending = []
+    for key, item in keyed:
+        result = {"key": item.get("key")}
+        results.append(result)
+
+        if key is None:
+            result.update(status=SYNC_INVALID, errors={"key": "Missing key."})
+            continue
+        if str(item.get("user")) != str(user.pk):
+            result.update(
+                status=SYNC_INVALID,
+                errors={"user": "Queued by another account."},
+            )
+            continue
+        if key in existing_by_key:
+            result.update(
+                status=SYNC_DUPLICATE,
+                session=session_row(existing_by_key[key]),
+            )
+            continue
+
+        programme_day = client_programme = None
+        exercises = []
+        day_raw = str(item.get("day") or "")
+        if day_raw:
+            if not day_raw.isdigit() or int(day_raw) not in days:
+                result.update(
+                    status=SYNC_INVALID,
+                    errors={"day": "Unknown programme day."},
+                )
+                continue
+            programme_day, client_programme, exercises = days[int(day_raw)]
+
+        try:
+            form, week, entries = prepare_session(
+                item,
+                programme_day=programme_day,
+                client_programme=client_programme,
+                exercises=exercises,
+            )
+        except WorkoutLogError as exc:
+            result.update(status=SYNC_INVALID, errors=exc.errors)
+            continue
+
+        slot = (client_programme and client_programme.id,
+                programme_day and programme_day.id, week)
+        if programme_day and slot in logged:
+            clash = logged[slot]
+            result.update(
+                status=SYNC_CONFLICT,
+                errors=_conflict(clash, week, programme_day).errors,
+            )
+            if clash.pk:
+                result["session"] = session_row(clash)
+            continue
+
+        session = _new_session(
+            user=user,
+            form=form,
+            programme_day=programme_day,
+            client_programme=client_programme,
+            week=week,
+            exercises=exercises,
+            entries=entries,
+            idempotency_key=key,
+        )
+        # Later items in the same batch clash with this one too.
+        logged[slot] = session
+        existing_by_key[key] = session
+        pending.append((result, session, exercises, entries))
+
+    if pending:
+        # A race with another request raises IntegrityError here and
+        # rolls the whole batch back; the client retries it.
+        with transaction.atomic():
+            sessions = WorkoutSession.objects.bulk_create(
+                [session for _, session, _, _ in pending]
+            )
+            sets = []
+            for (_, _, exercises, entries), session in zip(
+                pending, sessions
+            ):
+                sets.extend(_build_sets(session, exercises, entries))
+            WorkoutSet.objects.bulk_create(link_catalogue(sets))
+            record_sets(user.id, sets)
+            # bulk_create sends no save signals.
+            schedule_week_refresh(
+                *((user.id, session.date) for session in sessions)
+            )
+
+        for result, session, _, entries in pending:
+            result.update(
+                status=SYNC_CREATED,
+                session=session_row(session, set_count=count_sets(entries)),
+            )
+    return results
+
+
+def update_session(session, data, exercises=None, entries=None):
+    """
+    Apply name/status/notes changes from ``data`` and, when ``entries``
+    is given, replace the session's sets and rebuild the "Session
+    details:" part of its notes to match. New notes replace only the
+    client's part; the details are kept (any sent back are ignored). One
+    transaction.
+    """
+    errors = {}
+    if "name" in data:
+        name = (data.get("name") or "").strip()
+        if not name:
+            errors["name"] = "Session name cannot be blank."
+        elif len(name) > WorkoutSession._meta.get_field("name").max_length:
+            errors["name"] = "Session name is too long."
+        else:
+            session.name = name
+    if "status" in data:
+        valid = dict(WorkoutSession.STATUS_CHOICES)
+        if data.get("status") not in valid:
+            errors["status"] = "Choose a valid status."
+        else:
+            session.status = data["status"]
+    if "notes" in data:
+        parts = (
+            _client_notes(data.get("notes")).strip(),
+            _session_details(session.notes),
+        )
+        session.notes = "\n\n".join(part for part in parts if part)
+    if errors:
+        raise WorkoutLogError(errors)
+    if entries is not None:
+        session.notes = build_session_notes(
+            _client_notes(session.notes), exercises or [], entries
+        )
+
+    with transaction.atomic():
+        session.save()
+        if entries is not None:
+            replaced = set(session.sets.values_list("exercise_id", flat=True))
+            session.sets.all().delete()
+            sets = WorkoutSet.objects.bulk_create(
+                link_catalogue(_build_sets(session, exercises or [], entries))
+            )
+            # Replaced sets may have held a record, so recompute these
+            # exercises rather than folding the new sets in.
+            touched = (replaced | {s.exercise_id for s in sets}) - {None}
+            if touched:
+                rebuild_records([session.client_id], touched)
+    return session
+
+
+def session_row(session, set_count=None):
+    """
+    JSON-ready data for one row of the recent sessions table, with notes
+    read back from the archive.
+    """
+    with_archived_text([session])
+    if set_count is None:
+        set_count = session.sets.count()
+    return {
+        "id": session.id,
+        "name": session.name,
+        "date": session.date.isoformat(),
+        "date_display": session.date.strftime("%d/%m/%Y"),
+        "status": session.status,
+        "status_display": session.get_status_display(),
+        "notes": session.notes,
+        "week_number": session.week_number,
+        "programme_day": session.programme_day_id,
+        "set_count": set_count,
+    }
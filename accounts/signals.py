@@ -0,0 +1,28 @@
+"""Signal handlers that bump page versions."""
+
+from django.contrib.auth import get_user_model
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from accounts.services.page_versions import (
+    bump_version,
+    track_writes,
+    user_scope,
+)
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def bump_user_version(sender, instance, **kwargs):
+    """Names and roles shown in the dashboard shell come from the user."""
+    bump_version(user_scope(instance.pk))
+
+
+@receiver(connection_created)
+def track_data_writes(sender, connection, **kwargs):
+    """Bump page versions for writes, including bulk and queryset ones."""
+    if track_writes not in connection.execute_wrappers:
+        connection.execute_wrappers.append(track_writes)
@@ -0,0 +1,90 @@
+"""
+Script and stylesheet tags for the bundles built by collectstatic.
+
+Usage::
+
+    {% load asset_bundles %}
+    {% asset_styles %}
+    {% asset_scripts "dashboard" %}
+    {% asset_scripts "client_metrics" defer=True %}
+    {% font_stylesheet as fonts_url %}
+
+Bundles come from the manifest written by ``precision_performance.storage``.
+Until collectstatic has built it (local development) each bundle's source
+files and the full stylesheet are linked instead. Extra keyword arguments
+become ``<script>`` attributes.
+"""
+
+import functools
+import json
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from precision_performance.assets import template_family
+from precision_performance.storage import BUNDLES_MANIFEST
+
+register = template.Library()
+
+
+@functools.lru_cache(maxsize=1)
+def load_bundles():
+    """{"scripts": {...}, "styles": {...}}; read once per process."""
+    try:
+        with staticfiles_storage.open(BUNDLES_MANIFEST) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+@register.simple_tag
+def asset_scripts(name, **attrs):
+    bundle = load_bundles().get("scripts", {}).get(name)
+    files = [bundle] if bundle else settings.ASSET_SCRIPT_BUNDLES[name]
+    return format_html_join(
+        "\n",
+        "<script{}></script>",
+        ((flatatt({"src": static(path), **attrs}),) for path in files),
+    )
+
+
+@register.simple_tag
+def font_stylesheet():
+    """URL of the self-hosted fonts' stylesheet, or "" when not in use."""
+    if not settings.SELF_HOSTED_FONTS:
+        return ""
+    return static(settings.FONT_STYLESHEET)
+
+
+@register.simple_tag(takes_context=True)
+def asset_styles(context):
+    """
+    The stylesheet for the page's family (see ASSET_STYLE_FAMILIES): its
+    critical rules inline, the rest loaded without blocking rendering.
+    """
+    families = settings.ASSET_STYLE_FAMILIES
+    family = template_family(
+        context.template.name or "", families, next(iter(families))
+    )
+    styles = load_bundles().get("styles", {}).get(family)
+    if not styles:
+        return format_html(
+            '<link rel="stylesheet" href="{}">',
+            static(settings.ASSET_STYLESHEET),
+        )
+    # The CSS is our own build output; only "</" could end the element.
+    critical = styles["critical"].replace("</", "<\\/")
+    return format_html(
+        "<style>{}</style>\n"
+        '<link rel="preload" as="style" href="{}" '
+        "onload=\"this.onload=null;this.rel='stylesheet'\">\n"
+        '<noscript><link rel="stylesheet" href="{}"></noscript>',
+        mark_safe(critical),
+        static(styles["deferred"]),
+        static(styles["deferred"]),
+    )
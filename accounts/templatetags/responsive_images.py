@@ -0,0 +1,77 @@
+"""
+Responsive ``<picture>`` markup for images resized by collectstatic.
+
+Usage::
+
+    {% load responsive_images %}
+    {% responsive_image "images/hero.jpg" sizes="100vw" loading="eager" %}
+    {% responsive_image "images/card.jpg" class="card__image" %}
+
+AVIF/WebP ``srcset`` candidates come from the manifest written by
+``precision_performance.storage``. Until collectstatic has built it (local
+development, or Pillow missing) only the original file is used. Extra
+keyword arguments become ``<img>`` attributes.
+"""
+
+import functools
+import json
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from precision_performance.storage import RESPONSIVE_MANIFEST
+
+register = template.Library()
+
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+
+
+@functools.lru_cache(maxsize=1)
+def load_manifest():
+    """{source path: widths, height and variants}; read once per process."""
+    try:
+        with staticfiles_storage.open(RESPONSIVE_MANIFEST) as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return {}
+
+
+@register.simple_tag
+def responsive_image(path, alt="", sizes="100vw", loading="lazy", **attrs):
+    entry = load_manifest().get(path)
+    img_attrs = {
+        "src": static(path),
+        "alt": alt,
+        "loading": loading,
+        "decoding": "async",
+    }
+    sources = ""
+    if entry:
+        # Intrinsic size lets the browser reserve space before loading.
+        img_attrs["width"] = entry["width"]
+        img_attrs["height"] = entry["height"]
+        sources = format_html_join(
+            "",
+            '<source type="{}" srcset="{}" sizes="{}">',
+            (
+                (
+                    MIME_TYPES[fmt],
+                    ", ".join(
+                        f"{staticfiles_storage.url(name)} {width}w"
+                        for width, name in variants
+                    ),
+                    sizes,
+                )
+                for fmt, variants in entry["variants"].items()
+                if variants
+            ),
+        )
+    img_attrs.update(attrs)
+    return format_html(
+        "<picture>{}<img{}></picture>",
+        sources,
+        flatatt(img_attrs),
+    )
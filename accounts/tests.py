@@ -1 +1,1147 @@
-# Placeholder for account app tests.
+import datetime
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from unittest import skipUnless
+
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage import default_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import ClientDeletion, ClientProfile
+from accounts.templatetags.asset_bundles import load_bundles
+from accounts.templatetags.responsive_images import load_manifest
+from accounts.services.consultation_routing import route_new_consultations
+from accounts.services.page_versions import page_etag
+from accounts.services.workout_log import log_session, prepare_session
+from training.models import (
+    ArchivedRecord,
+    ClientProgramme,
+    ConsultationRequest,
+    DailyLeadStat,
+    DailySupportStat,
+    DailyTrainerSupportStat,
+    PersonalRecord,
+    ProgrammeBlock,
+    ProgrammeDay,
+    ProgrammeExercise,
+    SupportMessage,
+    SupportTicket,
+    WeeklyClientSummary,
+    WorkoutSession,
+    WorkoutSet,
+)
+from precision_performance.assets import (
+    Vocabulary,
+    minify_css,
+    minify_js,
+    split_css,
+)
+from precision_performance.db_routers import (
+    ReplicaRouter,
+    begin_request,
+    end_request,
+    replica_reads,
+)
+from training.services.tailored_programmes import create_tailored_block
+
+
+class ConsultationRoutingTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.trainer_a = User.objects.create_user(
+            username="trainer_a", password="test", is_staff=True
+        )
+        self.trainer_b = User.objects.create_user(
+            username="trainer_b", password="test", is_staff=True
+        )
+
+    def _consultation(self, n, option="1to1"):
+        return ConsultationRequest.objects.create(
+            first_name="Lead",
+            last_name=str(n),
+            email=f"lead{n}@example.com",
+            coaching_option=option,
+        )
+
+    def test_backlog_is_spread_across_trainers(self):
+        for n in range(4):
+            self._consultation(n)
+        group = self._consultation(99, option="small_group")
+
+        summary = route_new_consultations(batch_size=3)
+
+        self.assertEqual(summary["routed"], 4)
+        counts = {
+            trainer.id: ConsultationRequest.objects.filter(
+                assigned_trainer=trainer,
+                status=ConsultationRequest.STATUS_ASSIGNED,
+            ).count()
+            for trainer in (self.trainer_a, self.trainer_b)
+        }
+        self.assertEqual(sorted(counts.values()), [2, 2])
+        self.assertEqual(ClientProfile.objects.count(), 4)
+
+        group.refresh_from_db()
+        self.assertIsNone(group.assigned_trainer)
+
+    def test_dry_run_assigns_nothing(self):
+        self._consultation(1)
+
+        summary = route_new_consultations(dry_run=True)
+
+        self.assertEqual(len(summary["pairs"]), 1)
+        self.assertFalse(
+            ConsultationRequest.objects.filter(
+                assigned_trainer__isnull=False
+            ).exists()
+        )
+
+
+class BulkAssignConsultationsTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.trainer = User.objects.create_user(
+            username="trainer", password="test", is_staff=True
+        )
+        self.existing = User.objects.create_user(
+            username="Existing@Example.com",
+            email="Existing@Example.com",
+            password="test",
+        )
+        self.ids = [
+            ConsultationRequest.objects.create(
+                first_name="Lead",
+                last_name=str(n),
+                email=email,
+                coaching_option=option,
+            ).id
+            for n, (email, option) in enumerate(
+                [
+                    ("new1@example.com", "1to1"),
+                    ("new2@example.com", "online"),
+                    ("existing@example.com", "1to1"),
+                    ("group@example.com", "small_group"),
+                ]
+            )
+        ]
+
+    def test_bulk_assign_uses_fixed_queries(self):
+        self.client.force_login(self.owner)
+        url = reverse("accounts:owner_bulk_assign_consultations")
+        with self.assertNumQueries(14):
+            response = self.client.post(
+                url,
+                {
+                    "consultation_ids": self.ids,
+                    "trainer_id": str(self.trainer.id),
+                },
+            )
+        self.assertRedirects(
+            response,
+            reverse("accounts:trainer_dashboard"),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(
+            ConsultationRequest.objects.filter(
+                assigned_trainer=self.trainer,
+                status=ConsultationRequest.STATUS_ASSIGNED,
+            ).count(),
+            3,
+        )
+        self.assertEqual(
+            ClientProfile.objects.get(user=self.existing).preferred_trainer,
+            self.trainer,
+        )
+        self.assertEqual(
+            get_user_model().objects.filter(
+                email__in=["new1@example.com", "new2@example.com"]
+            ).count(),
+            2,
+        )
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingTest(TestCase):
+    def test_reports_the_view_time(self):
+        response = self.client.get(reverse("home"))
+
+        self.assertRegex(response["Server-Timing"], r"^app;dur=[\d.]+$")
+
+
+@override_settings(SHARED_CACHE=True)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.member = get_user_model().objects.create_user(
+            username="member", password="test"
+        )
+        ClientProfile.objects.create(user=self.member)
+        self.client.force_login(self.member)
+        self.url = reverse("accounts:client_support")
+
+    def test_unchanged_page_is_not_modified_without_queries(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=first["ETag"]
+            )
+
+        self.assertEqual(second.status_code, 304)
+        self.assertIn("private", first["Cache-Control"])
+        self.assertFalse(
+            [q for q in queries if "training_" in q["sql"]]
+        )
+
+    def test_queryset_update_changes_the_etag(self):
+        ticket = SupportTicket.objects.create(
+            client=self.member, subject="Help"
+        )
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            SupportTicket.objects.filter(pk=ticket.pk).update(
+                subject="Still stuck"
+            )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Still stuck")
+
+    def test_saving_the_user_changes_the_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        self.member.first_name = "Jordan"
+        self.member.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Logged in: Jordan")
+
+    def test_pending_messages_force_a_render(self):
+        request = RequestFactory().get(self.url)
+        request.user = self.member
+        request.session = self.client.session
+        request._messages = default_storage(request)
+        self.assertIsNotNone(page_etag(request, ["support"]))
+
+        messages.success(request, "Support request sent.")
+
+        self.assertIsNone(page_etag(request, ["support"]))
+
+    def test_owner_dashboard_is_always_rendered(self):
+        owner = get_user_model().objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.client.force_login(owner)
+
+        response = self.client.get(reverse("accounts:owner_dashboard"))
+
+        self.assertFalse(response.has_header("ETag"))
+
+    @override_settings(SHARED_CACHE=False)
+    def test_per_process_cache_never_answers_304(self):
+        first = self.client.get(self.url)
+        self.assertFalse(first.has_header("ETag"))
+        second = self.client.get(self.url, HTTP_IF_NONE_MATCH="*")
+        self.assertEqual(second.status_code, 200)
+
+
+class WorkoutLogApiTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="lifter", password="test"
+        )
+        block = ProgrammeBlock.objects.create(name="Strength", weeks=4)
+        self.day = ProgrammeDay.objects.create(block=block, name="Day 1")
+        self.bench = ProgrammeExercise.objects.create(
+            day=self.day, exercise_name="Bench Press", order=1
+        )
+        self.row = ProgrammeExercise.objects.create(
+            day=self.day, exercise_name="Seated Row", order=2
+        )
+        ClientProgramme.objects.create(client=self.user, block=block)
+        self.client.force_login(self.user)
+        self.url = reverse("accounts:client_workout_api_create")
+
+    def _post(self, url, payload):
+        return self.client.post(
+            url, payload, content_type="application/json"
+        )
+
+    def _payload(self, **overrides):
+        payload = {
+            "day": self.day.id,
+            "week": 2,
+            "date": "2026-01-05",
+            "notes": "Felt strong",
+            "sets": [
+                {
+                    "exercise_id": self.bench.id,
+                    "weight_kg": "60",
+                    "reps": [8, 8, 7],
+                },
+                {"exercise_id": self.row.id, "weight_kg": "", "reps": [10]},
+            ],
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_create_saves_session_and_sets_together(self):
+        response = self._post(self.url, self._payload())
+
+        self.assertEqual(response.status_code, 201)
+        row = response.json()["session"]
+        self.assertEqual(row["name"], "Week 2 - Day 1")
+        self.assertEqual(row["set_count"], 4)
+        self.assertEqual(WorkoutSet.objects.count(), 4)
+        self.assertFalse(
+            WorkoutSet.objects.filter(exercise__isnull=True).exists()
+        )
+        notes = WorkoutSession.objects.get().notes
+        self.assertIn(
+            "Bench Press (3 x 10 @ -): 8 | 8 | 7 (weight: 60)", notes
+        )
+        self.assertIn("Seated Row (3 x 10 @ -): 10 | - | -", notes)
+
+    def test_same_week_and_day_is_a_conflict(self):
+        first = self._post(self.url, self._payload())
+        second = self._post(self.url, self._payload())
+
+        self.assertEqual(second.status_code, 409)
+        self.assertEqual(
+            second.json()["session"]["id"], first.json()["session"]["id"]
+        )
+        self.assertEqual(WorkoutSession.objects.count(), 1)
+
+    def test_free_session_key_race_returns_stored_session(self):
+        payload = self._payload(
+            day="",
+            name="Conditioning",
+            sets=[],
+            key="6f1c5c58-3c4e-4f7a-9d53-4a0c0c1b2a09",
+        )
+        stored = self._post(self.url, payload).json()["session"]
+
+        # The retry got past the view's key lookup before the first
+        # request committed, so only the constraint catches it.
+        form, week, entries = prepare_session(payload)
+        session = log_session(
+            user=self.user,
+            form=form,
+            programme_day=None,
+            client_programme=None,
+            week=week,
+            exercises=[],
+            entries=entries,
+            idempotency_key=payload["key"],
+        )
+
+        self.assertEqual(session.id, stored["id"])
+        self.assertEqual(WorkoutSession.objects.count(), 1)
+
+    def test_service_worker_only_caches_the_offline_page(self):
+        offline_url = reverse("accounts:client_workout_offline")
+        worker = self.client.get(
+            reverse("accounts:client_workout_service_worker")
+        )
+        offline = self.client.get(offline_url)
+
+        self.assertContains(worker, f'OFFLINE_URL = "{offline_url}"')
+        self.assertContains(offline, "offline")
+        # The cached copy must not carry this client's session.
+        self.assertNotContains(offline, "Logout")
+        self.assertNotContains(offline, "csrfmiddlewaretoken")
+
+    def test_invalid_sets_store_nothing(self):
+        payload = self._payload(
+            sets=[{"exercise_id": self.bench.id, "reps": ["lots"]}]
+        )
+        response = self._post(self.url, payload)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("sets", response.json()["errors"])
+        self.assertFalse(WorkoutSession.objects.exists())
+
+    def test_update_replaces_sets_and_returns_row(self):
+        session_id = self._post(self.url, self._payload()).json()[
+            "session"
+        ]["id"]
+        url = reverse(
+            "accounts:client_workout_api_update", args=[session_id]
+        )
+
+        response = self._post(
+            url,
+            {
+                "status": "skipped",
+                "sets": [{"exercise_id": self.row.id, "reps": [12, 12]}],
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["session"]["status"], "skipped")
+        self.assertEqual(
+            list(WorkoutSet.objects.values_list("reps", flat=True)),
+            [12, 12],
+        )
+        notes = response.json()["session"]["notes"]
+        self.assertTrue(notes.startswith("Felt strong\n\nSession details:"))
+        self.assertIn("Seated Row (3 x 10 @ -): 12 | 12 | -", notes)
+        self.assertIn("Bench Press (3 x 10 @ -): - | - | -", notes)
+        self.assertNotIn("8 | 8 | 7", notes)
+
+    def test_notes_update_keeps_session_details(self):
+        row = self._post(self.url, self._payload()).json()["session"]
+        url = reverse("accounts:client_workout_api_update", args=[row["id"]])
+
+        notes = self._post(url, {"notes": "Left shoulder tight"}).json()[
+            "session"
+        ]["notes"]
+
+        self.assertTrue(
+            notes.startswith("Left shoulder tight\n\nSession details:")
+        )
+        self.assertIn("Bench Press (3 x 10 @ -): 8 | 8 | 7", notes)
+        # Sending the whole notes back does not repeat the details.
+        again = self._post(url, {"notes": notes}).json()["session"]
+        self.assertEqual(again["notes"], notes)
+
+    def test_personal_records_follow_saved_sets(self):
+        first = self._post(self.url, self._payload()).json()["session"]
+        self._post(
+            self.url,
+            self._payload(
+                week=3,
+                sets=[
+                    {
+                        "exercise_id": self.bench.id,
+                        "weight_kg": "60",
+                        "reps": [10],
+                    }
+                ],
+            ),
+        )
+
+        record = PersonalRecord.objects.get(exercise=self.bench.exercise)
+        self.assertEqual(record.best_weight_kg, Decimal("60"))
+        self.assertEqual(record.best_weight_reps, 10)
+        self.assertEqual(record.best_e1rm_kg, Decimal("80.00"))
+
+        # Editing a session down recomputes from the remaining sets.
+        url = reverse(
+            "accounts:client_workout_api_update", args=[first["id"]]
+        )
+        self._post(
+            url,
+            {
+                "sets": [
+                    {
+                        "exercise_id": self.bench.id,
+                        "weight_kg": "70",
+                        "reps": [3],
+                    }
+                ]
+            },
+        )
+        record = PersonalRecord.objects.get(exercise=self.bench.exercise)
+        self.assertEqual(record.best_weight_kg, Decimal("70"))
+        self.assertEqual(record.best_weight_reps, 3)
+        self.assertEqual(record.best_e1rm_kg, Decimal("80.00"))
+
+    def test_weekly_summary_follows_sessions_onto_roster(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            session_id = self._post(
+                self.url, self._payload(date=str(timezone.localdate()))
+            ).json()["session"]["id"]
+
+        summary = WeeklyClientSummary.objects.get(client=self.user)
+        self.assertEqual(summary.sessions_logged, 1)
+        self.assertEqual(summary.total_volume_kg, Decimal("1380.00"))
+
+        trainer = get_user_model().objects.create_user(
+            username="coach", password="test", is_staff=True
+        )
+        self.user.email = "lifter@example.com"
+        self.user.save()
+        ConsultationRequest.objects.create(
+            first_name="Lift",
+            last_name="Er",
+            email="lifter@example.com",
+            coaching_option="online",
+            status=ConsultationRequest.STATUS_ASSIGNED,
+            assigned_trainer=trainer,
+        )
+        self.client.force_login(trainer)
+        response = self.client.get(reverse("accounts:trainer_clients"))
+        self.assertContains(response, "1 of 1 logged")
+
+        self.client.force_login(self.user)
+        url = reverse("accounts:client_workout_api_update", args=[session_id])
+        with self.captureOnCommitCallbacks(execute=True):
+            self._post(url, {"status": "skipped"})
+
+        summary = WeeklyClientSummary.objects.get(client=self.user)
+        self.assertEqual(summary.sessions_logged, 0)
+        self.assertEqual(summary.sessions_skipped, 1)
+        self.assertEqual(summary.total_volume_kg, 0)
+
+    def test_sync_is_idempotent_and_reports_conflicts(self):
+        url = reverse("accounts:client_workout_api_sync")
+        batch = {
+            "sessions": [
+                self._payload(key="6f1c5c58-3c4e-4f7a-9d53-4a0c0c1b2a01"),
+                self._payload(key="6f1c5c58-3c4e-4f7a-9d53-4a0c0c1b2a02"),
+                self._payload(key="not-a-key", week=3),
+            ]
+        }
+        for item in batch["sessions"]:
+            item["user"] = self.user.id
+
+        first = self._post(url, batch).json()["results"]
+        retry = self._post(url, batch).json()["results"]
+
+        self.assertEqual(
+            [r["status"] for r in first], ["created", "conflict", "invalid"]
+        )
+        self.assertEqual(
+            [r["status"] for r in retry],
+            ["duplicate", "conflict", "invalid"],
+        )
+        self.assertEqual(
+            retry[0]["session"]["id"], first[0]["session"]["id"]
+        )
+        self.assertEqual(WorkoutSession.objects.count(), 1)
+        self.assertEqual(WorkoutSet.objects.count(), 4)
+
+    def test_sync_rejects_sessions_queued_by_another_account(self):
+        url = reverse("accounts:client_workout_api_sync")
+        other = get_user_model().objects.create_user(username="other")
+        payload = self._payload(
+            day="",
+            name="Conditioning",
+            sets=[],
+            key="6f1c5c58-3c4e-4f7a-9d53-4a0c0c1b2a03",
+            user=other.id,
+        )
+
+        results = self._post(url, {"sessions": [payload]}).json()["results"]
+
+        self.assertEqual(results[0]["status"], "invalid")
+        self.assertIn("user", results[0]["errors"])
+        self.assertFalse(WorkoutSession.objects.exists())
+
+
+class ProgrammeDetailQueryTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.trainer = User.objects.create_user(
+            username="trainer", password="test", is_staff=True
+        )
+        self.template = ProgrammeBlock.objects.create(
+            name="Block A", weeks=4, is_template=True
+        )
+        self._add_days(2)
+        self.assignment = self._assign("client0")
+
+    def _add_days(self, count):
+        start = self.template.days.count()
+        for n in range(start, start + count):
+            day = ProgrammeDay.objects.create(
+                block=self.template, name=f"Day {n + 1}", order=n + 1
+            )
+            for order in range(1, 4):
+                ProgrammeExercise.objects.create(
+                    day=day, exercise_name=f"Lift {order}", order=order
+                )
+
+    def _assign(self, username):
+        user = get_user_model().objects.create_user(
+            username=username, password="test"
+        )
+        ClientProfile.objects.create(user=user)
+        block = create_tailored_block(self.template, self.trainer, user)
+        return ClientProgramme.objects.create(
+            client=user, block=block, trainer=self.trainer
+        )
+
+    def _queries(self, user, url):
+        self.client.force_login(user)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx)
+
+    def _assert_fixed(self, user, url, expected):
+        self.assertEqual(self._queries(user, url), expected)
+        self._add_days(3)
+        for n in range(1, 4):
+            self._assign(f"client{n}")
+        self.assertEqual(self._queries(user, url), expected)
+
+    def test_trainer_tailored_page(self):
+        url = reverse(
+            "accounts:trainer_programme_detail",
+            args=[self.assignment.block_id],
+        )
+        self._assert_fixed(
+            self.trainer, f"{url}?cp={self.assignment.id}", 8
+        )
+
+    def test_trainer_template_page(self):
+        url = reverse(
+            "accounts:trainer_programme_detail", args=[self.template.id]
+        )
+        self._assert_fixed(self.trainer, url, 7)
+
+    def test_owner_tailored_page(self):
+        url = reverse(
+            "accounts:owner_programme_detail", args=[self.template.id]
+        )
+        self._assert_fixed(
+            self.owner, f"{url}?cp={self.assignment.id}", 10
+        )
+
+
+class OwnerAnalyticsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.owner = get_user_model().objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.client.force_login(self.owner)
+        self.url = reverse("accounts:owner_dashboard")
+
+    def _queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_dashboard_reads_rollups_in_fixed_queries(self):
+        empty = self._queries()
+
+        today = timezone.localdate()
+        DailyLeadStat.objects.bulk_create(
+            DailyLeadStat(
+                date=today - datetime.timedelta(days=n),
+                coaching_option="online",
+                leads=2,
+                converted=1,
+            )
+            for n in range(400)
+        )
+        DailySupportStat.objects.create(
+            date=today,
+            tickets_opened=2,
+            tickets_answered=1,
+            response_seconds=5400,
+        )
+
+        self.assertEqual(self._queries(), empty)
+        response = self.client.get(self.url)
+        self.assertEqual(response.context["conversion_total"]["rate"], 50)
+        self.assertContains(response, "1.5 hours")
+
+
+class SupportSlaTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.trainer = User.objects.create_user(
+            username="coach", password="test", is_staff=True
+        )
+        self.member = User.objects.create_user(
+            username="member", password="test"
+        )
+        self.ticket = SupportTicket.objects.create(
+            client=self.member, trainer=self.trainer, subject="Help"
+        )
+        SupportMessage.objects.create(
+            ticket=self.ticket, sender=self.member, body="Question"
+        )
+        self.url = reverse(
+            "accounts:trainer_support_ticket", args=[self.ticket.id]
+        )
+
+    def _stat(self):
+        return DailyTrainerSupportStat.objects.get(trainer=self.trainer)
+
+    def test_replies_and_closing_keep_sla_figures(self):
+        self.client.force_login(self.trainer)
+        for body in ("First", "Second"):
+            self.client.post(self.url, {"action": "reply", "body": body})
+
+        self.ticket.refresh_from_db()
+        first = SupportMessage.objects.get(body="First")
+        self.assertEqual(self.ticket.first_response_at, first.created_at)
+        self.assertEqual(self._stat().responses, 1)
+        self.assertEqual(self._stat().breaches, 0)
+
+        self.client.post(self.url, {"action": "close"})
+        self.ticket.refresh_from_db()
+        self.assertIsNotNone(self.ticket.resolved_at)
+        self.assertEqual(self._stat().resolutions, 1)
+
+        self.client.post(self.url, {"action": "reopen"})
+        self.ticket.refresh_from_db()
+        self.assertIsNone(self.ticket.resolved_at)
+        self.assertEqual(self._stat().resolutions, 0)
+
+        # A client reply is not a response.
+        self.client.force_login(self.member)
+        self.client.post(
+            reverse(
+                "accounts:client_support_ticket_detail",
+                args=[self.ticket.id],
+            ),
+            {"body": "Thanks"},
+        )
+        self.assertEqual(self._stat().responses, 1)
+
+    def test_reopening_a_ticket_without_stats_keeps_them_at_zero(self):
+        # Closed before the stats existed, so no resolution was counted.
+        SupportTicket.objects.filter(pk=self.ticket.pk).update(
+            status=SupportTicket.STATUS_CLOSED,
+            resolved_at=timezone.now(),
+        )
+        self.client.force_login(self.trainer)
+
+        response = self.client.post(self.url, {"action": "reopen"})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._stat().resolutions, 0)
+        self.assertEqual(self._stat().resolution_seconds, 0)
+
+    def test_owner_report_lists_overdue_tickets(self):
+        SupportTicket.objects.filter(pk=self.ticket.pk).update(
+            created_at=timezone.now() - datetime.timedelta(days=2)
+        )
+        owner = get_user_model().objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.client.force_login(owner)
+
+        response = self.client.get(reverse("accounts:owner_dashboard"))
+
+        row = response.context["sla"]["rows"][0]
+        self.assertEqual(row["trainer"], self.trainer)
+        self.assertEqual(row["overdue"], 1)
+        self.assertIsNone(row["avg_response_hours"])
+
+
+class ClientDeletionTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.owner = User.objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.trainer = User.objects.create_user(
+            username="coach", password="test", is_staff=True
+        )
+        self.member = User.objects.create_user(
+            username="member", email="Member@example.com", password="test"
+        )
+        ClientProfile.objects.create(user=self.member)
+        self.template = ProgrammeBlock.objects.create(
+            name="Block A", weeks=4, is_template=True
+        )
+        block = create_tailored_block(
+            self.template, self.trainer, self.member
+        )
+        ClientProgramme.objects.create(
+            client=self.member, block=block, trainer=self.trainer
+        )
+        for n in range(3):
+            session = WorkoutSession.objects.create(client=self.member)
+            for number in range(1, 3):
+                WorkoutSet.objects.create(
+                    session=session,
+                    exercise_name="Squat",
+                    set_number=number,
+                    reps=5,
+                )
+        ticket = SupportTicket.objects.create(
+            client=self.member, trainer=self.trainer, subject="Help"
+        )
+        SupportMessage.objects.create(
+            ticket=ticket, sender=self.member, body="Question"
+        )
+        ConsultationRequest.objects.create(
+            first_name="Member",
+            last_name="One",
+            email="member@example.com",
+            coaching_option="online",
+        )
+        # A different submission that only shares the fingerprint.
+        self.tagged = ConsultationRequest.objects.create(
+            first_name="Member",
+            last_name="Work",
+            email="member+work@example.com",
+            coaching_option="online",
+        )
+        self.url = reverse(
+            "accounts:owner_delete_client", args=[self.member.id]
+        )
+
+    def test_delete_only_queues_and_deactivates(self):
+        self.client.force_login(self.owner)
+        response = self.client.post(self.url)
+        self.assertRedirects(
+            response,
+            reverse("accounts:trainer_clients"),
+            fetch_redirect_response=False,
+        )
+        self.member.refresh_from_db()
+        self.assertFalse(self.member.is_active)
+        job = ClientDeletion.objects.get()
+        self.assertEqual(job.status, ClientDeletion.STATUS_PENDING)
+        self.assertEqual(WorkoutSet.objects.count(), 6)
+
+        # Asking again reuses the queued job.
+        self.client.post(self.url)
+        self.assertEqual(ClientDeletion.objects.count(), 1)
+
+        response = self.client.get(reverse("accounts:trainer_clients"))
+        self.assertContains(response, "Client deletions")
+        self.assertContains(response, "Pending")
+
+    def test_command_deletes_in_chunks(self):
+        self.client.force_login(self.owner)
+        self.client.post(self.url)
+        with CaptureQueriesContext(connection) as ctx:
+            call_command(
+                "process_client_deletions",
+                "--batch-size",
+                "4",
+                stdout=StringIO(),
+            )
+        set_deletes = [
+            q["sql"]
+            for q in ctx.captured_queries
+            if q["sql"].startswith(
+                'DELETE FROM "training_workoutset" '
+                'WHERE "training_workoutset"."id" IN'
+            )
+        ]
+        # Six sets in chunks of four.
+        self.assertEqual(len(set_deletes), 2)
+
+        job = ClientDeletion.objects.get()
+        self.assertEqual(job.status, ClientDeletion.STATUS_DONE)
+        self.assertIsNone(job.client_id)
+        self.assertIsNotNone(job.finished_at)
+        self.assertGreater(job.rows_deleted, 6)
+        self.assertFalse(
+            get_user_model().objects.filter(username="member").exists()
+        )
+        self.assertFalse(WorkoutSession.objects.exists())
+        self.assertFalse(SupportTicket.objects.exists())
+        self.assertEqual(
+            list(ConsultationRequest.objects.values_list("pk", flat=True)),
+            [self.tagged.pk],
+        )
+        # The tailored copy went with the assignment; the template stays.
+        self.assertEqual(
+            list(ProgrammeBlock.objects.values_list("id", flat=True)),
+            [self.template.id],
+        )
+
+    def test_archived_notes_and_messages_go_too(self):
+        other = get_user_model().objects.create_user(username="other")
+        kept = WorkoutSession.objects.create(client=other, notes="Mine")
+        old = timezone.now() - datetime.timedelta(days=400)
+        WorkoutSession.objects.update(notes="Heavy day", created_at=old)
+        SupportTicket.objects.update(status=SupportTicket.STATUS_CLOSED)
+        SupportMessage.objects.update(created_at=old)
+        call_command("archive_data", stdout=StringIO())
+        self.assertEqual(ArchivedRecord.objects.count(), 5)
+
+        self.client.force_login(self.owner)
+        self.client.post(self.url)
+        call_command("process_client_deletions", stdout=StringIO())
+
+        self.assertEqual(
+            list(ArchivedRecord.objects.values_list("object_id", flat=True)),
+            [kept.pk],
+        )
+
+    def test_sweep_removes_orphaned_copies(self):
+        create_tailored_block(self.template, self.trainer, self.member)
+        call_command(
+            "process_client_deletions", "--sweep-orphans", stdout=StringIO()
+        )
+        self.assertEqual(
+            ProgrammeBlock.objects.filter(is_template=False).count(), 1
+        )
+
+
+class ResponsiveImageTest(TestCase):
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        settings_override = override_settings(
+            STATIC_ROOT=self.static_root.name
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_manifest.cache_clear()
+        self.addCleanup(load_manifest.cache_clear)
+
+    def test_home_page_falls_back_without_a_manifest(self):
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(
+            response, 'src="/static/images/online-coaching.jpg"'
+        )
+        self.assertNotContains(response, "<source")
+
+    def test_manifest_variants_become_srcset_candidates(self):
+        manifest = {
+            "images/online-coaching.jpg": {
+                "width": 1920,
+                "height": 1280,
+                "variants": {
+                    "avif": [[480, "images/online-coaching.480w.ab.avif"]],
+                    "webp": [[480, "images/online-coaching.480w.cd.webp"]],
+                },
+            }
+        }
+        path = f"{self.static_root.name}/responsive-images.json"
+        with open(path, "w") as handle:
+            json.dump(manifest, handle)
+
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(
+            response,
+            '<source type="image/avif" '
+            'srcset="/static/images/online-coaching.480w.ab.avif 480w" '
+            'sizes="(max-width: 700px) 100vw, (max-width: 1100px) 50vw, '
+            '400px">',
+        )
+        self.assertContains(response, 'height="1280" loading="lazy"')
+
+
+class AssetBundleTest(TestCase):
+    def setUp(self):
+        self.static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.static_root.cleanup)
+        settings_override = override_settings(
+            STATIC_ROOT=self.static_root.name,
+            RESPONSIVE_IMAGE_SOURCES=[],
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        load_bundles.cache_clear()
+        self.addCleanup(load_bundles.cache_clear)
+
+    def test_minify_js_leaves_literals_alone(self):
+        source = (
+            'const a = "x  // y"; // note\n'
+            "const re = /[/]x/g;\n"
+            "let b = a\n  .trim();\n"
+            "return `a ${ b }`;\n"
+        )
+
+        self.assertEqual(
+            minify_js(source),
+            'const a="x  // y";const re=/[/]x/g;let b=a.trim();'
+            "return `a ${ b }`;",
+        )
+
+    def test_split_css_inlines_shell_rules_and_drops_unused(self):
+        css = minify_css(
+            "/* nav */\n.nav a { color: red; }\n"
+            ".card { margin: 0 }\n"
+            "@media (max-width: 576px) {\n"
+            "  .nav a:hover { color: blue; }\n"
+            "  .unused { top: 0; }\n"
+            "}\n"
+        )
+
+        critical, deferred = split_css(
+            css,
+            Vocabulary(['<div class="nav card">']),
+            Vocabulary(['<nav class="nav">']),
+        )
+
+        self.assertEqual(
+            critical,
+            ".nav a{color:red}"
+            "@media (max-width:576px){.nav a:hover{color:blue}}",
+        )
+        self.assertEqual(deferred, ".card{margin:0}")
+
+    def test_pages_link_source_files_before_collectstatic(self):
+        response = self.client.get(reverse("home"))
+
+        self.assertContains(response, 'href="/static/css/style.css"')
+        self.assertContains(response, 'src="/static/js/main.js"')
+        self.assertContains(response, 'src="/static/js/nav.js"')
+
+    def test_collectstatic_bundles_are_served_per_page(self):
+        call_command("collectstatic", interactive=False, verbosity=0)
+        member = get_user_model().objects.create_user(
+            username="client", password="test"
+        )
+        ClientProfile.objects.create(user=member)
+        self.client.force_login(member)
+
+        response = self.client.get(reverse("accounts:client_dashboard"))
+
+        self.assertContains(response, "<style>:root{")
+        self.assertContains(response, '"/static/css/style.client.')
+        self.assertContains(response, 'src="/static/js/dashboard.')
+        self.assertNotContains(response, "dashboard_menu.js")
+        self.assertNotContains(response, "js/site.")
+
+        bundle = load_bundles()["scripts"]["dashboard"]
+        served = self.client.get(
+            f"/static/{bundle}", HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(served["Content-Encoding"], "gzip")
+        self.assertIn("immutable", served["Cache-Control"])
+
+    def test_zstandard_copies_are_served_when_accepted(self):
+        root = pathlib.Path(self.static_root.name) / "js"
+        root.mkdir()
+        (root / "app.0123456789ab.js").write_text("let a = 1;" * 100)
+        (root / "app.0123456789ab.js.zst").write_bytes(b"zstd")
+        (root / "app.0123456789ab.js.gz").write_bytes(b"gzip data")
+
+        zstd = self.client.get(
+            "/static/js/app.0123456789ab.js",
+            HTTP_ACCEPT_ENCODING="gzip, br, zstd",
+        )
+        plain = self.client.get("/static/js/app.0123456789ab.js")
+
+        self.assertEqual(zstd["Content-Encoding"], "zstd")
+        self.assertEqual(b"".join(zstd.streaming_content), b"zstd")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("immutable", plain["Cache-Control"])
+
+
+class UrlconfImportTest(SimpleTestCase):
+    # accounts.urls imports no views, so loading it stays cheap.
+    def _imported_modules(self):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, django; django.setup(); import accounts.urls; "
+                "print('\\n'.join(sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            env=os.environ,
+            check=True,
+        )
+        return result.stdout.splitlines()
+
+    def test_urlconf_loads_no_view_modules(self):
+        modules = self._imported_modules()
+
+        self.assertIn("accounts.urls", modules)
+        views = [
+            name for name in modules if name.startswith("accounts.views.")
+        ]
+        self.assertEqual(views, [])
+
+    def test_lazy_class_based_view_serves_requests(self):
+        response = self.client.get(reverse("accounts:client_login"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("accounts.views.client", sys.modules)
+
+
+@override_settings(READ_REPLICA="replica")
+class ReplicaRouterTest(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.token = begin_request(pinned=False)
+
+    def tearDown(self):
+        end_request(self.token)
+
+    def test_only_opted_in_reads_use_the_replica(self):
+        self.assertEqual(self.router.db_for_read(DailyLeadStat), "default")
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(DailyLeadStat), "replica"
+            )
+
+    def test_a_write_pins_the_rest_of_the_request(self):
+        token = begin_request(pinned=False)
+        with replica_reads():
+            self.router.db_for_write(SupportTicket)
+            self.assertEqual(
+                self.router.db_for_read(DailyLeadStat), "default"
+            )
+        self.assertTrue(end_request(token))
+
+    def test_pinned_requests_read_the_primary(self):
+        token = begin_request(pinned=True)
+        with replica_reads():
+            self.assertEqual(
+                self.router.db_for_read(DailyLeadStat), "default"
+            )
+        self.assertFalse(end_request(token))
+
+
+@skipUnless(settings.READ_REPLICA, "REPLICA_DATABASE_URL is not set")
+class ReplicaPinningTest(TransactionTestCase):
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        self.owner = get_user_model().objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        self.client.force_login(self.owner)
+        self.url = reverse("accounts:owner_dashboard")
+
+    def _replica_queries(self):
+        with CaptureQueriesContext(connections["replica"]) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_dashboard_reads_from_the_replica(self):
+        self.assertGreater(self._replica_queries(), 0)
+
+    def test_browser_is_pinned_to_primary_after_a_write(self):
+        # Logging in saves the session and the user's last_login.
+        response = self.client.post(
+            reverse("accounts:trainer_login"),
+            {"username": "owner", "password": "test"},
+        )
+        self.assertIn("primary_pin", response.cookies)
+
+        self.assertEqual(self._replica_queries(), 0)
@@ -2,150 +2,205 @@
 from django.urls import path
 from django.contrib.auth.views import LogoutView
 
-from .views import (
-    TrainerLoginView,
-    ClientLoginView,
-    owner_queries,
-    owner_query_detail,
-    trainer_dashboard,
-    trainer_clients,
-    trainer_programmes,
-    trainer_programme_detail,
-    trainer_tailored_programme_detail,
-    owner_programme_detail,
-    owner_tailored_programme_detail,
-    trainer_consultation_detail,
-    trainer_client_detail,
-    trainer_session_edit,
-    add_to_current_classes,
-    owner_dashboard,
-    trainer_queries,
-    trainer_query_detail,
-    owner_delete_client,
-    client_dashboard,
-    client_programme_library,
-    client_today,
-    client_workout_log,
-    client_workout_edit,
-    client_metrics,
-    client_support,
-    client_support_tickets,
-    client_support_ticket_detail,
-    trainer_support,
-    trainer_support_ticket,
-)
+from .views import lazy_view
 
 app_name = "accounts"
 
 urlpatterns = [
     # Logins
-    path("trainer/login/", TrainerLoginView.as_view(), name="trainer_login"),
-    path("client/login/", ClientLoginView.as_view(), name="client_login"),
+    path(
+        "trainer/login/",
+        lazy_view("trainer.TrainerLoginView"),
+        name="trainer_login",
+    ),
+    path(
+        "client/login/",
+        lazy_view("client.ClientLoginView"),
+        name="client_login",
+    ),
 
     # Dashboards
-    path("trainer/dashboard/", trainer_dashboard, name="trainer_dashboard"),
-    path("trainer/clients/", trainer_clients, name="trainer_clients"),
-    path("trainer/programmes/", trainer_programmes, name="trainer_programmes"),
+    path(
+        "trainer/dashboard/",
+        lazy_view("trainer.trainer_dashboard"),
+        name="trainer_dashboard",
+    ),
+    path(
+        "trainer/clients/",
+        lazy_view("trainer.trainer_clients"),
+        name="trainer_clients",
+    ),
+    path(
+        "trainer/programmes/",
+        lazy_view("programmes.trainer_programmes"),
+        name="trainer_programmes",
+    ),
     path(
         "trainer/consultations/<int:pk>/",
-        trainer_consultation_detail,
+        lazy_view("trainer.trainer_consultation_detail"),
         name="trainer_consultation_detail",
     ),
     path(
         "trainer/consultations/<int:pk>/add-to-classes/",
-        add_to_current_classes,
+        lazy_view("trainer.add_to_current_classes"),
         name="trainer_add_to_current_classes",
     ),
     path(
         "trainer/programmes/<int:block_id>/",
-        trainer_programme_detail,
+        lazy_view("programmes.trainer_programme_detail"),
         name="trainer_programme_detail",
     ),
     path(
         "trainer/programmes/tailored/<int:block_id>/",
-        trainer_tailored_programme_detail,
+        lazy_view("programmes.trainer_tailored_programme_detail"),
         name="trainer_tailored_programme_detail",
     ),
     # Alias so owner templates can reverse the programmes list with owner
     # branding.
     path(
         "owner/programmes/",
-        trainer_programmes,
+        lazy_view("programmes.trainer_programmes"),
         name="owner_programmes",
     ),
     path(
         "owner/programmes/<int:block_id>/",
-        owner_programme_detail,
+        lazy_view("programmes.owner_programme_detail"),
         name="owner_programme_detail",
     ),
     path(
         "owner/programmes/tailored/<int:block_id>/",
-        owner_tailored_programme_detail,
+        lazy_view("programmes.owner_tailored_programme_detail"),
         name="owner_tailored_programme_detail",
     ),
     path(
         "trainer/clients/<int:client_id>/",
-        trainer_client_detail,
+        lazy_view("trainer.trainer_client_detail"),
         name="trainer_client_detail",
     ),
     path(
         "owner/clients/<int:client_id>/delete/",
-        owner_delete_client,
+        lazy_view("owner.owner_delete_client"),
         name="owner_delete_client",
     ),
     path(
         "trainer/sessions/<int:session_id>/edit/",
-        trainer_session_edit,
+        lazy_view("trainer.trainer_session_edit"),
         name="trainer_session_edit",
     ),
-    path("trainer/queries/", trainer_queries, name="trainer_queries"),
+    path(
+        "trainer/queries/",
+        lazy_view("trainer.trainer_queries"),
+        name="trainer_queries",
+    ),
     path(
         "trainer/queries/<int:pk>/",
-        trainer_query_detail,
+        lazy_view("trainer.trainer_query_detail"),
         name="trainer_query_detail",
     ),
-    path("owner/dashboard/", owner_dashboard, name="owner_dashboard"),
-    path("owner/queries/", owner_queries, name="owner_queries"),
+    path(
+        "owner/dashboard/",
+        lazy_view("owner.owner_dashboard"),
+        name="owner_dashboard",
+    ),
+    path(
+        "owner/consultations/bulk-assign/",
+        lazy_view("owner.owner_bulk_assign_consultations"),
+        name="owner_bulk_assign_consultations",
+    ),
+    path(
+        "owner/queries/",
+        lazy_view("owner.owner_queries"),
+        name="owner_queries",
+    ),
     path(
         "owner/queries/<int:pk>/",
-        owner_query_detail,
+        lazy_view("owner.owner_query_detail"),
         name="owner_query_detail",
     ),
-    path("client/dashboard/", client_dashboard, name="client_dashboard"),
-    path("client/today/", client_today, name="client_today"),
+    path(
+        "client/dashboard/",
+        lazy_view("client.client_dashboard"),
+        name="client_dashboard",
+    ),
+    path(
+        "client/today/",
+        lazy_view("client.client_today"),
+        name="client_today",
+    ),
     # Keep legacy name/path for programme library
     path(
         "client/programmes/",
-        client_programme_library,
+        lazy_view("client.client_programme_library"),
         name="client_programmes",
     ),
     path(
         "client/programme-library/",
-        client_programme_library,
+        lazy_view("client.client_programme_library"),
         name="client_programme_library",
     ),
-    path("client/workout-log/", client_workout_log, name="client_workout_log"),
+    path(
+        "client/workout-log/",
+        lazy_view("client.client_workout_log"),
+        name="client_workout_log",
+    ),
     path(
         "client/workout-log/edit/",
-        client_workout_edit,
+        lazy_view("client.client_workout_edit"),
         name="client_workout_edit",
     ),
-    path("client/metrics/", client_metrics, name="client_metrics"),
-    path("client/support/", client_support, name="client_support"),
+    path(
+        "client/workout-log/api/sessions/",
+        lazy_view("client.client_workout_api_create"),
+        name="client_workout_api_create",
+    ),
+    path(
+        "client/workout-log/api/sessions/<int:session_id>/",
+        lazy_view("client.client_workout_api_update"),
+        name="client_workout_api_update",
+    ),
+    path(
+        "client/workout-log/api/sync/",
+        lazy_view("client.client_workout_api_sync"),
+        name="client_workout_api_sync",
+    ),
+    path(
+        "client/workout-log/sw.js",
+        lazy_view("client.client_workout_service_worker"),
+        name="client_workout_service_worker",
+    ),
+    path(
+        "client/workout-log/offline/",
+        lazy_view("client.client_workout_offline"),
+        name="client_workout_offline",
+    ),
+    path(
+        "client/metrics/",
+        lazy_view("client.client_metrics"),
+        name="client_metrics",
+    ),
+    path(
+        "client/support/",
+        lazy_view("support.client_support"),
+        name="client_support",
+    ),
     path(
         "client/support/tickets/",
-        client_support_tickets,
+        lazy_view("support.client_support_tickets"),
         name="client_support_tickets",
     ),
     path(
         "client/support/tickets/<int:ticket_id>/",
-        client_support_ticket_detail,
+        lazy_view("support.client_support_ticket_detail"),
         name="client_support_ticket_detail",
     ),
-    path("trainer/support/", trainer_support, name="trainer_support"),
+    path(
+        "trainer/support/",
+        lazy_view("support.trainer_support"),
+        name="trainer_support",
+    ),
     path(
         "trainer/support/<int:ticket_id>/",
-        trainer_support_ticket,
+        lazy_view("support.trainer_support_ticket"),
         name="trainer_support_ticket",
     ),
 
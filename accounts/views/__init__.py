@@ -0,0 +1,35 @@
+"""
+Account views, one module per area: client, trainer, owner, support and
+programmes.
+
+``accounts.urls`` routes to them through ``lazy_view``, so resolving the
+URLconf when a worker boots imports none of these modules. Each one,
+with the forms and services it uses, loads on its first request.
+"""
+
+import functools
+
+from django.utils.module_loading import import_string
+
+
+def lazy_view(dotted_path, **initkwargs):
+    """
+    A view that imports ``dotted_path`` ("<module>.<view>" within this
+    package) when first called. Class-based views are built with
+    ``as_view(**initkwargs)``.
+    """
+
+    @functools.cache
+    def load():
+        view = import_string(f"{__name__}.{dotted_path}")
+        if isinstance(view, type):
+            view = view.as_view(**initkwargs)
+        return view
+
+    def view(request, *args, **kwargs):
+        return load()(request, *args, **kwargs)
+
+    module, view.__name__ = dotted_path.rsplit(".", 1)
+    view.__module__ = f"{__name__}.{module}"
+    view.__qualname__ = view.__name__
+    return view
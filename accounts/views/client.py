@@ -0,0 +1,959 @@
+"""Client pages: login, dashboard, programme, workout log and metrics."""
+
+import datetime
+import json
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import LoginView
+from django.core.paginator import Paginator
+from django.db import IntegrityError
+from django.db.models import Avg
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from precision_performance.db_routers import replica_reads
+from training.forms import BodyMetricEntryForm, WorkoutSessionForm
+from training.models import (
+    BodyMetricEntry,
+    ClientProgramme,
+    PersonalRecord,
+    WorkoutSession,
+)
+from training.services.archive import with_archived_text
+from training.services.programme_snapshot import get_snapshots
+from training.services.tailored_programmes import apply_overrides
+
+from ..models import ClientProfile
+from ..services.page_versions import conditional_page
+from ..services.workout_log import (
+    MAX_SYNC_BATCH,
+    WorkoutLogError,
+    clean_entries,
+    count_sets,
+    entries_from_post,
+    log_session,
+    parse_key,
+    prepare_session,
+    resolve_day,
+    session_row,
+    sync_sessions,
+    update_session,
+)
+
+
+class ClientLoginView(LoginView):
+    """
+    Client login using Django's built-in authentication.
+    """
+
+    template_name = "accounts/client_login.html"
+
+    def get_success_url(self):
+        return reverse_lazy("accounts:client_dashboard")
+
+
+@login_required
+@conditional_page("clients", "programmes", "training_log")
+@replica_reads()
+def client_dashboard(request):
+    """
+    Dashboard for coaching clients.
+
+    Shows basic information from the linked ClientProfile and will later
+    surface programme, log, and metrics data.
+    """
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    profile = None
+    try:
+        profile = request.user.client_profile
+    except ClientProfile.DoesNotExist:
+        pass
+
+    active_assignment = (
+        ClientProgramme.objects.filter(
+            client=request.user,
+            status="active",
+        )
+        .select_related("block")
+        .order_by("-start_date", "-id")
+        .first()
+    )
+
+    plan = None
+    completed = False
+
+    if active_assignment and active_assignment.block:
+        block = active_assignment.block
+        days = list(block.programme_days().order_by("order"))
+
+        if days:
+            last_session = (
+                WorkoutSession.objects.filter(
+                    client=request.user,
+                    client_programme=active_assignment,
+                )
+                .select_related("programme_day")
+                .order_by(
+                    "-week_number",
+                    "-programme_day__order",
+                    "-date",
+                    "-id",
+                )
+                .first()
+            )
+
+            next_week = 1
+            next_day = days[0]
+
+            if last_session and last_session.programme_day:
+                current_day_order = last_session.programme_day.order or 0
+                next_week = last_session.week_number or 1
+
+                later_day = next(
+                    (
+                        d
+                        for d in days
+                        if (d.order or 0) > current_day_order
+                    ),
+                    None,
+                )
+
+                if later_day:
+                    next_day = later_day
+                else:
+                    if next_week < block.weeks:
+                        next_week += 1
+                        next_day = days[0]
+                    else:
+                        completed = True
+
+            if not completed:
+                start_url = reverse_lazy(
+                    "accounts:client_programme_library"
+                )
+                start_url = f"{start_url}?week={next_week}#day-{next_day.id}"
+
+                clean_name = next_day.name or ""
+                if clean_name.lower().startswith("day "):
+                    parts = clean_name.split("-", 1)
+                    if len(parts) == 2:
+                        clean_name = parts[1].strip()
+
+                plan = {
+                    "week": next_week,
+                    "day": next_day,
+                    "day_number": next_day.order or 1,
+                    "exercise_count": next_day.exercises.count(),
+                    "start_url": start_url,
+                    "day_display": clean_name,
+                }
+
+    context = {
+        "profile": profile,
+        "latest_sessions": [],
+        "latest_metrics": [],
+        "plan": plan,
+        "assignment": active_assignment,
+        "completed": completed,
+        "stats": {},
+        # Most recently improved lifts; one indexed lookup.
+        "personal_records": list(
+            PersonalRecord.objects.filter(client=request.user)
+            .select_related("exercise")
+            .order_by("-updated_at")[:5]
+        ),
+    }
+
+    since_date = timezone.localdate() - datetime.timedelta(days=7)
+    prev_start = since_date - datetime.timedelta(days=7)
+
+    sessions_completed = WorkoutSession.objects.filter(
+        client=request.user,
+        date__gte=since_date,
+    ).count()
+    sessions_prev = WorkoutSession.objects.filter(
+        client=request.user,
+        date__gte=prev_start,
+        date__lt=since_date,
+    ).count()
+
+    metrics_qs = BodyMetricEntry.objects.filter(
+        client=request.user,
+        date__gte=since_date,
+    )
+    sleep_avg = metrics_qs.aggregate(avg=Avg("sleep_hours")).get("avg")
+    sleep_prev = (
+        BodyMetricEntry.objects.filter(
+            client=request.user,
+            date__gte=prev_start,
+            date__lt=since_date,
+        ).aggregate(avg=Avg("sleep_hours")).get("avg")
+    )
+
+    latest_metric = (
+        BodyMetricEntry.objects.filter(client=request.user)
+        .order_by("-date", "-created_at")
+        .first()
+    )
+
+    latest_bodyweight = (
+        latest_metric.bodyweight_kg if latest_metric else None
+    )
+    latest_bench = (
+        latest_metric.bench_top_set_kg if latest_metric else None
+    )
+
+    prev_metric = (
+        BodyMetricEntry.objects.filter(
+            client=request.user,
+            date__gte=prev_start,
+            date__lt=since_date,
+        )
+        .order_by("-date", "-created_at")
+        .first()
+    )
+    prev_bodyweight = (
+        prev_metric.bodyweight_kg if prev_metric else None
+    )
+    prev_bench = prev_metric.bench_top_set_kg if prev_metric else None
+
+    def format_delta(delta, is_float=False, suffix=""):
+        if delta is None:
+            return "No comparison", "na"
+        if abs(delta) < 1e-9:
+            return "No change", "neutral"
+        direction = "Up" if delta > 0 else "Down"
+        magnitude = abs(delta)
+        if is_float:
+            mag_str = f"{magnitude:.1f}"
+        else:
+            mag_str = f"{int(magnitude)}"
+        return f"{direction} {mag_str}{suffix}", (
+            "up" if delta > 0 else "down"
+        )
+
+    sessions_delta_text, sessions_delta_class = format_delta(
+        sessions_completed - sessions_prev,
+        is_float=False,
+    )
+
+    sleep_delta = None
+    if sleep_avg is not None and sleep_prev is not None:
+        sleep_delta = sleep_avg - sleep_prev
+    sleep_delta_text, sleep_delta_class = format_delta(
+        sleep_delta,
+        is_float=True,
+        suffix=" h",
+    )
+
+    bw_delta = None
+    if latest_bodyweight is not None and prev_bodyweight is not None:
+        bw_delta = latest_bodyweight - prev_bodyweight
+    bw_delta_text, bw_delta_class = format_delta(
+        bw_delta,
+        is_float=True,
+        suffix=" kg",
+    )
+
+    bench_delta = None
+    if latest_bench is not None and prev_bench is not None:
+        bench_delta = latest_bench - prev_bench
+    bench_delta_text, bench_delta_class = format_delta(
+        bench_delta,
+        is_float=True,
+        suffix=" kg",
+    )
+
+    context["stats"] = {
+        "sessions": {
+            "value": sessions_completed,
+            "delta_text": sessions_delta_text,
+            "delta_class": sessions_delta_class,
+            "hint": "Last 7 days",
+        },
+        "sleep": {
+            "value": sleep_avg,
+            "delta_text": sleep_delta_text,
+            "delta_class": sleep_delta_class,
+            "hint": "Last 7 days",
+        },
+        "bodyweight": {
+            "value": latest_bodyweight,
+            "delta_text": bw_delta_text,
+            "delta_class": bw_delta_class,
+            "hint": "Most recent entry",
+        },
+        "bench": {
+            "value": latest_bench,
+            "delta_text": bench_delta_text,
+            "delta_class": bench_delta_class,
+            "hint": "Most recent entry",
+        },
+    }
+    return render(request, "client/dashboard.html", context)
+
+
+@login_required
+@conditional_page("clients", "programmes", "training_log")
+def client_today(request):
+    """Display the current day's training plan for the logged-in client."""
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    active_assignment = (
+        ClientProgramme.objects.filter(
+            client=request.user,
+            status="active",
+        )
+        .select_related("block")
+        .order_by("-start_date", "-id")
+        .first()
+    )
+
+    if not active_assignment or not active_assignment.block:
+        return render(
+            request,
+            "client/today.html",
+            {"plan": None, "assignment": None},
+        )
+
+    block = active_assignment.block
+    days = list(block.programme_days().order_by("order"))
+
+    if not days:
+        return render(
+            request,
+            "client/today.html",
+            {"plan": None, "assignment": active_assignment},
+        )
+
+    last_session = (
+        WorkoutSession.objects.filter(
+            client=request.user,
+            client_programme=active_assignment,
+        )
+        .select_related("programme_day")
+        .order_by("-week_number", "-programme_day__order", "-date", "-id")
+        .first()
+    )
+
+    next_week = 1
+    next_day = days[0]
+    completed = False
+
+    if last_session and last_session.programme_day:
+        current_day_order = last_session.programme_day.order or 0
+        next_week = last_session.week_number or 1
+
+        later_day = next(
+            (
+                d
+                for d in days
+                if (d.order or 0) > current_day_order
+            ),
+            None,
+        )
+
+        if later_day:
+            next_day = later_day
+        else:
+            if next_week < block.weeks:
+                next_week += 1
+                next_day = days[0]
+            else:
+                completed = True
+
+    if completed:
+        return render(
+            request,
+            "client/today.html",
+            {
+                "plan": None,
+                "assignment": active_assignment,
+                "completed": True,
+            },
+        )
+
+    start_url = reverse_lazy("accounts:client_programme_library")
+    start_url = f"{start_url}?week={next_week}#day-{next_day.id}"
+
+    clean_name = next_day.name or ""
+    if clean_name.lower().startswith("day "):
+        parts = clean_name.split("-", 1)
+        if len(parts) == 2:
+            clean_name = parts[1].strip()
+
+    plan = {
+        "week": next_week,
+        "day": next_day,
+        "day_number": next_day.order or 1,
+        "exercise_count": next_day.exercises.count(),
+        "start_url": start_url,
+        "day_display": clean_name,
+    }
+
+    return render(
+        request,
+        "client/today.html",
+        {
+            "plan": plan,
+            "assignment": active_assignment,
+            "completed": False,
+        },
+    )
+
+
+@login_required
+@conditional_page("clients", "programmes")
+def client_programme_library(request):
+    """
+    Show active programme assignments for the logged-in client,
+    including blocks, days, and exercises.
+    """
+    assignments = list(
+        ClientProgramme.objects.filter(client=request.user, status="active")
+        .select_related("block", "trainer")
+        .order_by("start_date", "block__name")
+    )
+    # Days and exercises come from the cached block snapshots.
+    snapshots = get_snapshots([a.block_id for a in assignments])
+    for assignment in assignments:
+        assignment.snapshot = snapshots.get(assignment.block_id)
+
+    context = {"assignments": assignments}
+    return render(request, "client/programme_library.html", context)
+
+
+@login_required
+@conditional_page("clients", "programmes", "training_log")
+def client_workout_log(request):
+    """
+    Client workout log page.
+
+    - Direct entry defaults to the first available ProgrammeDay.
+    - Days and exercises render from the cached block snapshots; saving
+      re-reads the selected day from the database.
+    - Saves via WorkoutSessionForm and compiles per-exercise inputs
+      into notes.
+    - Redirects back with ?day=<id> so the same exercises render after save.
+    """
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    initial = {}
+    session_name_param = (request.GET.get("session_name") or "").strip()
+    selected_week_param = request.GET.get("week") or request.POST.get("week")
+    selected_week = 1
+
+    active_assignments = (
+        ClientProgramme.objects.filter(client=request.user, status="active")
+        .select_related("block")
+        .order_by("start_date", "block__name")
+    )
+
+    snapshots = get_snapshots(
+        active_assignments.values_list("block_id", flat=True)
+    )
+    available_days = [
+        day
+        for snapshot in sorted(
+            snapshots.values(),
+            key=lambda snap: (snap["name"], snap["id"]),
+        )
+        for day in snapshot["days"]
+    ]
+
+    day_id = request.GET.get("day") or request.POST.get("day")
+    programme_day = None
+
+    if day_id and day_id.isdigit():
+        programme_day = next(
+            (day for day in available_days if day["id"] == int(day_id)),
+            None,
+        )
+
+    if programme_day is None and session_name_param:
+        programme_day = next(
+            (
+                day
+                for day in available_days
+                if day["name"] == session_name_param
+            ),
+            None,
+        )
+
+    if programme_day is None and available_days:
+        programme_day = available_days[0]
+
+    if programme_day:
+        programme_exercises = programme_day["exercises"]
+        initial["name"] = programme_day["name"]
+    else:
+        programme_exercises = []
+
+    if programme_day and selected_week_param and selected_week_param.isdigit():
+        selected_week = int(selected_week_param)
+    max_weeks = 6
+    if programme_day:
+        max_weeks = snapshots[programme_day["block_id"]]["weeks"]
+    if selected_week < 1:
+        selected_week = 1
+    if selected_week > max_weeks:
+        selected_week = max_weeks
+    week_options = list(range(1, max_weeks + 1))
+
+    session_qs = (
+        WorkoutSession.objects.filter(client=request.user)
+        .order_by("-date", "-created_at")
+    )
+    paginator = Paginator(session_qs, 5)
+    page_number = request.GET.get("page")
+    recent_sessions = paginator.get_page(page_number)
+    recent_sessions.object_list = with_archived_text(
+        recent_sessions.object_list
+    )
+
+    # Keep filters when paging (currently no extra filters on sessions list).
+    sessions_qs = request.GET.copy()
+    sessions_qs.pop("page", None)
+    sessions_base_qs = sessions_qs.urlencode()
+    sessions_base_qs = f"&{sessions_base_qs}" if sessions_base_qs else ""
+
+    if request.method == "POST":
+        post_data = request.POST.copy()
+
+        if programme_day:
+            post_data["name"] = programme_day["name"]
+
+        form = WorkoutSessionForm(post_data)
+
+        if form.is_valid():
+            try:
+                day = client_programme = None
+                exercises = []
+                if programme_day:
+                    day, client_programme, exercises = resolve_day(
+                        request.user, programme_day["id"]
+                    )
+                log_session(
+                    user=request.user,
+                    form=form,
+                    programme_day=day,
+                    client_programme=client_programme,
+                    week=selected_week,
+                    exercises=exercises,
+                    entries=entries_from_post(request.POST, exercises),
+                )
+            except WorkoutLogError as exc:
+                messages.error(request, next(iter(exc.errors.values())))
+                redirect_url = reverse_lazy("accounts:client_workout_log")
+                params = [
+                    f"day={programme_day['id']}",
+                    f"week={selected_week}",
+                ]
+                redirect_url = f"{redirect_url}?{'&'.join(params)}"
+                return redirect(redirect_url)
+
+            messages.success(request, "Workout session saved.")
+
+            redirect_url = reverse_lazy("accounts:client_workout_log")
+            query_bits = []
+            if programme_day:
+                query_bits.append(f"day={programme_day['id']}")
+            if selected_week:
+                query_bits.append(f"week={selected_week}")
+            if query_bits:
+                redirect_url = f"{redirect_url}?{'&'.join(query_bits)}"
+            return redirect(redirect_url)
+    else:
+        form = WorkoutSessionForm(initial=initial)
+
+    context = {
+        "sessions": recent_sessions,
+        "sessions_base_qs": sessions_base_qs,
+        "session_form": form,
+        "programme_day": programme_day,
+        "programme_exercises": programme_exercises,
+        "available_days": available_days,
+        "week_options": week_options,
+        "selected_week": selected_week,
+    }
+    return render(request, "client/workout_log.html", context)
+
+
+@login_required
+def client_workout_edit(request):
+    """
+    Handle edits to an existing workout session from the client modal.
+    Only updates sessions belonging to the logged-in user.
+    """
+    if request.method != "POST":
+        return redirect("accounts:client_workout_log")
+
+    session_id = request.POST.get("session_id")
+    if not session_id:
+        messages.error(request, "Missing workout session id.")
+        return redirect("accounts:client_workout_log")
+
+    session = get_object_or_404(
+        WorkoutSession,
+        pk=session_id,
+        client=request.user,
+    )
+    # Saving writes archived notes back, so load them first.
+    with_archived_text([session])
+
+    name_val = (request.POST.get("name") or "").strip()
+    notes_val = request.POST.get("notes")
+    status_val = (request.POST.get("status") or "").strip()
+
+    if name_val:
+        session.name = name_val
+
+    if notes_val is not None:
+        session.notes = notes_val
+
+    if status_val and hasattr(session, "status"):
+        session.status = status_val
+
+    session.save()
+    messages.success(request, "Workout session updated.")
+    return redirect("accounts:client_workout_log")
+
+
+def _json_body(request):
+    """Decoded JSON object from the request body, or None."""
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _json_errors(errors, status=400, **extra):
+    return JsonResponse({"errors": errors, **extra}, status=status)
+
+
+@login_required
+@require_POST
+def client_workout_api_create(request):
+    """
+    JSON: log a session and all of its sets in one request.
+
+    Body: {"day": id, "week": n, "date": "YYYY-MM-DD", "notes": "...",
+    "key": "<uuid>", "sets": [{"exercise_id": id, "weight_kg": 60,
+    "reps": [8, 8, 8]}]}
+
+    Returns only the new row (201), field errors (400) or, when the
+    week/day is already logged, the existing row (409). Repeating a
+    request with the same "key" returns the stored row (200).
+    """
+    if request.user.is_staff:
+        return _json_errors({"__all__": "Clients only."}, status=403)
+
+    data = _json_body(request)
+    if data is None:
+        return _json_errors({"__all__": "Invalid JSON body."})
+
+    key = parse_key(data.get("key"))
+    if key:
+        existing = WorkoutSession.objects.filter(
+            client=request.user,
+            idempotency_key=key,
+        ).first()
+        if existing:
+            return JsonResponse({"session": session_row(existing)})
+
+    try:
+        programme_day = client_programme = None
+        exercises = []
+        day_id = str(data.get("day") or "")
+        if day_id:
+            if not day_id.isdigit():
+                raise WorkoutLogError({"day": "Unknown programme day."})
+            programme_day, client_programme, exercises = resolve_day(
+                request.user, int(day_id)
+            )
+        form, week, entries = prepare_session(
+            data,
+            programme_day=programme_day,
+            client_programme=client_programme,
+            exercises=exercises,
+        )
+        session = log_session(
+            user=request.user,
+            form=form,
+            programme_day=programme_day,
+            client_programme=client_programme,
+            week=week,
+            exercises=exercises,
+            entries=entries,
+            idempotency_key=key,
+        )
+    except WorkoutLogError as exc:
+        extra = {}
+        if exc.session is not None:
+            extra["session"] = session_row(exc.session)
+        return _json_errors(exc.errors, status=exc.status, **extra)
+
+    return JsonResponse(
+        {"session": session_row(session, set_count=count_sets(entries))},
+        status=201,
+    )
+
+
+@login_required
+@require_POST
+def client_workout_api_sync(request):
+    """
+    JSON: store sessions queued offline by workout_log.js.
+
+    Body: {"sessions": [<create payload with "key" and "user">, ...]}.
+    Returns {"results": [...]} with one created/duplicate/conflict/invalid
+    result per session. Safe to retry: keys already stored come back as
+    duplicates.
+    """
+    if request.user.is_staff:
+        return _json_errors({"__all__": "Clients only."}, status=403)
+
+    data = _json_body(request)
+    items = data.get("sessions") if data else None
+    if not isinstance(items, list) or not all(
+        isinstance(item, dict) for item in items
+    ):
+        return _json_errors({"sessions": "Expected a list of sessions."})
+    if len(items) > MAX_SYNC_BATCH:
+        return _json_errors(
+            {"sessions": f"Send at most {MAX_SYNC_BATCH} sessions."},
+            status=413,
+        )
+
+    try:
+        results = sync_sessions(request.user, items)
+    except IntegrityError:
+        # Raced with another save; nothing was stored, so retry later.
+        return _json_errors(
+            {"__all__": "Sessions changed while syncing. Try again."},
+            status=409,
+        )
+    return JsonResponse({"results": results})
+
+
+def client_workout_service_worker(request):
+    """
+    Service worker for the workout log's offline queue. Served from
+    under client/workout-log/ so its scope covers that page.
+    """
+    response = render(
+        request,
+        "client/workout_sw.js",
+        content_type="application/javascript",
+    )
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+def client_workout_offline(request):
+    """
+    Page the service worker shows when the workout log can't be reached.
+    Rendered without the request so the cached copy is the same for
+    everyone.
+    """
+    response = HttpResponse(render_to_string("client/workout_offline.html"))
+    response["Cache-Control"] = "no-cache"
+    return response
+
+
+@login_required
+@require_POST
+def client_workout_api_update(request, session_id):
+    """
+    JSON: update one of the client's sessions.
+
+    Accepts any of "name", "status", "notes" and "sets" (same shape as
+    client_workout_api_create; replaces the stored sets). "notes"
+    replaces the client's notes and keeps the "Session details:" summary.
+    Returns the updated row.
+    """
+    session = get_object_or_404(
+        WorkoutSession.objects.select_related(
+            "programme_day",
+            "client_programme__block",
+        ),
+        pk=session_id,
+        client=request.user,
+    )
+    with_archived_text([session])
+    data = _json_body(request)
+    if data is None:
+        return _json_errors({"__all__": "Invalid JSON body."})
+
+    exercises = None
+    entries = None
+    try:
+        if "sets" in data:
+            exercises = []
+            if session.programme_day:
+                exercises = list(
+                    session.programme_day.exercises.order_by("order")
+                )
+                if session.client_programme:
+                    apply_overrides(session.client_programme.block, exercises)
+            entries = clean_entries(data["sets"], exercises)
+        update_session(session, data, exercises=exercises, entries=entries)
+    except WorkoutLogError as exc:
+        return _json_errors(exc.errors, status=exc.status)
+
+    return JsonResponse({"session": session_row(session)})
+
+
+@login_required
+@conditional_page("training_log")
+def client_metrics(request):
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    user = request.user
+
+    action = request.POST.get("action", "").strip().lower()
+
+    if request.method == "POST" and action in {"update", "delete"}:
+        entry_id = request.POST.get("entry_id")
+        entry = get_object_or_404(BodyMetricEntry, id=entry_id, client=user)
+
+        if action == "delete":
+            entry.delete()
+            messages.success(request, "Check-in deleted.")
+            return redirect("accounts:client_metrics")
+
+        form = BodyMetricEntryForm(request.POST, instance=entry)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Check-in updated.")
+            return redirect("accounts:client_metrics")
+    elif request.method == "POST":
+        form = BodyMetricEntryForm(request.POST)
+        if form.is_valid():
+            entry = form.save(commit=False)
+            entry.client = user
+            entry.save()
+            messages.success(request, "Body metrics check-in saved.")
+            return redirect("accounts:client_metrics")
+    else:
+        form = BodyMetricEntryForm(initial={"date": timezone.localdate()})
+
+    entries_qs = BodyMetricEntry.objects.filter(client=user).order_by(
+        "date",
+        "created_at",
+    )
+    entries = list(entries_qs)
+
+    def latest_and_change(field_name):
+        latest_entry = None
+        for e in reversed(entries):
+            value = getattr(e, field_name)
+            if value is not None:
+                latest_entry = e
+                break
+
+        if latest_entry is None:
+            return None, None
+
+        latest_value = getattr(latest_entry, field_name)
+        latest_date = latest_entry.date
+        cutoff = latest_date - datetime.timedelta(weeks=4)
+
+        baseline_entry = None
+        for e in entries:
+            if e.date <= cutoff and getattr(e, field_name) is not None:
+                baseline_entry = e
+
+        if baseline_entry is None:
+            change = None
+        else:
+            change = latest_value - getattr(baseline_entry, field_name)
+
+        return latest_value, change
+
+    summary_rows = []
+    metrics_spec = [
+        {
+            "label": "Bodyweight",
+            "field": "bodyweight_kg",
+            "unit": "kg",
+            "target_display": "77.5 kg",
+        },
+        {
+            "label": "Waist",
+            "field": "waist_cm",
+            "unit": "cm",
+            "target_display": "82 cm",
+        },
+        {
+            "label": "Bench top set",
+            "field": "bench_top_set_kg",
+            "unit": "kg",
+            "target_display": "62.5 kg x 8",
+        },
+        {
+            "label": "Sleep average",
+            "field": "sleep_hours",
+            "unit": "h",
+            "target_display": "7.5 h",
+        },
+    ]
+
+    for spec in metrics_spec:
+        latest, change = latest_and_change(spec["field"])
+        summary_rows.append(
+            {
+                "label": spec["label"],
+                "unit": spec["unit"],
+                "target_display": spec["target_display"],
+                "latest": latest,
+                "change": change,
+            }
+        )
+
+    recent_entries = BodyMetricEntry.objects.filter(client=user).order_by(
+        "-date",
+        "-created_at",
+    )[:5]
+
+    chart_entries = BodyMetricEntry.objects.filter(
+        client=user
+    ).order_by("date")
+    chart_labels = [entry.date.strftime("%d %b") for entry in chart_entries]
+
+    bodyweight_series = [
+        float(entry.bodyweight_kg) if entry.bodyweight_kg is not None else None
+        for entry in chart_entries
+    ]
+    bench_series = [
+        float(entry.bench_top_set_kg)
+        if entry.bench_top_set_kg is not None
+        else None
+        for entry in chart_entries
+    ]
+
+    has_bodyweight_data = any(v is not None for v in bodyweight_series)
+    has_bench_data = any(v is not None for v in bench_series)
+
+    context = {
+        "form": form,
+        "summary_rows": summary_rows,
+        "recent_entries": recent_entries,
+        "chart_labels_json": json.dumps(chart_labels),
+        "bodyweight_series_json": json.dumps(bodyweight_series),
+        "bench_series_json": json.dumps(bench_series),
+        "has_bodyweight_data": has_bodyweight_data,
+        "has_bench_data": has_bench_data,
+    }
+    return render(request, "client/metrics.html", context)
@@ -0,0 +1,21 @@
+"""Access checks shared by the account views."""
+
+from django.contrib.auth.decorators import user_passes_test
+
+
+def is_trainer(user):
+    """
+    For now we'll treat Django's is_staff flag as 'trainer / owner'.
+
+    Later we can upgrade this to Groups or custom roles
+    without changing the rest of the code.
+    """
+    return user.is_staff
+
+
+def staff_required(view_func):
+    # Must be defined before decorators are evaluated.
+    return user_passes_test(
+        lambda u: u.is_staff,
+        login_url="accounts:trainer_login",
+    )(view_func)
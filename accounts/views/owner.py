@@ -0,0 +1,292 @@
+"""Owner pages: analytics, contact queries and client management."""
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect, render
+
+from precision_performance.db_routers import replica_reads
+from training.models import ContactQuery
+from training.services.archive import archived_instance
+from training.services.cohort_analytics import owner_summary
+from training.services.support_sla import sla_report
+
+from ..services.client_deletion import request_client_deletion
+from ..services.consultation_assignment import bulk_assign_consultations
+from ..services.page_versions import conditional_page
+from .common import staff_required
+
+User = get_user_model()
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@replica_reads()
+def owner_dashboard(request):
+    """
+    Owner dashboard:
+    - Only superusers can access; other staff are redirected to the
+      trainer dashboard.
+    - Studio-wide analytics read from the daily rollups (refreshed by the
+      rollup_analytics command), so the page cost does not grow with
+      history.
+    - No conditional_page ETag: the SLA report's overdue tickets change
+      with the clock, not only with data writes.
+    """
+    if not request.user.is_superuser:
+        return redirect("accounts:trainer_dashboard")
+
+    context = owner_summary()
+    context["sla"] = sla_report()
+    context["current"] = "owner_dashboard"
+    return render(request, "owner/analytics.html", context)
+
+
+@conditional_page("leads", "clients")
+def owner_queries(request):
+    """
+    Owner-only list of incoming contact queries.
+    Shows newest first with optional status filter.
+    """
+    if not request.user.is_superuser:
+        return redirect("accounts:trainer_dashboard")
+
+    selected_status = request.GET.get("status", "new")
+    selected_assigned = request.GET.get("assigned", "all")
+    queries = ContactQuery.objects.all().order_by("-created_at")
+
+    if selected_status and selected_status != "all":
+        queries = queries.filter(status=selected_status)
+
+    # Trainers list for the "Assigned to" filter (non-superuser staff).
+    trainers = (
+        User.objects.filter(is_staff=True, is_superuser=False)
+        .order_by("first_name", "last_name", "username")
+    )
+
+    # Apply assigned filter to inbox queries.
+    if selected_assigned == "unassigned":
+        queries = queries.filter(assigned_trainer__isnull=True)
+    elif selected_assigned == "me":
+        queries = queries.filter(assigned_trainer=request.user)
+    elif selected_assigned.isdigit():
+        trainer_ids = set(trainers.values_list("id", flat=True))
+        if int(selected_assigned) in trainer_ids:
+            queries = queries.filter(
+                assigned_trainer_id=int(selected_assigned)
+            )
+        # Else ignore invalid id (fallback to all)
+
+    # Queries specifically assigned to the current owner for quick access.
+    my_queries = ContactQuery.objects.filter(
+        assigned_trainer=request.user
+    ).order_by("-created_at")
+
+    # Build base querystrings for each paginator (exclude page params).
+    qs_params = request.GET.copy()
+    qs_params.pop("inbox_page", None)
+    qs_params.pop("my_page", None)
+    inbox_base = qs_params.urlencode()
+    inbox_base = f"&{inbox_base}" if inbox_base else ""
+
+    my_qs_params = request.GET.copy()
+    my_qs_params.pop("my_page", None)
+    my_qs_params.pop("inbox_page", None)
+    my_base = my_qs_params.urlencode()
+    my_base = f"&{my_base}" if my_base else ""
+
+    # Paginate inbox and my-queries independently to avoid param clashes.
+    inbox_page_number = request.GET.get("inbox_page")
+    my_page_number = request.GET.get("my_page")
+
+    # Show 5 queries per page to keep lists compact.
+    inbox_paginator = Paginator(queries, 5)
+    my_paginator = Paginator(my_queries, 5)
+
+    inbox_page_obj = inbox_paginator.get_page(inbox_page_number)
+    my_page_obj = my_paginator.get_page(my_page_number)
+
+    context = {
+        "inbox_page_obj": inbox_page_obj,
+        "selected_status": selected_status,
+        "selected_assigned": selected_assigned,
+        "total_count": ContactQuery.objects.count(),
+        "my_page_obj": my_page_obj,
+        "inbox_base_qs": inbox_base,
+        "my_base_qs": my_base,
+        "trainers": trainers,
+        "current": "owner_queries",
+    }
+    return render(request, "owner/queries_inbox.html", context)
+
+
+@conditional_page("leads", "clients")
+def owner_query_detail(request, pk):
+    """
+    Owner-only detail page for a single contact query with assignment/status.
+    """
+    if not request.user.is_superuser:
+        return redirect("accounts:trainer_dashboard")
+
+    # Closed queries past ARCHIVE_AFTER_DAYS are read from the archive.
+    query = ContactQuery.objects.filter(pk=pk).first() or archived_instance(
+        ContactQuery, pk
+    )
+    if query is None:
+        raise Http404("No contact query matches the given query.")
+
+    # Build trainer list (staff users) so owners can assign queries.
+    trainers = (
+        User.objects.filter(is_staff=True)
+        .exclude(pk=request.user.pk)
+        .order_by("last_name", "first_name", "username")
+    )
+    # Exclude owner; the dropdown has a dedicated "Assign to me" option.
+
+    # Default selection: assigned trainer if present, otherwise "me".
+    selected_assign = (
+        query.assigned_trainer.pk if query.assigned_trainer else "me"
+    )
+
+    if request.method == "POST":
+        # Assign trainer: "me", user id, or blank to unassign.
+        assign_value = request.POST.get("assign_trainer", "").strip()
+        if assign_value == "me":
+            query.assigned_trainer = request.user
+        elif assign_value:
+            # Only allow ids in the trainer list.
+            trainer = trainers.filter(pk=assign_value).first()
+            query.assigned_trainer = trainer
+        else:
+            query.assigned_trainer = None
+
+        # Update status if provided and valid.
+        new_status = request.POST.get("status", "").strip()
+        valid_statuses = [choice[0] for choice in ContactQuery.STATUS_CHOICES]
+        if new_status in valid_statuses:
+            query.status = new_status
+
+        query.save()
+        messages.success(request, "Query updated.")
+        return redirect("accounts:owner_query_detail", pk=pk)
+
+    context = {
+        "query": query,
+        "trainers": trainers,
+        "status_choices": ContactQuery.STATUS_CHOICES,
+        "selected_assign": selected_assign,
+        "current": "owner_queries",
+    }
+    return render(request, "owner/query_detail.html", context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+def owner_bulk_assign_consultations(request):
+    """
+    Owner-only bulk action: assign the ticked consultations to one trainer
+    and report a results summary back on the dashboard.
+    """
+    if not request.user.is_superuser:
+        return HttpResponseForbidden("Only owners can bulk assign.")
+
+    if request.method != "POST":
+        return redirect("accounts:trainer_dashboard")
+
+    consultation_ids = [
+        int(value)
+        for value in request.POST.getlist("consultation_ids")
+        if value.isdigit()
+    ]
+    if not consultation_ids:
+        messages.error(request, "Select at least one consultation.")
+        return redirect("accounts:trainer_dashboard")
+
+    trainer_id = request.POST.get("trainer_id", "")
+    trainer_user = None
+    if trainer_id == "me":
+        trainer_user = request.user
+    elif trainer_id.isdigit():
+        trainer_user = User.objects.filter(
+            id=int(trainer_id),
+            is_staff=True,
+            is_superuser=False,
+        ).first()
+
+    if not trainer_user:
+        messages.error(request, "Please choose a valid trainer.")
+        return redirect("accounts:trainer_dashboard")
+
+    summary = bulk_assign_consultations(
+        request=request,
+        consultation_ids=consultation_ids,
+        trainer_user=trainer_user,
+    )
+
+    messages.success(
+        request,
+        (
+            f"Assigned {summary['assigned']} consultation(s); "
+            f"{summary['users_created']} account(s) created, "
+            f"{summary['invites_sent']} invite(s) sent."
+        ),
+    )
+    skipped = (
+        summary["skipped_group"]
+        + summary["skipped_taken"]
+        + summary["skipped_conflict"]
+    )
+    if skipped:
+        messages.warning(
+            request,
+            (
+                f"Skipped {skipped}: {summary['skipped_group']} group "
+                f"request(s), {summary['skipped_taken']} assigned to "
+                f"another trainer, {summary['skipped_conflict']} with a "
+                "conflicting username."
+            ),
+        )
+    if summary["invites_failed"]:
+        messages.warning(
+            request,
+            (
+                f"{summary['invites_failed']} invite(s) could not be sent. "
+                "Clients can use the Forgot password link."
+            ),
+        )
+    return redirect("accounts:trainer_dashboard")
+
+
+@login_required(login_url="accounts:trainer_login")
+def owner_delete_client(request, client_id):
+    """
+    Allow owner (superuser) to hard-delete a client and related records.
+    Trainers must never see this action. The account is deactivated at
+    once; its data is removed in the background (process_client_deletions)
+    and the progress shows on the clients page.
+    """
+    if not request.user.is_superuser:
+        return HttpResponseForbidden("Only owners can delete clients.")
+
+    client_user = get_object_or_404(User, id=client_id)
+
+    # Block deleting staff, other owners, or yourself.
+    if (
+        client_user.is_staff
+        or client_user.is_superuser
+        or client_user == request.user
+    ):
+        messages.error(request, "You cannot delete this account.")
+        return redirect("accounts:trainer_client_detail", client_id=client_id)
+
+    if request.method != "POST":
+        return HttpResponseForbidden("Invalid request method.")
+
+    request_client_deletion(client_user, request.user)
+    messages.success(
+        request,
+        "Client account deactivated and queued for deletion.",
+    )
+    return redirect("accounts:trainer_clients")
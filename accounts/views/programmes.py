@@ -0,0 +1,617 @@
+"""Programme library and programme detail pages for staff."""
+
+from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from training.models import (
+    ClientProgramme,
+    ConsultationRequest,
+    ProgrammeBlock,
+    ProgrammeExercise,
+)
+
+from ..models import ClientProfile
+from ..services.page_versions import conditional_page
+from ..services.programme_detail import (
+    ASSIGN_CONVERTED,
+    ASSIGN_CREATED,
+    ASSIGN_EXISTING,
+    ProgrammeDetail,
+    TailoredBlockFormSet,
+    assign_template,
+    tailor_assignment,
+)
+from .common import staff_required
+
+User = get_user_model()
+
+ASSIGN_MESSAGES = {
+    ASSIGN_EXISTING: (
+        messages.info,
+        "Client already has a tailored copy. Opening it.",
+    ),
+    ASSIGN_CONVERTED: (
+        messages.info,
+        "Existing template assignment converted to a tailored copy.",
+    ),
+    ASSIGN_CREATED: (
+        messages.success,
+        "Tailored programme copy created and assigned to client.",
+    ),
+}
+
+
+class ProgrammeDetailPage:
+    """
+    A programme block's detail page: the template, the assignments the
+    viewer may see and, for the selected one, its tailored copy. Handles
+    the page's forms (save exercises, assign a client, convert to a
+    tailored copy).
+
+    Subclasses supply the role rules: which assignments are listed, which
+    one is shown, who can be assigned and the extra context.
+    """
+
+    url_name = None
+    template_name = None
+
+    def __init__(self, request, block_id):
+        self.request = request
+        self.block = get_object_or_404(
+            ProgrammeBlock.objects.select_related("parent_template"),
+            id=block_id,
+        )
+        self.detail = ProgrammeDetail(self.block)
+        self.template_block = self.detail.template_block
+        self.assignments = self.visible_assignments()
+        self.assignment = None
+        self.exercise_formset = None
+
+    def visible_assignments(self):
+        raise NotImplementedError
+
+    def choose_assignment(self):
+        """Set ``self.assignment``, or return a redirect to one."""
+        raise NotImplementedError
+
+    def assignable_clients(self):
+        return []
+
+    def client_to_assign(self, client_id):
+        """(client user, None), or (None, error message)."""
+        raise NotImplementedError
+
+    def url_params(self):
+        """Query parameters every link back to the page keeps."""
+        return {}
+
+    def extra_context(self):
+        return {}
+
+    def url(self, block_id=None, anchor="", **params):
+        url = reverse(
+            f"accounts:{self.url_name}",
+            kwargs={"block_id": block_id or self.template_block.id},
+        )
+        query = {
+            key: value
+            for key, value in {**self.url_params(), **params}.items()
+            if value is not None
+        }
+        if query:
+            url = f"{url}?{urlencode(query)}"
+        if anchor:
+            url = f"{url}#{anchor}"
+        return url
+
+    def saved_url(self):
+        """Where to go once the exercises are saved."""
+        return self.url(
+            cp=self.assignment.id if self.assignment else None,
+            day=self.detail.selected_day.id
+            if self.detail.selected_day
+            else None,
+        )
+
+    def respond(self):
+        request = self.request
+        response = self.choose_assignment()
+        if response is not None:
+            return response
+
+        assignment = self.assignment
+        if assignment and not assignment.block.parent_template_id:
+            tailor_assignment(assignment, self.template_block, request.user)
+            return redirect(self.url(cp=assignment.id))
+
+        self.is_tailored = bool(
+            assignment
+            and assignment.block.parent_template_id == self.template_block.id
+        )
+        self.detail.select(assignment, request.GET.get("day"))
+        self.clients = self.assignable_clients()
+
+        if request.method == "POST":
+            response = self.post()
+            if response is not None:
+                return response
+        elif self.is_tailored:
+            self.exercise_formset = self.detail.exercise_formset()
+
+        return render(request, self.template_name, self.context())
+
+    def post(self):
+        """Handle the page's forms; None renders the page."""
+        request = self.request
+        if "save_exercises" in request.POST:
+            if not self.is_tailored:
+                return HttpResponseForbidden(
+                    "Template programmes cannot be edited. Assign to a "
+                    "client first."
+                )
+            self.exercise_formset = self.detail.exercise_formset(
+                request.POST
+            )
+            if self.exercise_formset.is_valid():
+                self.exercise_formset.save()
+                messages.success(request, "Tailored programme updated.")
+                return redirect(self.saved_url())
+            messages.error(request, "Please correct the errors below.")
+        elif "convert_to_tailored" in request.POST:
+            return self.convert()
+        elif not self.is_tailored:
+            return self.assign()
+        return None
+
+    def assign(self):
+        request = self.request
+        client_id_raw = request.POST.get(
+            "assign_client_id"
+        ) or request.POST.get("client_id")
+        if not (
+            "assign_to_client" in request.POST
+            or "assign_programme" in request.POST
+            or client_id_raw
+        ):
+            return None
+
+        try:
+            client_id = int(client_id_raw)
+        except (TypeError, ValueError):
+            messages.error(request, "Please select a client before assigning.")
+            return redirect(self.url())
+
+        client_user, error = self.client_to_assign(client_id)
+        if error:
+            messages.error(request, error)
+            return redirect(self.url())
+
+        assignment, outcome = assign_template(
+            self.template_block, request.user, client_user
+        )
+        notify, message = ASSIGN_MESSAGES[outcome]
+        notify(request, message)
+        return redirect(self.url(cp=assignment.id))
+
+    def convert(self):
+        request = self.request
+        assignment = self.assignment
+        if not assignment:
+            return HttpResponseForbidden("No assignment selected.")
+
+        if assignment.block.parent_template_id:
+            messages.info(request, "This client already has a tailored copy.")
+            return redirect(self.url(cp=assignment.id))
+
+        tailor_assignment(assignment, self.template_block, request.user)
+        messages.success(
+            request,
+            "Converted to tailored copy. You can now edit safely.",
+        )
+        return redirect(self.url(cp=assignment.id))
+
+    def context(self):
+        assignment = self.assignment
+        selected_day = self.detail.selected_day
+        return {
+            "block": self.template_block,
+            "days": self.detail.template_days,
+            "preview_days": self.detail.preview_days(),
+            "assignable_clients": self.clients,
+            "is_tailored": self.is_tailored,
+            "can_edit": self.is_tailored,
+            "assignment_client": assignment.client if assignment else None,
+            "assignment": assignment,
+            "selected_day_id": selected_day.id if selected_day else None,
+            "assignments": self.detail.by_client(self.assignments),
+            "selected_cp_id": assignment.id if assignment else None,
+            "tailored_days": self.detail.tailored_days,
+            "exercise_formset": self.exercise_formset,
+            **self.extra_context(),
+        }
+
+
+class TrainerProgrammeDetailPage(ProgrammeDetailPage):
+    """
+    Trainers see their own assignments, assign the clients of their
+    accepted consultations and can delete a tailored copy.
+    """
+
+    url_name = "trainer_programme_detail"
+    template_name = "trainer/programme_detail.html"
+
+    def visible_assignments(self):
+        self.allowed_emails = set()
+        return self.detail.assignments_for(trainer_id=self.request.user.id)
+
+    def choose_assignment(self):
+        if self.block.is_template:
+            return None
+        if not self.assignments:
+            raise Http404("Programme not found")
+        cp_param = self.request.GET.get("cp")
+        if cp_param and cp_param.isdigit():
+            self.assignment = self.detail.find(
+                self.assignments, int(cp_param)
+            )
+            return None
+        latest = self.detail.latest(self.assignments)
+        return redirect(self.url(cp=latest.id))
+
+    def assignable_clients(self):
+        if not self.block.is_template:
+            return []
+        # Source of truth: accepted 1:1/online consultations assigned to
+        # this trainer. The form posts User ids so the POST can resolve a
+        # User reliably.
+        consultations = ConsultationRequest.objects.filter(
+            assigned_trainer=self.request.user,
+            status=ConsultationRequest.STATUS_ASSIGNED,
+            coaching_option__in=["1to1", "online"],
+        ).order_by("-created_at")
+        self.allowed_emails = {
+            (c.email or "").strip().lower() for c in consultations if c.email
+        }
+        return list(
+            User.objects.filter(email__in=self.allowed_emails)
+            .filter(is_staff=False)
+            .order_by("first_name", "last_name", "username")
+        )
+
+    def client_to_assign(self, client_id):
+        client_user = User.objects.filter(id=client_id).first()
+        if not client_user:
+            return None, (
+                "Selected client could not be found. "
+                "Please refresh and try again."
+            )
+        allowed = self.request.user.is_superuser or (
+            client_user.email
+            and client_user.email.lower() in self.allowed_emails
+        )
+        if not allowed:
+            return None, "You are not allowed to assign this client."
+        return client_user, None
+
+    def saved_url(self):
+        # Stay on the tailored copy being edited and jump to the editor.
+        selected_day = self.detail.selected_day
+        return self.url(
+            block_id=self.block.id,
+            anchor="tailored-editor",
+            cp=self.assignment.id if self.assignment else None,
+            day=selected_day.id if selected_day else None,
+        )
+
+    def post(self):
+        request = self.request
+        if (
+            not self.block.is_template
+            and request.POST.get("action") == "delete"
+        ):
+            assignment = self.assignment
+            if not assignment or assignment.trainer_id != request.user.id:
+                raise Http404("Programme not found")
+            self.block.delete()
+            messages.success(request, "Tailored programme deleted.")
+            return redirect("accounts:trainer_programmes")
+        return super().post()
+
+    def extra_context(self):
+        is_template_block = self.block.is_template
+        return {
+            "is_template_block": is_template_block,
+            "tailored_client": None
+            if is_template_block or not self.assignment
+            else self.assignment.client,
+        }
+
+
+class OwnerProgrammeDetailPage(ProgrammeDetailPage):
+    """
+    Owners see every assignment, optionally filtered by trainer, and can
+    assign any client account.
+    """
+
+    url_name = "owner_programme_detail"
+    template_name = "owner/programme_detail.html"
+
+    def visible_assignments(self):
+        self.trainer_filter = self.request.GET.get("trainer", "all")
+        if self.trainer_filter == "me":
+            return self.detail.assignments_for(
+                trainer_id=self.request.user.id
+            )
+        if self.trainer_filter.isdigit():
+            return self.detail.assignments_for(
+                trainer_id=int(self.trainer_filter)
+            )
+        return self.detail.assignments_for()
+
+    def url_params(self):
+        return {"trainer": self.trainer_filter}
+
+    def choose_assignment(self):
+        cp_param = self.request.GET.get("cp")
+        if cp_param and cp_param.isdigit():
+            # Not found when the client no longer matches the filter.
+            self.assignment = self.detail.find(
+                self.assignments, int(cp_param)
+            )
+        if self.assignment is None and self.assignments:
+            latest = self.detail.latest(self.assignments)
+            return redirect(self.url(cp=latest.id))
+        return None
+
+    def assignable_clients(self):
+        # Any client with a profile; failing that, all non-staff users.
+        ordering = ("first_name", "last_name", "username")
+        return list(
+            User.objects.filter(client_profile__isnull=False).order_by(
+                *ordering
+            )
+        ) or list(User.objects.filter(is_staff=False).order_by(*ordering))
+
+    def client_to_assign(self, client_id):
+        client_user = get_object_or_404(User, id=client_id)
+        if client_user.is_staff or client_user.is_superuser:
+            return None, "Only client accounts can be assigned."
+        ClientProfile.objects.get_or_create(user=client_user)
+        return client_user, None
+
+    def extra_context(self):
+        return {
+            "trainer_filter": self.trainer_filter,
+            "trainer_options": User.objects.filter(
+                is_active=True, is_staff=True
+            ).order_by("first_name", "last_name", "username"),
+            "exercises_qs": self.detail.exercises,
+        }
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("programmes", "clients", "leads")
+def trainer_programme_detail(request, block_id):
+    """
+    Trainer view: show a programme block with its days/exercises,
+    allow assignment to a client (creates a tailored copy),
+    and allow editing exercises ONLY for tailored copies (assigned blocks).
+    """
+    return TrainerProgrammeDetailPage(request, block_id).respond()
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("programmes", "clients", "leads")
+def owner_programme_detail(request, block_id):
+    """
+    Owner view: show any programme block across all trainers/clients.
+    Only superusers should access this route.
+    """
+    if not request.user.is_superuser:
+        raise Http404("Owner view only")
+    return OwnerProgrammeDetailPage(request, block_id).respond()
+
+
+def _tailored_block(block_id):
+    """(tailored block, its assignment or None), or Http404."""
+    tailored_block = get_object_or_404(
+        ProgrammeBlock.objects.prefetch_related("days__exercises"),
+        id=block_id,
+        is_template=False,
+    )
+    client_programme = (
+        ClientProgramme.objects.filter(block=tailored_block)
+        .select_related("client", "trainer")
+        .first()
+    )
+    return tailored_block, client_programme
+
+
+def _tailored_programme_page(
+    request, tailored_block, client_programme, url_name, template_name
+):
+    """The editor for one tailored block, shared by trainers and owners."""
+    tailored_days = tailored_block.programme_days().order_by("order")
+    day_param = request.GET.get("day")
+    selected_day = None
+    if tailored_days:
+        if day_param and day_param.isdigit():
+            selected_day = tailored_days.filter(id=int(day_param)).first()
+        if selected_day is None:
+            selected_day = tailored_days.first()
+
+    exercises_qs = (
+        ProgrammeExercise.objects.filter(day=selected_day)
+        .select_related("day")
+        .order_by("order")
+        if selected_day
+        else ProgrammeExercise.objects.none()
+    )
+
+    if request.method == "POST" and "save_exercises" in request.POST:
+        exercise_formset = TailoredBlockFormSet(
+            request.POST,
+            queryset=exercises_qs,
+            prefix="ex",
+            block=tailored_block,
+        )
+        if exercise_formset.is_valid():
+            exercise_formset.save()
+            messages.success(request, "Tailored programme updated.")
+            redirect_url = reverse(
+                f"accounts:{url_name}",
+                kwargs={"block_id": tailored_block.id},
+            )
+            if selected_day:
+                redirect_url = f"{redirect_url}?day={selected_day.id}"
+            return redirect(redirect_url)
+        messages.error(request, "Please correct the errors below.")
+    else:
+        exercise_formset = TailoredBlockFormSet(
+            queryset=exercises_qs,
+            prefix="ex",
+            block=tailored_block,
+        )
+
+    context = {
+        "block": tailored_block,
+        "client_programme": client_programme,
+        "client_user": client_programme.client if client_programme else None,
+        "tailored_days": tailored_days,
+        "selected_day_id": selected_day.id if selected_day else None,
+        "exercise_formset": exercise_formset,
+        # Prefer base/template name when available; fallback to tailored
+        # block name.
+        "programme_title": tailored_block.parent_template.name
+        if tailored_block.parent_template
+        else tailored_block.name,
+    }
+    return render(request, template_name, context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("programmes", "clients")
+def owner_tailored_programme_detail(request, block_id):
+    """
+    Owner view: edit a tailored (non-template) programme block for a
+    specific client.
+    """
+    if not request.user.is_superuser:
+        raise Http404("Owner view only")
+    tailored_block, client_programme = _tailored_block(block_id)
+    return _tailored_programme_page(
+        request,
+        tailored_block,
+        client_programme,
+        "owner_tailored_programme_detail",
+        "owner/tailored_programme_detail.html",
+    )
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("programmes", "clients")
+def trainer_tailored_programme_detail(request, block_id):
+    """
+    Trainer view: edit a tailored (non-template) programme block assigned to
+    this trainer.
+    """
+    tailored_block, client_programme = _tailored_block(block_id)
+    if client_programme and client_programme.trainer != request.user:
+        raise Http404("Programme not found")
+    return _tailored_programme_page(
+        request,
+        tailored_block,
+        client_programme,
+        "trainer_tailored_programme_detail",
+        "trainer/tailored_programme_detail.html",
+    )
+
+
+@login_required
+@staff_member_required
+@conditional_page("programmes")
+def trainer_programmes(request):
+    """
+    Trainer view: high-level overview of programme blocks and templates.
+    Now driven by ProgrammeBlock records instead of static data.
+    """
+    if request.user.is_superuser:
+        active_blocks_qs = ProgrammeBlock.objects.filter(
+            is_template=False,
+            assignments__isnull=False,
+        ).distinct()
+    else:
+        active_blocks_qs = ProgrammeBlock.objects.filter(
+            is_template=False,
+            assignments__trainer=request.user,
+        ).distinct()
+
+    programme_blocks = []
+    for block in active_blocks_qs.select_related("parent_template"):
+        trainer_assignments = block.assignments.all()
+        if not request.user.is_superuser:
+            trainer_assignments = trainer_assignments.filter(
+                trainer=request.user
+            )
+
+        first_cp = trainer_assignments.order_by("-start_date", "-id").first()
+
+        programme_blocks.append(
+            {
+                "block": block,
+                "cp_id": first_cp.id if first_cp else None,
+                "clients": trainer_assignments.count(),
+                "phase": f"Weeks 1-{block.weeks}",
+                "status": "Active",
+                "next_action": "Review check-ins",
+            }
+        )
+
+    # Paginate active blocks to keep the table manageable.
+    # Show 5 active blocks per page to keep the table readable.
+    active_blocks_paginator = Paginator(programme_blocks, 5)
+    active_blocks_page = active_blocks_paginator.get_page(
+        request.GET.get("abp")
+    )
+
+    template_blocks_qs = (
+        ProgrammeBlock.objects.filter(is_template=True)
+        .annotate(assignments_count=Count("assignments"))
+        .filter(assignments_count=0)
+        .distinct()
+    )
+
+    programme_templates = [
+        {
+            "id": block.id,
+            "name": block.name,
+            "focus": block.description or "-",
+            "length": f"{block.weeks} weeks",
+        }
+        for block in template_blocks_qs
+    ]
+
+    context = {
+        "programme_blocks": programme_blocks,
+        "active_blocks_page": active_blocks_page,
+        "programme_templates": programme_templates,
+    }
+    # Owners see owner-branded template; trainers see trainer template.
+    template = (
+        "owner/programmes.html"
+        if request.user.is_superuser
+        else "trainer/programmes.html"
+    )
+    return render(request, template, context)
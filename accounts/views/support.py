@@ -0,0 +1,246 @@
+"""Support tickets, from both the client and the trainer side."""
+
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, redirect, render
+
+from training.models import SupportMessage, SupportTicket
+from training.services.archive import with_archived_text
+from training.services.support_sla import record_message, set_status
+
+from ..models import ClientProfile
+from ..services.page_versions import conditional_page
+
+
+@login_required
+@conditional_page("support", "clients")
+def client_support(request):
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    tickets = SupportTicket.objects.filter(
+        client=request.user,
+    ).order_by("-updated_at", "-created_at")
+
+    if request.method == "POST":
+        subject = request.POST.get("subject", "").strip()
+        message = request.POST.get("message", "").strip()
+
+        if subject and message:
+            trainer = None
+            profile = ClientProfile.objects.filter(user=request.user).first()
+            if profile:
+                trainer = profile.preferred_trainer
+
+            ticket = SupportTicket.objects.create(
+                client=request.user,
+                trainer=trainer,
+                subject=subject,
+                status=SupportTicket.STATUS_OPEN,
+            )
+            SupportMessage.objects.create(
+                ticket=ticket,
+                sender=request.user,
+                body=message,
+            )
+
+            success_text = (
+                "Support request sent to your coach."
+                if trainer
+                else "Support request sent."
+            )
+            messages.success(
+                request,
+                success_text,
+            )
+            return redirect("accounts:client_support")
+
+        messages.error(request, "Both subject and message are required.")
+
+    return render(
+        request,
+        "client/support.html",
+        {"tickets": tickets},
+    )
+
+
+@login_required
+@conditional_page("support")
+def client_support_tickets(request):
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    tickets = SupportTicket.objects.filter(
+        client=request.user,
+    ).order_by("-updated_at", "-created_at")
+
+    return render(
+        request,
+        "client/support_tickets.html",
+        {"tickets": tickets},
+    )
+
+
+@login_required
+@conditional_page("support")
+def client_support_ticket_detail(request, ticket_id):
+    if request.user.is_staff:
+        return redirect("accounts:trainer_dashboard")
+
+    ticket = get_object_or_404(
+        SupportTicket,
+        id=ticket_id,
+        client=request.user,
+    )
+
+    thread = SupportMessage.objects.filter(
+        ticket=ticket,
+    ).order_by("created_at")
+
+    if request.method == "POST":
+        action = request.POST.get("action", "").lower()
+
+        if action == "close":
+            set_status(ticket, SupportTicket.STATUS_CLOSED)
+            messages.success(request, "Ticket closed.")
+            return redirect(
+                "accounts:client_support_ticket_detail",
+                ticket_id=ticket.id,
+            )
+
+        body = request.POST.get("body", "").strip()
+        if not body:
+            messages.error(request, "Message cannot be empty.")
+            return redirect(
+                "accounts:client_support_ticket_detail",
+                ticket_id=ticket.id,
+            )
+
+        message = SupportMessage.objects.create(
+            ticket=ticket,
+            sender=request.user,
+            body=body,
+        )
+        record_message(ticket, message)
+        set_status(ticket, SupportTicket.STATUS_WAITING)
+
+        messages.success(request, "Reply sent.")
+        return redirect(
+            "accounts:client_support_ticket_detail",
+            ticket_id=ticket.id,
+        )
+
+    return render(
+        request,
+        "client/support_ticket_detail.html",
+        {
+            "ticket": ticket,
+            "thread": with_archived_text(thread),
+        },
+    )
+
+
+@login_required
+@conditional_page("support", "clients")
+def trainer_support(request):
+    if not request.user.is_staff:
+        return redirect("accounts:client_dashboard")
+
+    # Use SupportTicket.trainer as the assignment link to enforce privacy.
+    tickets_qs = SupportTicket.objects.filter(trainer=request.user)
+
+    tickets = tickets_qs.order_by("-updated_at", "-created_at")
+    status_counts = {
+        "open": tickets_qs.filter(status=SupportTicket.STATUS_OPEN).count(),
+        "waiting": tickets_qs.filter(
+            status=SupportTicket.STATUS_WAITING
+        ).count(),
+        "closed": tickets_qs.filter(
+            status=SupportTicket.STATUS_CLOSED
+        ).count(),
+    }
+
+    # Owners see owner-branded template; trainers see trainer template.
+    template = (
+        "owner/support_inbox.html"
+        if request.user.is_superuser
+        else "trainer/support_inbox.html"
+    )
+
+    return render(
+        request,
+        template,
+        {
+            "tickets": tickets,
+            "status_counts": status_counts,
+            "current": "trainer_support",
+        },
+    )
+
+
+@login_required
+@conditional_page("support", "clients")
+def trainer_support_ticket(request, ticket_id):
+    if not request.user.is_staff:
+        return redirect("accounts:client_dashboard")
+
+    # Same privacy rule: only the assigned trainer (owner counts as trainer)
+    # can view a ticket; others get 404 to avoid leaking existence.
+    ticket = get_object_or_404(
+        SupportTicket,
+        id=ticket_id,
+        trainer=request.user,
+    )
+
+    thread = (
+        SupportMessage.objects.filter(ticket=ticket)
+        .order_by("created_at")
+    )
+
+    if request.method == "POST":
+        action = request.POST.get("action", "").lower()
+        body = request.POST.get("body", "").strip()
+
+        if action == "reply":
+            if not body:
+                messages.error(request, "Message cannot be empty.")
+                return redirect(
+                    "accounts:trainer_support_ticket",
+                    ticket_id=ticket.id,
+                )
+
+            message = SupportMessage.objects.create(
+                ticket=ticket,
+                sender=request.user,
+                body=body,
+            )
+            record_message(ticket, message)
+            set_status(ticket, SupportTicket.STATUS_WAITING)
+            messages.success(request, "Reply sent.")
+
+        elif action == "close":
+            set_status(ticket, SupportTicket.STATUS_CLOSED)
+            messages.success(request, "Ticket closed.")
+
+        elif action == "reopen":
+            set_status(ticket, SupportTicket.STATUS_OPEN)
+            messages.success(request, "Ticket reopened.")
+
+        return redirect(
+            "accounts:trainer_support_ticket",
+            ticket_id=ticket.id,
+        )
+
+    return render(
+        request,
+        (
+            "owner/support_ticket_detail.html"
+            if request.user.is_superuser
+            else "trainer/support_ticket_detail.html"
+        ),
+        {
+            "ticket": ticket,
+            "thread": with_archived_text(thread),
+            "current": "trainer_support",
+        },
+    )
@@ -0,0 +1,676 @@
+"""Trainer pages: login, dashboard, queries, clients and sessions."""
+
+import datetime
+import json
+
+from django import forms
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import LoginView
+from django.core.paginator import Paginator
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.http import Http404, HttpResponseForbidden
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from precision_performance.db_routers import replica_reads
+from training.forms import BodyMetricEntryForm
+from training.models import (
+    BodyMetricEntry,
+    ConsultationRequest,
+    ContactQuery,
+    PersonalRecord,
+    WorkoutSession,
+)
+from training.services.archive import archived_instance, with_archived_text
+from training.services.weekly_summaries import current_week_summaries
+
+from ..services.client_deletion import recent_deletions
+from ..services.consultation_assignment import assign_consultation_to_trainer
+from ..services.page_versions import conditional_page
+from .common import staff_required
+
+User = get_user_model()
+
+
+class TrainerWorkoutSessionForm(forms.ModelForm):
+    class Meta:
+        model = WorkoutSession
+        fields = ["notes"]
+
+
+class TrainerLoginView(LoginView):
+    """
+    Trainer / owner login using Django's built-in authentication.
+    """
+
+    template_name = "accounts/trainer_login.html"
+
+    def get_success_url(self):
+        # Superusers (owners) should land on the populated overview
+        # (same as the sidebar "Overview" link).
+        if self.request.user.is_superuser:
+            return reverse_lazy("accounts:trainer_dashboard")
+        return reverse_lazy("accounts:trainer_dashboard")
+
+
+@conditional_page("leads", "clients")
+def trainer_queries(request):
+    """
+    Trainer-only list of contact queries assigned to them.
+    """
+    if not request.user.is_staff:
+        return redirect("accounts:client_dashboard")
+
+    selected_status = request.GET.get("status", "all")
+    queries = ContactQuery.objects.filter(
+        assigned_trainer=request.user
+    ).order_by("-created_at")
+
+    if selected_status and selected_status != "all":
+        queries = queries.filter(status=selected_status)
+
+    # Paginate trainer inbox (5 per page).
+    page_number = request.GET.get("page")
+    paginator = Paginator(queries, 5)
+    page_obj = paginator.get_page(page_number)
+
+    # Base qs for pagination links (exclude page param).
+    qs_params = request.GET.copy()
+    qs_params.pop("page", None)
+    base_qs = qs_params.urlencode()
+    base_qs = f"&{base_qs}" if base_qs else ""
+
+    context = {
+        "page_obj": page_obj,
+        "selected_status": selected_status,
+        "base_qs": base_qs,
+        "current": "trainer_queries",
+    }
+    return render(request, "trainer/queries_inbox.html", context)
+
+
+@conditional_page("leads", "clients")
+def trainer_query_detail(request, pk):
+    """
+    Trainer-only view of a single query assigned to them.
+    Trainers can update status but cannot reassign.
+    """
+    if not request.user.is_staff:
+        return redirect("accounts:client_dashboard")
+
+    # Closed queries past ARCHIVE_AFTER_DAYS are read from the archive.
+    query = ContactQuery.objects.filter(
+        pk=pk, assigned_trainer=request.user
+    ).first() or archived_instance(ContactQuery, pk)
+    if query is None or query.assigned_trainer_id != request.user.pk:
+        raise Http404("No contact query matches the given query.")
+
+    if request.method == "POST":
+        new_status = request.POST.get("status", "").strip()
+        valid_statuses = [choice[0] for choice in ContactQuery.STATUS_CHOICES]
+        if new_status in valid_statuses:
+            query.status = new_status
+            query.save()
+            messages.success(request, "Query updated.")
+        return redirect("accounts:trainer_query_detail", pk=pk)
+
+    context = {
+        "query": query,
+        "status_choices": ContactQuery.STATUS_CHOICES,
+        "current": "trainer_queries",
+    }
+    return render(request, "trainer/query_detail.html", context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("leads", "clients")
+@replica_reads()
+def trainer_dashboard(request):
+    """
+    Trainer dashboard:
+    - Shows latest consultation requests
+    - Includes a small stats summary pulled from the database
+    """
+    status_filter = request.GET.get("status", "open")
+
+    requests_qs = ConsultationRequest.objects.order_by("-created_at")
+    if status_filter == "open":
+        requests_qs = requests_qs.filter(
+            status=ConsultationRequest.STATUS_NEW
+        )
+    elif status_filter == "dealt":
+        requests_qs = requests_qs.filter(
+            status__in=[
+                ConsultationRequest.STATUS_ASSIGNED,
+                ConsultationRequest.STATUS_ADDED_CLASSES,
+            ]
+        )
+    paginator = Paginator(requests_qs, 5)
+    page_number = request.GET.get("page")
+    latest_requests = paginator.get_page(page_number)
+
+    # Keep filters when paging consultation requests.
+    req_params = request.GET.copy()
+    req_params.pop("page", None)
+    requests_base_qs = req_params.urlencode()
+    requests_base_qs = f"&{requests_base_qs}" if requests_base_qs else ""
+    total_requests = ConsultationRequest.objects.count()
+
+    coaching_breakdown = (
+        ConsultationRequest.objects.values("coaching_option")
+        .annotate(count=Count("id"))
+        .order_by("coaching_option")
+    )
+
+    choice_labels = dict(ConsultationRequest.COACHING_OPTION_CHOICES)
+    for row in coaching_breakdown:
+        row["label"] = choice_labels.get(
+            row["coaching_option"],
+            "Not specified",
+        )
+
+    classes_filter = request.GET.get("classes", "all")
+    base_classes_qs = ConsultationRequest.objects.filter(
+        status=ConsultationRequest.STATUS_ADDED_CLASSES,
+        coaching_option__in=["small_group", "large_group"],
+    ).order_by("-created_at")
+
+    current_classes_qs = base_classes_qs
+    if classes_filter == "small":
+        current_classes_qs = current_classes_qs.filter(
+            coaching_option="small_group"
+        )
+    elif classes_filter == "large":
+        current_classes_qs = current_classes_qs.filter(
+            coaching_option="large_group"
+        )
+
+    classes_paginator = Paginator(current_classes_qs, 5)
+    classes_page_number = request.GET.get("classes_page")
+    current_classes = classes_paginator.get_page(classes_page_number)
+
+    # Keep filters when paging current classes.
+    class_params = request.GET.copy()
+    class_params.pop("classes_page", None)
+    classes_base_qs = class_params.urlencode()
+    classes_base_qs = f"&{classes_base_qs}" if classes_base_qs else ""
+
+    total_classes_count = base_classes_qs.count()
+    small_count = base_classes_qs.filter(
+        coaching_option="small_group"
+    ).count()
+    large_count = base_classes_qs.filter(
+        coaching_option="large_group"
+    ).count()
+
+    context = {
+        "latest_requests": latest_requests,
+        "total_requests": total_requests,
+        "coaching_breakdown": coaching_breakdown,
+        "status_filter": status_filter,
+        "current_classes": current_classes,
+        "classes_filter": classes_filter,
+        "small_classes_count": small_count,
+        "large_classes_count": large_count,
+        "total_classes_count": total_classes_count,
+        "requests_base_qs": requests_base_qs,
+        "classes_base_qs": classes_base_qs,
+    }
+    if request.user.is_superuser:
+        # Trainer choices for the bulk-assign action on the owner view.
+        context["bulk_trainers"] = (
+            User.objects.filter(is_staff=True, is_superuser=False)
+            .order_by("first_name", "last_name", "username")
+        )
+    # Owners see owner-branded template; trainers see trainer template.
+    template = (
+        "owner/dashboard.html"
+        if request.user.is_superuser
+        else "trainer/dashboard.html"
+    )
+    return render(request, template, context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+def add_to_current_classes(request, pk):
+    """
+    Mark a consultation as added to current classes
+    (only for small/large group coaching options).
+    """
+    if request.method != "POST":
+        return redirect("accounts:trainer_dashboard")
+
+    consultation = get_object_or_404(ConsultationRequest, pk=pk)
+
+    if consultation.coaching_option not in ["small_group", "large_group"]:
+        messages.error(
+            request,
+            "Only group coaching requests can be added to classes.",
+        )
+        return redirect("accounts:trainer_consultation_detail", pk=pk)
+
+    consultation.status = ConsultationRequest.STATUS_ADDED_CLASSES
+    consultation.assigned_trainer = request.user
+    consultation.save()
+    messages.success(request, "Added to Current Classes.")
+    return redirect("accounts:trainer_consultation_detail", pk=pk)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("leads", "clients", "programmes", "training_log")
+def trainer_clients(request):
+    """Show one row per email for the trainer's assigned clients."""
+    trainer = request.user
+
+    client_type = request.GET.get("type", "all")
+    trainer_filter = request.GET.get("trainer", "all")
+    portal_filter = request.GET.get("portal", "all")
+
+    # Annotate each consultation with a portal user id if an account exists.
+    user_id_sq = User.objects.filter(
+        email__iexact=OuterRef("email")
+    ).values("id")[:1]
+    password_sq = User.objects.filter(
+        email__iexact=OuterRef("email")
+    ).values("password")[:1]
+
+    if request.user.is_superuser:
+        # Owners can view all trainers; start with all assigned clients.
+        base_qs = ConsultationRequest.objects.filter(
+            status=ConsultationRequest.STATUS_ASSIGNED,
+            coaching_option__in=["1to1", "online"],
+        )
+
+        # Apply trainer filter before type filter.
+        if trainer_filter == "me":
+            base_qs = base_qs.filter(assigned_trainer=request.user)
+        elif trainer_filter.isdigit():
+            base_qs = base_qs.filter(assigned_trainer_id=int(trainer_filter))
+        else:
+            # "all" keeps the queryset untouched.
+            pass
+    else:
+        base_qs = ConsultationRequest.objects.filter(
+            assigned_trainer=trainer,
+            status=ConsultationRequest.STATUS_ASSIGNED,
+            coaching_option__in=["1to1", "online"],
+        )
+
+    base_qs = base_qs.annotate(
+        portal_user_id=Subquery(user_id_sq),
+        portal_password=Subquery(password_sq),
+    ).order_by("-created_at")
+
+    # Portal filter before pagination:
+    # yes = usable password; no = missing or unusable.
+    if portal_filter == "yes":
+        base_qs = (
+            base_qs.filter(portal_password__isnull=False)
+            .exclude(portal_password__startswith="!")
+            .exclude(portal_password="")
+        )
+    elif portal_filter == "no":
+        base_qs = base_qs.filter(
+            Q(portal_password__isnull=True)
+            | Q(portal_password__startswith="!")
+            | Q(portal_password="")
+        )
+
+    if client_type == "online":
+        qs = base_qs.filter(coaching_option="online")
+    elif client_type == "1to1":
+        qs = base_qs.filter(coaching_option="1to1")
+    else:
+        qs = base_qs
+
+    # Paginate the filtered client list (5 per page).
+    paginator = Paginator(qs, 5)
+    page_number = request.GET.get("page")
+    clients_page = paginator.get_page(page_number)
+
+    # Build portal access links so trainers can share a working
+    # password-set URL without relying on email delivery.
+    portal_ids = [
+        req.portal_user_id
+        for req in clients_page
+        if getattr(req, "portal_user_id", None)
+    ]
+    users_by_id = {u.id: u for u in User.objects.filter(id__in=portal_ids)}
+    # This week's adherence for the page, from the weekly summaries.
+    summaries = current_week_summaries(portal_ids)
+
+    for req in clients_page:
+        user = users_by_id.get(getattr(req, "portal_user_id", None))
+        req.portal_user = user
+        req.week_summary = summaries.get(getattr(req, "portal_user_id", None))
+        req.portal_link = None
+        req.portal_username = None  # Clients log in using this username
+        # and their password.
+        # Portal access == account exists and has a usable password set.
+        req.portal_access = bool(user and user.has_usable_password())
+        if user:
+            uidb64 = urlsafe_base64_encode(force_bytes(user.pk))
+            token = default_token_generator.make_token(user)
+            path = reverse_lazy(
+                "password_reset_confirm",
+                kwargs={"uidb64": uidb64, "token": token},
+            )
+            req.portal_link = request.build_absolute_uri(path)
+            req.portal_username = user.username
+
+    # Keep filters when paging clients list.
+    client_params = request.GET.copy()
+    client_params.pop("page", None)
+    clients_base_qs = client_params.urlencode()
+    clients_base_qs = f"&{clients_base_qs}" if clients_base_qs else ""
+
+    # Owner already appears as "Me (...)", so exclude them to avoid duplicates.
+    trainer_options = (
+        User.objects.filter(is_active=True, is_staff=True)
+        .exclude(id=request.user.id)
+        .order_by("first_name", "last_name", "username")
+    )
+
+    context = {
+        "trainer": trainer,
+        "clients_page": clients_page,
+        "client_type": client_type,
+        "trainer_filter": trainer_filter,
+        "portal_filter": portal_filter,
+        "trainer_options": trainer_options,
+        "clients_base_qs": clients_base_qs,
+        "section": "clients",
+    }
+    if request.user.is_superuser:
+        # Progress of deletions started from the client detail page.
+        context["deletions"] = recent_deletions()
+    # Use owner template for superusers so branding stays consistent.
+    template = (
+        "owner/clients.html"
+        if request.user.is_superuser
+        else "trainer/clients.html"
+    )
+    return render(request, template, context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("leads", "clients")
+def trainer_consultation_detail(request, pk):
+    """
+    Detail view for a consultation request with assign-to-me action.
+    """
+    consultation = get_object_or_404(ConsultationRequest, pk=pk)
+
+    # Owners can assign to any trainer; trainers can only assign to themselves.
+    if (
+        request.method == "POST"
+        and request.user.is_superuser
+        and "assign_to_trainer" in request.POST
+    ):
+        trainer_id = request.POST.get("trainer_id")
+        trainer_user = None
+        if trainer_id and trainer_id.isdigit():
+            trainer_id_int = int(trainer_id)
+            if trainer_id_int == request.user.id:
+                # Allow owner to assign to themselves; still block other
+                # superusers.
+                trainer_user = request.user
+            else:
+                trainer_user = User.objects.filter(
+                    id=trainer_id_int,
+                    is_staff=True,
+                    is_superuser=False,
+                ).first()
+
+        if not trainer_user:
+            messages.error(request, "Please choose a valid trainer.")
+            return redirect("accounts:trainer_consultation_detail", pk=pk)
+
+        result = assign_consultation_to_trainer(
+            request=request,
+            consultation=consultation,
+            trainer_user=trainer_user,
+        )
+        level = getattr(
+            messages,
+            result["message_level"].upper(),
+            messages.INFO,
+        )
+        messages.add_message(
+            request,
+            level,
+            result["message"] or "Assigned to trainer.",
+        )
+        return redirect(result["redirect"])
+
+    if request.method == "POST" and "assign_to_me" in request.POST:
+        result = assign_consultation_to_trainer(
+            request=request,
+            consultation=consultation,
+            trainer_user=request.user,
+        )
+        level = getattr(
+            messages,
+            result["message_level"].upper(),
+            messages.INFO,
+        )
+        messages.add_message(request, level, result["message"])
+        return redirect(result["redirect"])
+
+    trainers = (
+        User.objects.filter(is_staff=True, is_superuser=False)
+        .order_by("first_name", "last_name", "username")
+        if request.user.is_superuser
+        else None
+    )
+
+    return render(
+        request,
+        "trainer/consultation_detail.html",
+        {"consultation": consultation, "trainers": trainers},
+    )
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("leads", "clients", "training_log", "programmes")
+def trainer_client_detail(request, client_id):
+    """Trainer-facing overview of a single client's workouts and metrics."""
+    trainer = request.user
+    client_user = get_object_or_404(User, id=client_id)
+
+    has_assignment = ConsultationRequest.objects.filter(
+        assigned_trainer=trainer,
+        email__iexact=client_user.email,
+    ).exists()
+
+    if not (has_assignment or trainer.is_superuser):
+        return HttpResponseForbidden("Not allowed to view this client.")
+
+    action = request.POST.get("action", "").strip().lower()
+    if request.method == "POST" and action in {"update", "delete"}:
+        entry_id = request.POST.get("entry_id")
+        entry = get_object_or_404(
+            BodyMetricEntry,
+            id=entry_id,
+            client=client_user,
+        )
+
+        if action == "delete":
+            entry.delete()
+            messages.success(request, "Check-in deleted.")
+            return redirect(
+                "accounts:trainer_client_detail",
+                client_id=client_user.id,
+            )
+
+        form = BodyMetricEntryForm(request.POST, instance=entry)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Check-in updated.")
+            return redirect(
+                "accounts:trainer_client_detail",
+                client_id=client_user.id,
+            )
+
+    workouts = with_archived_text(
+        WorkoutSession.objects.filter(client=client_user).order_by(
+            "-date",
+            "-id",
+        )[:5]
+    )
+
+    entries_qs = BodyMetricEntry.objects.filter(
+        client=client_user
+    ).order_by("date")
+    entries = list(entries_qs)
+
+    chart_labels = [entry.date.strftime("%d %b") for entry in entries]
+    bodyweight_values = []
+    bench_values = []
+
+    for entry in entries:
+        bw = entry.bodyweight_kg
+        bt = entry.bench_top_set_kg
+        bodyweight_values.append(float(bw) if bw is not None else None)
+        bench_values.append(float(bt) if bt is not None else None)
+
+    has_bodyweight_data = any(v is not None for v in bodyweight_values)
+    has_bench_data = any(v is not None for v in bench_values)
+
+    recent_entries = BodyMetricEntry.objects.filter(
+        client=client_user
+    ).order_by(
+        "-date",
+        "-created_at",
+    )[:5]
+
+    latest = entries_qs.order_by("-date", "-created_at").first()
+    four_weeks_ago = timezone.now().date() - datetime.timedelta(weeks=4)
+    earlier = entries_qs.filter(date__lte=four_weeks_ago).order_by(
+        "-date",
+        "-created_at",
+    ).first()
+
+    def latest_or_dash(entry, field, suffix=""):
+        if entry is None:
+            return "—"
+        val = getattr(entry, field, None)
+        if val is None:
+            return "—"
+        return f"{val}{suffix}"
+
+    def change_or_dash(lat_entry, early_entry, field, suffix=""):
+        if lat_entry is None or early_entry is None:
+            return "—"
+        lat_val = getattr(lat_entry, field, None)
+        early_val = getattr(early_entry, field, None)
+        if lat_val is None or early_val is None:
+            return "—"
+        diff = lat_val - early_val
+        sign = "+" if diff > 0 else ""
+        if suffix.strip() == "h":
+            formatted = f"{diff:.2f}"
+        else:
+            formatted = f"{diff:.1f}"
+        return f"{sign}{formatted}{suffix}"
+
+    summary_rows = [
+        {
+            "label": "Bodyweight",
+            "latest": latest_or_dash(latest, "bodyweight_kg", " kg"),
+            "change": change_or_dash(latest, earlier, "bodyweight_kg", " kg"),
+            "target": "77.5 kg",
+        },
+        {
+            "label": "Waist",
+            "latest": latest_or_dash(latest, "waist_cm", " cm"),
+            "change": change_or_dash(latest, earlier, "waist_cm", " cm"),
+            "target": "82 cm",
+        },
+        {
+            "label": "Bench top set",
+            "latest": latest_or_dash(latest, "bench_top_set_kg", " kg"),
+            "change": change_or_dash(
+                latest,
+                earlier,
+                "bench_top_set_kg",
+                " kg",
+            ),
+            "target": "62.5 kg x 8",
+        },
+        {
+            "label": "Sleep average",
+            "latest": latest_or_dash(latest, "sleep_hours", " h"),
+            "change": change_or_dash(latest, earlier, "sleep_hours", " h"),
+            "target": "7.5 h",
+        },
+    ]
+
+    context = {
+        "trainer": trainer,
+        "client": client_user,
+        "workouts": workouts,
+        "recent_entries": recent_entries,
+        "summary_rows": summary_rows,
+        "chart_labels_json": json.dumps(chart_labels),
+        "bodyweight_series_json": json.dumps(bodyweight_values),
+        "bench_series_json": json.dumps(bench_values),
+        "has_bodyweight_data": has_bodyweight_data,
+        "has_bench_data": has_bench_data,
+        "personal_records": PersonalRecord.objects.filter(
+            client=client_user
+        ).select_related("exercise"),
+    }
+    return render(request, "trainer/client_detail.html", context)
+
+
+@login_required(login_url="accounts:trainer_login")
+@staff_required
+@conditional_page("training_log", "leads")
+def trainer_session_edit(request, session_id):
+    """Allow a trainer to tweak a client's workout session (notes only)."""
+    session = get_object_or_404(WorkoutSession, id=session_id)
+    with_archived_text([session])
+    trainer = request.user
+
+    has_assignment = ConsultationRequest.objects.filter(
+        assigned_trainer=trainer,
+        email__iexact=session.client.email,
+    ).exists()
+
+    if not (has_assignment or trainer.is_superuser):
+        return HttpResponseForbidden("Not allowed to edit this session.")
+
+    if request.method == "POST":
+        form = TrainerWorkoutSessionForm(request.POST, instance=session)
+        if form.is_valid():
+            form.save()
+            messages.success(request, "Session updated.")
+            return redirect(
+                "accounts:trainer_client_detail",
+                client_id=session.client_id,
+            )
+    else:
+        form = TrainerWorkoutSessionForm(instance=session)
+
+    return render(
+        request,
+        "trainer/session_edit.html",
+        {
+            "trainer": trainer,
+            "client": session.client,
+            "session": session,
+            "form": form,
+        },
+    )
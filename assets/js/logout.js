@@ -0,0 +1,39 @@
+/* jshint esversion: 11 */
+// Logging out deletes what the workout log keeps on this device: the
+// service worker's caches and the offline queue (workout_queue.js), so
+// the next person to log in never sees or sends them.
+(() => {
+  const clearWorkoutCaches = () =>
+    "caches" in window
+      ? caches
+          .keys()
+          .then((keys) =>
+            Promise.all(
+              keys
+                .filter((key) => key.startsWith("workout-log-"))
+                .map((key) => caches.delete(key))
+            )
+          )
+      : Promise.resolve();
+
+  const clearWorkoutQueue = () =>
+    new Promise((resolve) => {
+      if (!window.indexedDB) {
+        resolve();
+        return;
+      }
+      const request = window.indexedDB.deleteDatabase("pp-workout-log");
+      request.onsuccess = request.onerror = request.onblocked = () => resolve();
+    });
+
+  document.addEventListener("submit", (event) => {
+    const form = event.target;
+    if (!form.matches("form[data-logout]")) return;
+
+    event.preventDefault();
+    Promise.all([clearWorkoutCaches(), clearWorkoutQueue()])
+      .catch(() => {})
+      // form.submit() sends the form without firing this handler again.
+      .then(() => form.submit());
+  });
+})();
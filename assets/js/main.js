@@ -78,7 +78,6 @@
     }
   };
 
- let currentVisualClass = null;
   let lastFocusedElement = null;
 
   function setContent(programId) {
@@ -95,12 +94,11 @@
       listEl.appendChild(li);
     });
 
-    if (currentVisualClass) {
-      visual.classList.remove(currentVisualClass);
-    }
-    if (data.visualClass) {
-      visual.classList.add(data.visualClass);
-      currentVisualClass = data.visualClass;
+    // Show the card's responsive photo (same srcset) in the visual panel.
+    visual.replaceChildren();
+    const cardPicture = document.querySelector(`.${data.visualClass} picture`);
+    if (cardPicture) {
+      visual.appendChild(cardPicture.cloneNode(true));
     }
   }
 
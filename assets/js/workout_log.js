@@ -23,6 +23,10 @@
         // Fill the modal fields using row data attributes.
         function openModalFromRow(row) {
             const sessionId = row.dataset.sessionId;
+            if (!sessionId) {
+                // Still queued on this device; nothing to edit yet.
+                return;
+            }
             const sessionName = row.dataset.sessionName || "";
             const sessionStatus = row.dataset.sessionStatus || "logged";
             const sessionNotes = row.dataset.sessionNotes || "";
@@ -44,15 +48,18 @@
             document.body.classList.remove("no-scroll");
         }
 
-        // Open modal from the "Open" link in the session list.
-        document.querySelectorAll(".js-open-session").forEach(function (btn) {
-            btn.addEventListener("click", function (event) {
-                event.preventDefault();
-                const row = btn.closest("tr");
-                if (row) {
-                    openModalFromRow(row);
-                }
-            });
+        // Open modal from the "Open" link in the session list (delegated so
+        // rows added after an async save work too).
+        document.addEventListener("click", function (event) {
+            const btn = event.target.closest(".js-open-session");
+            if (!btn) {
+                return;
+            }
+            event.preventDefault();
+            const row = btn.closest("tr");
+            if (row) {
+                openModalFromRow(row);
+            }
         });
 
         // Close modal from any close control.
@@ -168,5 +175,358 @@
 
         updateExerciseWrap();
         mq.addEventListener("change", updateExerciseWrap);
+
+        // ---- Async saves through the workout log JSON API ----
+        const csrfInput = document.querySelector(
+            "input[name=csrfmiddlewaretoken]"
+        );
+        const sessionRows = document.querySelector("[data-session-rows]");
+        const logForm = document.querySelector(
+            ".workout-log-form[data-api-url]"
+        );
+        const modalForm = document.querySelector(
+            ".session-modal-form[data-api-url]"
+        );
+        const pageSize = 5;
+
+        // POST a JSON body; resolves with the status and decoded reply.
+        const postJson = (url, payload) =>
+            fetch(url, {
+                method: "POST",
+                credentials: "same-origin",
+                headers: {
+                    "Content-Type": "application/json",
+                    "X-CSRFToken": csrfInput ? csrfInput.value : "",
+                },
+                body: JSON.stringify(payload),
+            }).then((response) =>
+                response.json().then((data) => ({
+                    status: response.status,
+                    data: data,
+                }))
+            );
+
+        const firstError = (errors) => {
+            const values = Object.values(errors || {});
+            return values.length
+                ? values[0]
+                : "Something went wrong. Please try again.";
+        };
+
+        const truncate = (text, length) =>
+            text.length > length ? `${text.slice(0, length - 1)}…` : text;
+
+        // Fill a recent-sessions row from an API session object.
+        const fillRow = (row, session) => {
+            row.dataset.sessionId = session.id;
+            row.dataset.sessionName = session.name;
+            row.dataset.sessionDate = session.date;
+            row.dataset.sessionStatus = session.status;
+            row.dataset.sessionNotes = session.notes;
+
+            const cells = [
+                ["session-cell", session.name],
+                ["date-cell nowrap", session.date_display],
+                ["nowrap", session.status_display],
+                ["notes-cell", truncate(session.notes || "", 60)],
+            ];
+            row.textContent = "";
+            cells.forEach(([className, text]) => {
+                const td = document.createElement("td");
+                td.className = className;
+                td.textContent = text;
+                row.appendChild(td);
+            });
+
+            const actionCell = document.createElement("td");
+            actionCell.className = "action-cell nowrap";
+            const link = document.createElement("a");
+            link.href = "#";
+            link.className = "text-link js-open-session";
+            link.textContent = "Open";
+            actionCell.appendChild(link);
+            row.appendChild(actionCell);
+        };
+
+        const prependRow = (session) => {
+            if (!sessionRows) {
+                return;
+            }
+            const emptyRow = sessionRows.querySelector("[data-empty-row]");
+            if (emptyRow) {
+                emptyRow.remove();
+            }
+            const row = document.createElement("tr");
+            fillRow(row, session);
+            sessionRows.prepend(row);
+            while (sessionRows.rows.length > pageSize) {
+                sessionRows.deleteRow(-1);
+            }
+        };
+
+        if (logForm && window.fetch) {
+            const statusEl = logForm.querySelector("[data-workout-status]");
+            const submitBtn = logForm.querySelector("[type=submit]");
+            const fieldValue = (name) => {
+                const field = logForm.elements.namedItem(name);
+                return field ? field.value : "";
+            };
+
+            const showStatus = (message, level) => {
+                if (!statusEl) {
+                    return;
+                }
+                statusEl.textContent = message;
+                statusEl.className =
+                    `form-status site-message site-message--${level}`;
+            };
+
+            // One entry per exercise: weight plus reps for every set.
+            const buildPayload = () => {
+                const sets = [];
+                workoutRows.forEach((row) => {
+                    const exId = row.dataset.exId;
+                    const parsed = parseSetsReps(
+                        fieldValue(`ex_${exId}_sets_reps`),
+                        parseInt(row.dataset.targetSets || "0", 10),
+                        parseInt(row.dataset.targetReps || "0", 10)
+                    );
+                    sets.push({
+                        exercise_id: parseInt(exId, 10),
+                        weight_kg: fieldValue(`ex_${exId}_weight`),
+                        reps: parsed.reps
+                            ? Array(parsed.sets).fill(parsed.reps)
+                            : [],
+                    });
+                });
+                return {
+                    day: fieldValue("day"),
+                    week: fieldValue("week"),
+                    date: fieldValue("date"),
+                    notes: fieldValue("notes"),
+                    sets: sets,
+                };
+            };
+
+            const queue = window.WorkoutQueue && window.indexedDB
+                ? window.WorkoutQueue
+                : null;
+            const syncUrl = logForm.dataset.syncUrl;
+            const userId = logForm.dataset.userId;
+
+            // Client-generated idempotency key for each logged session.
+            const newKey = () => {
+                if (window.crypto && window.crypto.randomUUID) {
+                    return window.crypto.randomUUID();
+                }
+                return "10000000-1000-4000-8000-100000000000".replace(
+                    /[018]/g,
+                    (c) =>
+                        (
+                            c ^
+                            (Math.random() * 16) >> (c / 4)
+                        ).toString(16)
+                );
+            };
+
+            // Row shown for a session waiting in the offline queue.
+            const showQueuedRow = (item) => {
+                const dateParts = (item.payload.date || "").split("-");
+                prependRow({
+                    id: "",
+                    name: item.name || "Workout session",
+                    date: item.payload.date,
+                    date_display: dateParts.reverse().join("/"),
+                    status: "logged",
+                    status_display: "Waiting to sync",
+                    notes: item.payload.notes || "",
+                });
+                if (sessionRows && sessionRows.rows.length) {
+                    sessionRows.rows[0].dataset.pendingKey = item.key;
+                }
+            };
+
+            const handleSyncResults = (results) => {
+                let synced = 0;
+                results.forEach((result) => {
+                    const row = sessionRows
+                        ? sessionRows.querySelector(
+                              `tr[data-pending-key="${result.key}"]`
+                          )
+                        : null;
+                    if (
+                        result.status === "created" ||
+                        result.status === "duplicate"
+                    ) {
+                        synced += 1;
+                        if (row) {
+                            fillRow(row, result.session);
+                            delete row.dataset.pendingKey;
+                        }
+                    } else {
+                        if (row) {
+                            row.remove();
+                        }
+                        showStatus(firstError(result.errors), "error");
+                    }
+                });
+                if (synced) {
+                    showStatus(
+                        `${synced} offline session${synced > 1 ? "s" : ""} ` +
+                            "synced.",
+                        "success"
+                    );
+                }
+            };
+
+            const flushQueue = () => {
+                if (!queue || !syncUrl) {
+                    return;
+                }
+                queue
+                    .flush(
+                        syncUrl,
+                        csrfInput ? csrfInput.value : "",
+                        userId
+                    )
+                    .then(handleSyncResults)
+                    .catch(() => {
+                        // Still offline; the queue is kept for next time.
+                    });
+            };
+
+            // Prefer background sync so the queue flushes even after the
+            // page is closed; otherwise flush when the page is online.
+            const requestSync = () => {
+                if (!("serviceWorker" in navigator)) {
+                    return;
+                }
+                navigator.serviceWorker.ready.then((registration) => {
+                    if (registration.sync) {
+                        registration.sync.register(queue.SYNC_TAG);
+                    }
+                });
+            };
+
+            const queueSession = (payload) => {
+                payload.user = userId;
+                const item = {
+                    key: payload.key,
+                    user: userId,
+                    payload: payload,
+                    name: logForm.dataset.sessionName,
+                    csrf: csrfInput ? csrfInput.value : "",
+                    queuedAt: new Date().toISOString(),
+                };
+                return queue.add(item).then(() => {
+                    showQueuedRow(item);
+                    showStatus(
+                        "You're offline - the session is saved on this " +
+                            "device and will sync automatically.",
+                        "info"
+                    );
+                    requestSync();
+                });
+            };
+
+            logForm.addEventListener("submit", (event) => {
+                event.preventDefault();
+                if (submitBtn) {
+                    submitBtn.disabled = true;
+                }
+                const payload = buildPayload();
+                payload.key = newKey();
+                postJson(logForm.dataset.apiUrl, payload)
+                    .then(({ status, data }) => {
+                        if (status === 201 || status === 200) {
+                            prependRow(data.session);
+                            showStatus("Workout session saved.", "success");
+                            const notes = logForm.elements.namedItem("notes");
+                            if (notes) {
+                                notes.value = "";
+                            }
+                        } else {
+                            showStatus(firstError(data.errors), "error");
+                        }
+                    })
+                    .catch((error) => {
+                        // fetch() rejects with a TypeError when offline.
+                        if (queue && error instanceof TypeError) {
+                            return queueSession(payload);
+                        }
+                        // Unexpected reply: use the page form instead.
+                        logForm.submit();
+                    })
+                    .finally(() => {
+                        if (submitBtn) {
+                            submitBtn.disabled = false;
+                        }
+                    });
+            });
+
+            if (queue) {
+                if ("serviceWorker" in navigator && logForm.dataset.swUrl) {
+                    navigator.serviceWorker
+                        .register(logForm.dataset.swUrl)
+                        .catch(() => {
+                            // Offline queue still works while the page is open.
+                        });
+                    navigator.serviceWorker.addEventListener(
+                        "message",
+                        (event) => {
+                            if (event.data && event.data.type === "workout-sync") {
+                                handleSyncResults(event.data.results || []);
+                            }
+                        }
+                    );
+                }
+                queue
+                    .all(userId)
+                    .then((items) => items.forEach(showQueuedRow))
+                    .then(() => {
+                        if (navigator.onLine) {
+                            flushQueue();
+                        }
+                    })
+                    .catch(() => {
+                        // IndexedDB unavailable (e.g. private mode).
+                    });
+                window.addEventListener("online", flushQueue);
+            }
+        }
+
+        if (modalForm && window.fetch) {
+            modalForm.addEventListener("submit", (event) => {
+                event.preventDefault();
+                const sessionId = idField.value;
+                const url = modalForm.dataset.apiUrl.replace(
+                    /0\/$/,
+                    `${sessionId}/`
+                );
+                postJson(url, {
+                    name: nameField.value,
+                    status: statusField.value,
+                    notes: notesField.value,
+                })
+                    .then(({ status, data }) => {
+                        if (status !== 200) {
+                            throw new Error(firstError(data.errors));
+                        }
+                        const row = sessionRows
+                            ? sessionRows.querySelector(
+                                  `tr[data-session-id="${sessionId}"]`
+                              )
+                            : null;
+                        if (row) {
+                            fillRow(row, data.session);
+                        }
+                        closeModal();
+                    })
+                    .catch(() => {
+                        // Let the page form report the problem.
+                        modalForm.submit();
+                    });
+            });
+        }
     });
 })();
@@ -0,0 +1,109 @@
+/* jshint esversion: 11 */
+/* IndexedDB queue of workout sessions saved while offline.
+   Shared by workout_log.js and the workout log service worker. */
+(function (scope) {
+    // logout.js deletes this database by name.
+    const DB_NAME = "pp-workout-log";
+    const STORE = "queue";
+    // Matches MAX_SYNC_BATCH on the server.
+    const MAX_BATCH = 50;
+
+    const openDb = () =>
+        new Promise((resolve, reject) => {
+            const request = scope.indexedDB.open(DB_NAME, 1);
+            request.onupgradeneeded = () => {
+                request.result.createObjectStore(STORE, { keyPath: "key" });
+            };
+            request.onsuccess = () => resolve(request.result);
+            request.onerror = () => reject(request.error);
+        });
+
+    // Run fn(store) in one transaction; resolves with the request result.
+    const withStore = (mode, fn) =>
+        openDb().then(
+            (db) =>
+                new Promise((resolve, reject) => {
+                    const tx = db.transaction(STORE, mode);
+                    const request = fn(tx.objectStore(STORE));
+                    tx.oncomplete = () => {
+                        db.close();
+                        resolve(request ? request.result : undefined);
+                    };
+                    tx.onerror = () => {
+                        db.close();
+                        reject(tx.error);
+                    };
+                })
+        );
+
+    // item: { key, user, payload, csrf, queuedAt }
+    const add = (item) => withStore("readwrite", (store) => store.put(item));
+
+    const remove = (keys) =>
+        withStore("readwrite", (store) => {
+            keys.forEach((key) => store.delete(key));
+            return null;
+        });
+
+    // Queued items; with userId, only that account's (others' are
+    // dropped: they were left by someone else on a shared device).
+    const all = (userId) =>
+        withStore("readonly", (store) => store.getAll()).then((items) => {
+            if (!userId) {
+                return items;
+            }
+            const stale = items.filter((item) => item.user !== userId);
+            const mine = items.filter((item) => item.user === userId);
+            return stale.length
+                ? remove(stale.map((item) => item.key)).then(() => mine)
+                : mine;
+        });
+
+    // Send queued sessions in batches; drop the ones the server settled.
+    // The server also rejects items queued by another account. Rejects
+    // (keeping the queue) when offline or the server errors.
+    const flush = (url, csrfToken, userId) =>
+        all(userId).then((items) => {
+            if (!items.length) {
+                return [];
+            }
+            const batch = items.slice(0, MAX_BATCH);
+            const token = csrfToken || batch[batch.length - 1].csrf;
+            return fetch(url, {
+                method: "POST",
+                credentials: "same-origin",
+                headers: {
+                    "Content-Type": "application/json",
+                    "X-CSRFToken": token || "",
+                },
+                body: JSON.stringify({
+                    sessions: batch.map((item) => item.payload),
+                }),
+            })
+                .then((response) => {
+                    if (!response.ok) {
+                        throw new Error(`Sync failed (${response.status})`);
+                    }
+                    return response.json();
+                })
+                .then((data) =>
+                    remove(data.results.map((result) => result.key)).then(
+                        () => data.results
+                    )
+                )
+                .then((results) =>
+                    items.length > MAX_BATCH
+                        ? flush(url, csrfToken, userId).then((more) =>
+                              results.concat(more)
+                          )
+                        : results
+                );
+        });
+
+    scope.WorkoutQueue = {
+        SYNC_TAG: "workout-sync",
+        add: add,
+        all: all,
+        flush: flush,
+    };
+})(self);
@@ -0,0 +1,373 @@
+"""
+Pure-Python bundling helpers used by the static files storage: a
+conservative JS/CSS minifier and a per-family split of the stylesheet
+into critical and deferred rules.
+
+The minifiers only drop comments and whitespace the language does not
+need; they never rename or rewrite code, so the output behaves exactly
+like the source.
+"""
+
+import pathlib
+import re
+from urllib.parse import urljoin
+
+# --- JavaScript -------------------------------------------------------
+
+_JS_SPACE = " \t\r\n\f\v"
+
+# Whitespace next to these can go without merging two tokens.
+_JS_PUNCT = set("{}()[];,:?=<>!&|*%^~")
+
+# A line break after these, or before the next set, never ends a
+# statement, so dropping it cannot change automatic semicolon insertion.
+_JS_OPENERS = set("{([;,:=&|?!<>*%^~")
+_JS_CONTINUERS = set(")]},;:.?=&|*%^<>")
+
+# A "/" after these (or at the start) opens a regex, not a division.
+_JS_REGEX_AFTER = set("(,=:[!&|?{};+-*%<>~^")
+_JS_REGEX_KEYWORDS = {
+    "await",
+    "case",
+    "delete",
+    "do",
+    "else",
+    "in",
+    "instanceof",
+    "new",
+    "of",
+    "return",
+    "throw",
+    "typeof",
+    "void",
+    "yield",
+}
+_JS_WORD = re.compile(r"[\w$]+")
+
+
+def _skip_string(source, i):
+    """Index just past the quoted string starting at ``i``."""
+    quote = source[i]
+    i += 1
+    while i < len(source) and source[i] != quote:
+        i += 2 if source[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_template(source, i):
+    """Index just past the template literal starting at ``i``."""
+    i += 1
+    while i < len(source) and source[i] != "`":
+        if source[i] == "\\":
+            i += 2
+        elif source.startswith("${", i):
+            depth = 0
+            while i < len(source):
+                ch = source[i]
+                if ch in "'\"":
+                    i = _skip_string(source, i)
+                    continue
+                if ch == "`":
+                    i = _skip_template(source, i)
+                    continue
+                if ch == "{":
+                    depth += 1
+                elif ch == "}":
+                    depth -= 1
+                    if depth == 0:
+                        break
+                i += 1
+            i += 1
+        else:
+            i += 1
+    return i + 1
+
+
+def _skip_regex(source, i):
+    """Index just past the regex literal at ``i``, or None if it isn't."""
+    i += 1
+    in_class = False
+    while i < len(source):
+        ch = source[i]
+        if ch == "\n":
+            return None
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "[":
+            in_class = True
+        elif ch == "]":
+            in_class = False
+        elif ch == "/" and not in_class:
+            i += 1
+            while i < len(source) and source[i].isalpha():
+                i += 1
+            return i
+        i += 1
+    return None
+
+
+def _js_separator(gap, prev, token):
+    first = token[0]
+    if gap == "\n":
+        if prev in _JS_OPENERS or first in _JS_CONTINUERS:
+            # "1\n.toString()" must not become a decimal point.
+            return "\n" if first == "." and prev.isdigit() else ""
+        return "\n"
+    return "" if prev in _JS_PUNCT or first in _JS_PUNCT else " "
+
+
+def minify_js(source):
+    """Strip comments and redundant whitespace from JavaScript."""
+    out = []
+    gap = ""
+    last = ""
+    i = 0
+    while i < len(source):
+        ch = source[i]
+        if ch in _JS_SPACE:
+            if ch == "\n":
+                gap = "\n"
+            elif not gap:
+                gap = " "
+            i += 1
+            continue
+        if source.startswith("//", i):
+            end = source.find("\n", i)
+            i = len(source) if end == -1 else end
+            gap = gap or " "
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            end = len(source) if end == -1 else end + 2
+            if "\n" in source[i:end]:
+                gap = "\n"
+            else:
+                gap = gap or " "
+            i = end
+            continue
+
+        if ch in "'\"":
+            end = _skip_string(source, i)
+        elif ch == "`":
+            end = _skip_template(source, i)
+        elif ch == "/" and (
+            not last
+            or last[-1] in _JS_REGEX_AFTER
+            or last in _JS_REGEX_KEYWORDS
+        ):
+            end = _skip_regex(source, i) or i + 1
+        else:
+            match = _JS_WORD.match(source, i)
+            end = match.end() if match else i + 1
+        token = source[i:end]
+        if out and gap:
+            out.append(_js_separator(gap, out[-1][-1], token))
+        out.append(token)
+        last = token
+        gap = ""
+        i = end
+    return "".join(out)
+
+
+# --- CSS --------------------------------------------------------------
+
+_CSS_SPACE = " \t\r\n\f"
+
+# Whitespace next to these is never significant. Not ":", which would
+# turn "a :hover" into "a:hover", and not "+"/"-", which calc() needs.
+_CSS_PUNCT = set("{};,>")
+
+
+def minify_css(source):
+    """Strip comments and redundant whitespace from CSS."""
+    out = []
+    gap = False
+    i = 0
+    while i < len(source):
+        ch = source[i]
+        if ch in _CSS_SPACE:
+            gap = True
+            i += 1
+            continue
+        if source.startswith("/*", i):
+            end = source.find("*/", i + 2)
+            i = len(source) if end == -1 else end + 2
+            gap = True
+            continue
+        end = _skip_string(source, i) if ch in "'\"" else i + 1
+        token = source[i:end]
+        prev = out[-1][-1] if out else ""
+        if token == "}" and prev == ";":
+            out.pop()
+            prev = out[-1][-1] if out else ""
+        if gap and prev and prev not in _CSS_PUNCT and prev != ":":
+            if token not in _CSS_PUNCT:
+                out.append(" ")
+        out.append(token)
+        gap = False
+        i = end
+    return "".join(out)
+
+
+_CSS_URL = re.compile(r"""url\((['"]?)([^'")]+)\1\)""")
+
+
+def absolute_urls(css, base_url):
+    """Resolve relative ``url()`` references in ``css`` against a URL."""
+
+    def resolve(match):
+        quote, ref = match.groups()
+        if ref.startswith(("data:", "#")):
+            return match.group(0)
+        return f"url({quote}{urljoin(base_url, ref)}{quote})"
+
+    return _CSS_URL.sub(resolve, css)
+
+
+def _css_blocks(css):
+    """Yield (prelude, body) for each top-level statement of ``css``."""
+    start = depth = 0
+    body_start = None
+    i = 0
+    while i < len(css):
+        ch = css[i]
+        if ch in "'\"":
+            i = _skip_string(css, i)
+            continue
+        if ch == "{":
+            depth += 1
+            if depth == 1:
+                body_start = i
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                yield css[start:body_start].strip(), css[body_start + 1:i]
+                start = i + 1
+        elif ch == ";" and depth == 0:
+            yield css[start:i].strip(), None
+            start = i + 1
+        i += 1
+
+
+# At-rules whose body is more rules, split like the top level.
+_CSS_GROUPING_RULES = ("@media", "@supports", "@layer", "@container")
+
+_CSS_FUNCTIONAL_PSEUDO = re.compile(r":[\w-]+\((?:[^()]|\([^()]*\))*\)")
+_CSS_ATTRIBUTE = re.compile(r"\[[^\]]*\]")
+_CSS_NAMES = re.compile(r"[.#](-?[_a-zA-Z][\w-]*)")
+
+
+class Vocabulary:
+    """
+    Class names and ids a set of pages can use: every word in their
+    sources, plus prefixes of names finished by a template variable
+    (``status-pill--{{ status }}``).
+    """
+
+    _WORDS = re.compile(r"[\w-]+")
+    _PREFIXES = re.compile(r"([\w-]*-)\{[{%]")
+
+    def __init__(self, texts=()):
+        self.words = set()
+        self.prefixes = set()
+        for text in texts:
+            self.add(text)
+
+    def add(self, text):
+        self.words.update(self._WORDS.findall(text))
+        self.prefixes.update(self._PREFIXES.findall(text))
+
+    def __contains__(self, name):
+        return name in self.words or name.startswith(tuple(self.prefixes))
+
+    def matches(self, selectors):
+        """
+        Whether any selector in the list can match these pages. Classes
+        inside :not()/:is()/:has() and attribute selectors are ignored,
+        which keeps rather than drops the rule.
+        """
+        bare = _CSS_FUNCTIONAL_PSEUDO.sub("", selectors)
+        bare = _CSS_ATTRIBUTE.sub("", bare)
+        return any(
+            all(name in self for name in _CSS_NAMES.findall(selector))
+            for selector in bare.split(",")
+        )
+
+
+def split_css(css, vocabulary, critical):
+    """
+    Split minified ``css`` into (critical, deferred) for one family of
+    pages. Rules whose selectors match the ``critical`` vocabulary (the
+    page shell) go first; other rules the family's ``vocabulary`` can use
+    are deferred, and the rest are dropped. @keyframes and @font-face are
+    always deferred; @import/@charset stay critical.
+    """
+    first, rest = [], []
+    for prelude, body in _css_blocks(css):
+        if body is None:
+            first.append(f"{prelude};")
+        elif prelude.startswith(_CSS_GROUPING_RULES):
+            inner_first, inner_rest = split_css(body, vocabulary, critical)
+            if inner_first:
+                first.append(f"{prelude}{{{inner_first}}}")
+            if inner_rest:
+                rest.append(f"{prelude}{{{inner_rest}}}")
+        elif prelude.startswith("@"):
+            rest.append(f"{prelude}{{{body}}}")
+        elif critical.matches(prelude):
+            first.append(f"{prelude}{{{body}}}")
+        elif vocabulary.matches(prelude):
+            rest.append(f"{prelude}{{{body}}}")
+    return "".join(first), "".join(rest)
+
+
+# --- Templates --------------------------------------------------------
+
+_TEMPLATE_REFS = re.compile(r"{%\s*(?:extends|include)\s+[\"']([^\"']+)[\"']")
+
+
+def template_sources(dirs):
+    """{template name: source} for every template under ``dirs``."""
+    sources = {}
+    for directory in dirs:
+        root = pathlib.Path(directory)
+        for path in sorted(root.rglob("*.html")):
+            name = path.relative_to(root).as_posix()
+            sources.setdefault(name, path.read_text(encoding="utf-8"))
+    return sources
+
+
+def template_family(name, families, default):
+    """The family a page belongs to: its template directory, if listed."""
+    head = name.split("/", 1)[0]
+    return head if "/" in name and head in families else default
+
+
+def family_sources(sources, families, default):
+    """
+    {family: [template sources]}: each family's pages (templates nothing
+    else extends or includes) plus everything they extend or include.
+    """
+    refs = {
+        name: _TEMPLATE_REFS.findall(source)
+        for name, source in sources.items()
+    }
+    partials = {ref for names in refs.values() for ref in names}
+    grouped = {}
+    for family in families:
+        pending = [
+            name
+            for name in sources
+            if name not in partials
+            and template_family(name, families, default) == family
+        ]
+        seen = set()
+        while pending:
+            name = pending.pop()
+            if name in seen or name not in sources:
+                continue
+            seen.add(name)
+            pending.extend(refs[name])
+        grouped[family] = [sources[name] for name in sorted(seen)]
+    return grouped
@@ -0,0 +1,70 @@
+"""
+Read-replica routing.
+
+All queries use ``default`` unless code opts in with ``replica_reads``
+and a replica is configured (READ_REPLICA). Inside ``replica_reads``,
+reads go to the replica until the request's first write. From then on
+the request is pinned to the primary, so it reads its own writes. Reads
+made while a transaction is open on the primary stay there too.
+``ReplicaPinningMiddleware`` keeps the pin for the same browser's next
+requests for READ_REPLICA_PIN_SECONDS. That covers the GET after a
+post/redirect and normal replica lag.
+"""
+
+import contextlib
+import contextvars
+
+from django.conf import settings
+from django.db import connections
+
+_replica_reads = contextvars.ContextVar("replica_reads", default=False)
+
+# None: reads may use the replica. "cookie": an earlier request wrote.
+# "write": this request has written.
+_pin = contextvars.ContextVar("primary_pin", default=None)
+
+
+@contextlib.contextmanager
+def replica_reads():
+    """Send reads inside this block (or decorated function) to the replica."""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def begin_request(pinned):
+    """Reset the pin for a new request; returns a token for end_request."""
+    return _pin.set("cookie" if pinned else None)
+
+
+def end_request(token):
+    """Restore the pin and say whether the request wrote anything."""
+    wrote = _pin.get() == "write"
+    _pin.reset(token)
+    return wrote
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            settings.READ_REPLICA
+            and _replica_reads.get()
+            and _pin.get() is None
+            # Reads inside a transaction on the primary must see it.
+            and not connections["default"].in_atomic_block
+        ):
+            return settings.READ_REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        _pin.set("write")
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary.
+        aliases = {"default", settings.READ_REPLICA}
+        if {obj1._state.db, obj2._state.db} <= aliases:
+            return True
+        return None
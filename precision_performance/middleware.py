@@ -0,0 +1,106 @@
+"""Project-wide middleware."""
+
+import os
+import time
+from wsgiref.headers import Headers
+
+from django.conf import settings
+from whitenoise.middleware import WhiteNoiseMiddleware
+from whitenoise.responders import MissingFileError, StaticFile
+
+from .db_routers import begin_request, end_request
+
+
+class ServerTimingMiddleware:
+    """
+    Add a ``Server-Timing`` header with the total view time, so browser
+    dev tools show it next to the network timings.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING:
+            return self.get_response(request)
+
+        started = time.perf_counter()
+        response = self.get_response(request)
+        total_ms = (time.perf_counter() - started) * 1000
+        response["Server-Timing"] = f"app;dur={total_ms:.1f}"
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """
+    After a request that wrote to the database, read this browser's next
+    requests from the primary for READ_REPLICA_PIN_SECONDS (see
+    ``precision_performance.db_routers``). Place it before the session
+    middleware so session saves count as writes.
+    """
+
+    COOKIE_NAME = "primary_pin"
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.READ_REPLICA:
+            return self.get_response(request)
+
+        token = begin_request(pinned=self.COOKIE_NAME in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = end_request(token)
+        if wrote:
+            response.set_cookie(
+                self.COOKIE_NAME,
+                "1",
+                max_age=settings.READ_REPLICA_PIN_SECONDS,
+                secure=request.is_secure(),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise, also offering the Zstandard (``.zst``) copies collectstatic
+    writes next to the Brotli and gzip ones. The smallest encoding the
+    browser accepts is sent.
+    """
+
+    ENCODINGS = {"zstd": ".zst", "br": ".br", "gzip": ".gz"}
+
+    @staticmethod
+    def is_compressed_variant(path, stat_cache=None):
+        for suffix in StaticFilesMiddleware.ENCODINGS.values():
+            if path.endswith(suffix):
+                original = path[: -len(suffix)]
+                if stat_cache is None:
+                    return os.path.isfile(original)
+                return original in stat_cache
+        return False
+
+    def get_static_file(self, path, url, stat_cache=None):
+        # WhiteNoise's own version, with every encoding above.
+        if stat_cache is None and not os.path.exists(path):
+            raise MissingFileError(path)
+        headers = Headers([])
+        self.add_mime_headers(headers, path, url)
+        self.add_cache_headers(headers, path, url)
+        if self.allow_all_origins:
+            headers["Access-Control-Allow-Origin"] = "*"
+        if self.add_headers_function is not None:
+            self.add_headers_function(headers, path, url)
+        return StaticFile(
+            path,
+            headers.items(),
+            stat_cache=stat_cache,
+            encodings={
+                encoding: path + suffix
+                for encoding, suffix in self.ENCODINGS.items()
+            },
+        )
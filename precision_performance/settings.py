@@ -38,6 +38,13 @@ ALLOWED_HOSTS = [
     if h.strip()
 ]
 
+# Public domain used in emailed links when there is no request
+# (e.g. invites sent from management commands).
+SITE_DOMAIN = os.getenv(
+    "DJANGO_SITE_DOMAIN",
+    ALLOWED_HOSTS[0] if ALLOWED_HOSTS else "localhost",
+)
+
 # Optional explicit CSRF trusted origins for Heroku/custom domains.
 CSRF_TRUSTED_ORIGINS = [
     origin.strip()
@@ -60,8 +67,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'precision_performance.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',  # Serve static files via WhiteNoise
+    # Static files via WhiteNoise, with Zstandard as well as Brotli/gzip
+    'precision_performance.middleware.StaticFilesMiddleware',
+    # Outside the session middleware so session saves pin to the primary.
+    'precision_performance.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -99,13 +110,128 @@ WSGI_APPLICATION = 'precision_performance.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
+# Connections are reused across requests: persistent (CONN_MAX_AGE) by
+# default, or from psycopg's connection pool with DB_POOL=true. Either way
+# a connection the server dropped is detected and replaced before use
+# (CONN_HEALTH_CHECKS, or the pool's check on checkout) instead of
+# failing the request.
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "600"))
+
 DATABASES = {
     "default": dj_database_url.config(
         default=f"sqlite:///{BASE_DIR / 'db.sqlite3'}",
-        conn_max_age=600,
+        # The pool manages connection lifetime itself.
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=True,
     )
 }
 
+# Optional read replica (e.g. a Heroku Postgres follower). Only code
+# wrapped in replica_reads (analytics and dashboards) reads from it; see
+# precision_performance/db_routers.py. Tests mirror it onto default, so
+# two local SQLite files are enough to run them with a replica set.
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+if REPLICA_DATABASE_URL:
+    DATABASES["replica"] = dj_database_url.parse(
+        REPLICA_DATABASE_URL,
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+READ_REPLICA = "replica" if REPLICA_DATABASE_URL else None
+# After a write, keep that browser reading the primary this long (seconds).
+READ_REPLICA_PIN_SECONDS = int(os.getenv("READ_REPLICA_PIN_SECONDS", "5"))
+DATABASE_ROUTERS = ["precision_performance.db_routers.ReplicaRouter"]
+
+# One pool per worker process and database. The Procfile's sync gunicorn
+# workers run one request at a time, so one connection each is enough;
+# gthread workers need DB_POOL_MAX_SIZE equal to --threads. Keep
+# WEB_CONCURRENCY x DB_POOL_MAX_SIZE, plus release and one-off dynos,
+# under the Postgres plan's connection limit.
+for database in DATABASES.values():
+    if DB_POOL and database["ENGINE"].endswith("postgresql"):
+        database.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "1")),
+            # Seconds a request waits for a connection before erroring.
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", "10")),
+        }
+
+
+# Cache
+# Local memory by default; set REDIS_URL (e.g. Heroku Redis) to share the
+# cache between workers. RedisCache needs the `redis` package installed.
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+# Whether every worker sees the same cache. Per-process caches can't carry
+# invalidations between workers, so features that rely on that (304 Not
+# Modified answers) stay off without one.
+SHARED_CACHE = bool(os.getenv("REDIS_URL"))
+
+# Sessions
+# SESSION_BACKEND picks where sessions live:
+#   db              - a django_session read on every request (default)
+#   cached_db       - read from the cache, written through to the database.
+#                     Needs REDIS_URL once there is more than one worker, or
+#                     workers can read each other's stale copies.
+#   signed_cookies  - no server-side storage at all. Sessions can't be
+#                     revoked before they expire, so keep the age short.
+# Run `purge_sessions` on a schedule for the database-backed ones.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "db")
+SESSION_ENGINE = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}[SESSION_BACKEND]
+# Seconds a login lasts (Django's default: two weeks).
+SESSION_COOKIE_AGE = int(os.getenv("SESSION_COOKIE_AGE", "1209600"))
+# Flash messages ride in their own cookie, so a post/redirect/get cycle
+# never writes the session.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+# Part of every page ETag so a new release never answers 304 for old
+# markup.
+CACHE_RELEASE = os.getenv("HEROKU_RELEASE_VERSION", "local")
+# Send a Server-Timing header with the view time.
+SERVER_TIMING = (
+    os.getenv("DJANGO_SERVER_TIMING", str(DEBUG)).lower() == "true"
+)
+
+# Public intake forms (consultation / contact).
+# Submissions allowed per client IP and per email in a sliding window.
+INTAKE_RATE_LIMIT = int(os.getenv("INTAKE_RATE_LIMIT", "5"))
+INTAKE_RATE_WINDOW = int(os.getenv("INTAKE_RATE_WINDOW", "600"))
+# Forms posted faster than this (seconds) are treated as bots.
+INTAKE_MIN_FILL_SECONDS = int(os.getenv("INTAKE_MIN_FILL_SECONDS", "3"))
+INTAKE_FORM_MAX_AGE = 60 * 60 * 24
+# Queue submissions and insert them with `flush_intake_queue` instead of
+# writing to the lead tables during the request.
+INTAKE_DEFERRED_WRITES = (
+    os.getenv("INTAKE_DEFERRED_WRITES", "false").lower() == "true"
+)
+# Support tickets should get a first staff reply within this many hours.
+SUPPORT_SLA_HOURS = int(os.getenv("SUPPORT_SLA_HOURS", "24"))
+# `archive_data` moves data older than this many days out of the hot
+# tables: workout notes and closed tickets' messages are compressed into
+# the archive table, and closed contact queries move there whole.
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# Only trust X-Forwarded-For behind a proxy that sets it (Heroku router).
+TRUST_X_FORWARDED_FOR = (
+    os.getenv("DJANGO_TRUST_X_FORWARDED_FOR", "false").lower() == "true"
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -154,8 +280,81 @@ STATICFILES_DIRS = [
 if DEBUG:
     WHITENOISE_USE_FINDERS = True
 
-# WhiteNoise for serving static files in production.
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# Cache policy for collected static files. Names carrying a content hash
+# (the manifest storage's and the build steps') never change, so browsers
+# keep them for good without revalidating; anything else (favicons, files
+# linked by name) for STATIC_MAX_AGE seconds.
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.\w+$"
+if not DEBUG:
+    WHITENOISE_MAX_AGE = int(os.getenv("STATIC_MAX_AGE", "86400"))
+
+# Static files storage (STATICFILES_STORAGE is no longer read by Django).
+# collectstatic writes content-hashed copies with Brotli/Zstandard/gzip
+# versions, plus resized AVIF/WebP variants of the marketing photos for the
+# {% responsive_image %} tag.
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "precision_performance.storage.StaticFilesStorage",
+    },
+}
+RESPONSIVE_IMAGE_SOURCES = ["images/*.jpg"]
+RESPONSIVE_IMAGE_WIDTHS = [480, 960, 1440, 1920]
+RESPONSIVE_IMAGE_FORMATS = ["avif", "webp"]
+
+# Script bundles: each is served as one minified file after collectstatic
+# ({% asset_scripts "name" %}); before that, as the separate files.
+ASSET_SCRIPT_BUNDLES = {
+    "site": ["js/main.js", "js/nav.js", "js/logout.js"],
+    "dashboard": [
+        "js/dashboard_menu.js",
+        "js/dashboard_interactions.js",
+        "js/logout.js",
+    ],
+    "workout_log": ["js/workout_queue.js", "js/workout_log.js"],
+    "client_metrics": [
+        "js/client_metrics_charts.js",
+        "js/body_metrics_modal.js",
+    ],
+    "client_detail": [
+        "js/client_detail_charts.js",
+        "js/body_metrics_modal.js",
+    ],
+    "consultation_assign": ["js/consultation_assign.js"],
+    "portal_link_copy": ["js/portal_link_copy.js"],
+    "programme_library": ["js/programme_library_highlight.js"],
+}
+
+# The stylesheet is split per page family ({% asset_styles %}): pages in
+# templates/<family>/ get only the rules they can use, with the rules the
+# listed shell templates use inlined as critical CSS. The first family
+# takes every page outside the other families' directories.
+ASSET_STYLESHEET = "css/style.css"
+
+# Serve the web fonts from our own static files instead of Google Fonts
+# (one origin, hashed and cached forever). Run `manage.py fetch_fonts`
+# once and commit its output before turning this on.
+SELF_HOSTED_FONTS = (
+    os.getenv("SELF_HOSTED_FONTS", "false").lower() == "true"
+)
+FONT_STYLESHEET = "css/fonts.css"
+FONT_FAMILIES = {
+    "Montserrat": "400..700",
+    "Open Sans": "400..700",
+}
+FONT_SUBSETS = ["latin"]
+ASSET_STYLE_FAMILIES = {
+    "public": ["base.html", "includes/nav.html", "index.html"],
+    "client": ["base.html", "dashboard_base.html", "client/_sidebar.html"],
+    "trainer": [
+        "base.html",
+        "dashboard_base.html",
+        "trainer/_sidebar.html",
+    ],
+    "owner": ["base.html", "dashboard_base.html", "owner/_sidebar.html"],
+}
 
 # Email backend (console for development)
 if DEBUG:
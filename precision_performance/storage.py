@@ -0,0 +1,323 @@
+"""
+Static files storage: WhiteNoise's hashed, precompressed storage plus
+build steps for responsive images and minified script/stylesheet bundles.
+"""
+
+import fnmatch
+import hashlib
+import io
+import json
+import logging
+import os
+import posixpath
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise import compress
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from . import assets
+
+logger = logging.getLogger(__name__)
+
+# Written at the root of STATIC_ROOT; read by the responsive_image tag.
+RESPONSIVE_MANIFEST = "responsive-images.json"
+
+# Written at the root of STATIC_ROOT; read by the asset_bundles tags.
+BUNDLES_MANIFEST = "asset-bundles.json"
+
+# Class names Django's own form rendering puts on the page.
+FORM_CLASSES = "errorlist nonfield helptext"
+
+# Encoder settings per output format; AVIF holds up at lower quality.
+FORMAT_OPTIONS = {
+    "avif": {"format": "AVIF", "quality": 50},
+    "webp": {"format": "WEBP", "quality": 75, "method": 6},
+}
+
+
+def _pillow():
+    """Pillow's Image module, or None when it isn't installed."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    return Image
+
+
+def available_formats(Image):
+    """Configured formats this Pillow build can write, best first."""
+    extensions = Image.registered_extensions()
+    return [
+        fmt
+        for fmt in settings.RESPONSIVE_IMAGE_FORMATS
+        if extensions.get(f".{fmt}") == FORMAT_OPTIONS[fmt]["format"]
+    ]
+
+
+def _zstandard():
+    """The zstandard module, or None when it isn't installed."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+class Compressor(compress.Compressor):
+    """
+    WhiteNoise's compressor (Brotli when installed, and gzip) plus
+    Zstandard when installed, served by StaticFilesMiddleware.
+    """
+
+    SKIP_COMPRESS_EXTENSIONS = (
+        *compress.Compressor.SKIP_COMPRESS_EXTENSIONS,
+        "avif",
+        "zst",
+    )
+
+    def compress(self, path):
+        filenames = super().compress(path)
+        zstandard = _zstandard()
+        if zstandard is None:
+            return filenames
+        with open(path, "rb") as handle:
+            stat_result = os.fstat(handle.fileno())
+            data = handle.read()
+        compressed = zstandard.ZstdCompressor(level=19).compress(data)
+        if self.is_compressed_effectively(
+            "Zstandard", path, len(data), compressed
+        ):
+            filenames.append(
+                self.write_data(path, compressed, ".zst", stat_result)
+            )
+        return filenames
+
+
+def _digest(data):
+    return hashlib.md5(data, usedforsecurity=False).hexdigest()[:12]
+
+
+def variant_name(path, width, data, fmt):
+    """``images/hero.jpg`` -> ``images/hero.640w.<hash>.webp``."""
+    root = posixpath.splitext(path)[0]
+    return f"{root}.{width}w.{_digest(data)}.{fmt}"
+
+
+def _publish(storage, names):
+    """
+    Record files a build step wrote (already named by content hash) in the
+    staticfiles manifest, so ``{% static %}`` resolves them, and yield
+    their precompressed copies.
+    """
+    if not names:
+        return
+    if hasattr(storage, "hashed_files"):
+        for name in names:
+            storage.hashed_files[storage.hash_key(name)] = name
+        storage.save_manifest()
+    compress_files = getattr(storage, "compress_files", None)
+    if compress_files is not None:
+        for name, compressed_name in compress_files(names):
+            yield name, compressed_name, True
+
+
+def _save_json(storage, name, data):
+    if storage.exists(name):
+        storage.delete(name)
+    storage._save(name, ContentFile(json.dumps(data, indent=2).encode()))
+
+
+class ResponsiveImagesMixin:
+    """
+    After collectstatic's own processing, write resized AVIF/WebP copies
+    of the images matching RESPONSIVE_IMAGE_SOURCES at each width in
+    RESPONSIVE_IMAGE_WIDTHS (never upscaled), named by content hash, and a
+    manifest of them for the ``responsive_image`` template tag.
+
+    Pillow is optional: without it (or without AVIF support) the missing
+    variants are skipped with a warning and pages fall back to the
+    original file.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        parent = getattr(super(), "post_process", None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        yield from self.build_responsive_images(paths)
+
+    def _responsive_sources(self, paths):
+        patterns = settings.RESPONSIVE_IMAGE_SOURCES
+        return sorted(
+            path
+            for path in paths
+            if any(fnmatch.fnmatch(path, pattern) for pattern in patterns)
+        )
+
+    def build_responsive_images(self, paths):
+        sources = self._responsive_sources(paths)
+        if not sources:
+            return
+        Image = _pillow()
+        if Image is None:
+            logger.warning(
+                "Pillow is not installed; skipping responsive images."
+            )
+            return
+        formats = available_formats(Image)
+        skipped = set(settings.RESPONSIVE_IMAGE_FORMATS) - set(formats)
+        if skipped:
+            logger.warning(
+                "This Pillow build cannot write %s; skipping those "
+                "variants.",
+                ", ".join(sorted(skipped)),
+            )
+
+        manifest = {}
+        written = []
+        for path in sources:
+            storage, source_path = paths[path]
+            with storage.open(source_path) as handle:
+                image = Image.open(handle)
+                image.load()
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGB")
+            entry = {
+                "width": image.width,
+                "height": image.height,
+                "variants": {fmt: [] for fmt in formats},
+            }
+            configured = settings.RESPONSIVE_IMAGE_WIDTHS
+            widths = sorted(
+                {w for w in configured if w < image.width}
+                | {min(image.width, max(configured))}
+            )
+            for width in widths:
+                height = round(image.height * width / image.width)
+                resized = image.resize(
+                    (width, height), Image.Resampling.LANCZOS
+                )
+                for fmt in formats:
+                    buffer = io.BytesIO()
+                    resized.save(buffer, **FORMAT_OPTIONS[fmt])
+                    data = buffer.getvalue()
+                    name = variant_name(path, width, data, fmt)
+                    if not self.exists(name):
+                        self._save(name, ContentFile(data))
+                    written.append(name)
+                    entry["variants"][fmt].append([width, name])
+                    yield path, name, True
+            manifest[path] = entry
+
+        yield from _publish(self, written)
+        _save_json(self, RESPONSIVE_MANIFEST, manifest)
+
+
+class AssetBundlesMixin:
+    """
+    After collectstatic's own processing, write each script bundle in
+    ASSET_SCRIPT_BUNDLES as one minified file, and split the minified
+    ASSET_STYLESHEET per page family in ASSET_STYLE_FAMILIES into critical
+    rules (inlined by ``{% asset_styles %}``) and a deferred file. Output
+    names carry a content hash so they can be cached forever; the
+    ``asset_bundles`` tags find them through a manifest and fall back to
+    the source files until one has been built.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        parent = getattr(super(), "post_process", None)
+        if parent is not None:
+            yield from parent(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        yield from self.build_asset_bundles(paths)
+
+    def _read(self, paths, path):
+        storage, source_path = paths[path]
+        with storage.open(source_path) as handle:
+            return handle.read().decode("utf-8")
+
+    def _read_collected(self, path):
+        """``path`` as collected, after any URL rewriting by the parent."""
+        stored_name = getattr(self, "stored_name", None)
+        with self.open(stored_name(path) if stored_name else path) as handle:
+            return handle.read().decode("utf-8")
+
+    def _save_hashed(self, root, ext, text):
+        data = text.encode("utf-8")
+        name = f"{root}.{_digest(data)}.{ext}"
+        if not self.exists(name):
+            self._save(name, ContentFile(data))
+        return name
+
+    def build_asset_bundles(self, paths):
+        manifest = {"scripts": {}, "styles": {}}
+        written = []
+        scripts = {}
+        for bundle, files in settings.ASSET_SCRIPT_BUNDLES.items():
+            sources = [self._read(paths, path) for path in files]
+            scripts.update(zip(files, sources))
+            # Separate files with ";" in case one omits its last one.
+            minified = ";\n".join(assets.minify_js(src) for src in sources)
+            name = self._save_hashed(f"js/{bundle}", "js", minified)
+            written.append(name)
+            manifest["scripts"][bundle] = name
+            yield bundle, name, True
+
+        stylesheet = settings.ASSET_STYLESHEET
+        css = assets.minify_css(self._read_collected(stylesheet))
+        # Inlined rules resolve url()s against the page, not the sheet.
+        sheet_url = urljoin(
+            settings.STATIC_URL, posixpath.dirname(stylesheet) + "/"
+        )
+        families = settings.ASSET_STYLE_FAMILIES
+        default = next(iter(families))
+        templates = assets.template_sources(
+            settings.TEMPLATES[0]["DIRS"]
+        )
+        grouped = assets.family_sources(templates, families, default)
+        for family, critical_templates in families.items():
+            vocabulary = assets.Vocabulary(
+                [*grouped[family], *scripts.values(), FORM_CLASSES]
+            )
+            critical = assets.Vocabulary(
+                templates[name]
+                for name in critical_templates
+                if name in templates
+            )
+            inline, deferred = assets.split_css(css, vocabulary, critical)
+            root = posixpath.splitext(stylesheet)[0]
+            name = self._save_hashed(f"{root}.{family}", "css", deferred)
+            written.append(name)
+            manifest["styles"][family] = {
+                "critical": assets.absolute_urls(inline, sheet_url),
+                "deferred": name,
+            }
+            yield stylesheet, name, True
+
+        yield from _publish(self, written)
+        _save_json(self, BUNDLES_MANIFEST, manifest)
+
+
+class StaticFilesStorage(
+    AssetBundlesMixin,
+    ResponsiveImagesMixin,
+    CompressedManifestStaticFilesStorage,
+):
+    """
+    Content-hashed names (cached forever, see WHITENOISE_IMMUTABLE_FILE_TEST)
+    with Brotli, Zstandard and gzip copies, plus the build steps above.
+    """
+
+    def create_compressor(self, **kwargs):
+        return Compressor(**kwargs)
+
+    def stored_name(self, name):
+        # Before collectstatic has written a manifest (local development,
+        # tests) serve the source names instead of failing.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
@@ -0,0 +1,92 @@
+{% load static %}/* jshint esversion: 11 */
+/* Service worker for the client workout log: shows an offline page when
+   the log can't be reached and syncs sessions queued by workout_log.js. */
+importScripts("{% static 'js/workout_queue.js' %}");
+
+const SYNC_URL = "{% url 'accounts:client_workout_api_sync' %}";
+const OFFLINE_URL = "{% url 'accounts:client_workout_offline' %}";
+const STATIC_PREFIX = "{% get_static_prefix %}";
+// Only static files and the offline page are cached: never anything
+// rendered for the logged-in client. Logging out deletes these caches
+// (logout.js), and a new CACHE_NAME drops the old ones on activation.
+const CACHE_PREFIX = "workout-log-";
+const CACHE_NAME = CACHE_PREFIX + "v2";
+
+self.addEventListener("install", (event) => {
+    event.waitUntil(
+        caches
+            .open(CACHE_NAME)
+            .then((cache) => cache.add(OFFLINE_URL))
+            .then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener("activate", (event) => {
+    event.waitUntil(
+        caches
+            .keys()
+            .then((keys) =>
+                Promise.all(
+                    keys
+                        .filter(
+                            (key) =>
+                                key.startsWith(CACHE_PREFIX) &&
+                                key !== CACHE_NAME
+                        )
+                        .map((key) => caches.delete(key))
+                )
+            )
+            .then(() => self.clients.claim())
+    );
+});
+
+// Network first; offline, fall back to the cached copy of `fallback`.
+const networkFirst = (request, fallback, store) =>
+    fetch(request)
+        .then((response) => {
+            if (store && response.ok) {
+                const copy = response.clone();
+                caches
+                    .open(CACHE_NAME)
+                    .then((cache) => cache.put(request, copy));
+            }
+            return response;
+        })
+        .catch(() =>
+            caches
+                .match(fallback)
+                .then((cached) => cached || Response.error())
+        );
+
+self.addEventListener("fetch", (event) => {
+    const request = event.request;
+    const url = new URL(request.url);
+    if (request.method !== "GET" || url.origin !== self.location.origin) {
+        return;
+    }
+    if (url.pathname.startsWith(STATIC_PREFIX)) {
+        event.respondWith(networkFirst(request, request, true));
+    } else if (request.mode === "navigate") {
+        // Pages are never stored; offline, the shell stands in for them.
+        event.respondWith(networkFirst(request, OFFLINE_URL, false));
+    }
+});
+
+// Background sync: flush the queue, then tell open pages what happened.
+self.addEventListener("sync", (event) => {
+    if (event.tag !== self.WorkoutQueue.SYNC_TAG) {
+        return;
+    }
+    event.waitUntil(
+        self.WorkoutQueue.flush(SYNC_URL).then((results) =>
+            self.clients.matchAll().then((clients) => {
+                clients.forEach((client) => {
+                    client.postMessage({
+                        type: "workout-sync",
+                        results: results,
+                    });
+                });
+            })
+        )
+    );
+});
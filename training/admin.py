@@ -1,6 +1,8 @@
 from django.contrib import admin
 from .models import (
     ConsultationRequest,
+    Exercise,
+    ExerciseAlias,
     ContactQuery,
     WorkoutSession,
     WorkoutSet,
@@ -8,9 +10,17 @@ from .models import (
     ProgrammeBlock,
     ProgrammeDay,
     ProgrammeExercise,
+    ProgrammeExerciseOverride,
     ClientProgramme,
     SupportTicket,
     SupportMessage,
+    IntakeSubmission,
+    PersonalRecord,
+    WeeklyClientSummary,
+    DailyLeadStat,
+    DailyTrainerStat,
+    DailySupportStat,
+    DailyTrainerSupportStat,
 )
 
 
@@ -24,6 +34,7 @@ class ConsultationRequestAdmin(admin.ModelAdmin):
         "coaching_option",
         "status",
         "assigned_trainer",
+        "submission_count",
         "created_at",
     )
     list_filter = (
@@ -41,6 +52,7 @@ class ConsultationRequestAdmin(admin.ModelAdmin):
     )
     ordering = ("-created_at",)
     readonly_fields = ("created_at", "updated_at")
+    raw_id_fields = ("duplicate_of",)
 
 
 @admin.register(ContactQuery)
@@ -52,11 +64,13 @@ class ContactQueryAdmin(admin.ModelAdmin):
         "coaching_option",
         "status",
         "assigned_trainer",
+        "submission_count",
         "created_at",
     )
     search_fields = ("first_name", "last_name", "email")
     list_filter = ("coaching_option", "status", "assigned_trainer")
     ordering = ("-created_at",)
+    raw_id_fields = ("duplicate_of",)
 
 
 @admin.register(WorkoutSession)
@@ -77,10 +91,79 @@ class WorkoutSetAdmin(admin.ModelAdmin):
         "weight_kg",
         "rpe",
     )
-    list_filter = ("exercise_name", "session__client")
+    list_filter = ("exercise", "session__client")
     search_fields = ("exercise_name", "session__name")
 
 
+@admin.register(PersonalRecord)
+class PersonalRecordAdmin(admin.ModelAdmin):
+    list_display = (
+        "client",
+        "exercise",
+        "best_weight_kg",
+        "best_weight_reps",
+        "best_e1rm_kg",
+        "updated_at",
+    )
+    search_fields = ("client__username", "client__email", "exercise__name")
+    raw_id_fields = ("client", "exercise")
+
+
+@admin.register(WeeklyClientSummary)
+class WeeklyClientSummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        "client",
+        "week_start",
+        "sessions_logged",
+        "sessions_planned",
+        "sessions_skipped",
+        "total_volume_kg",
+        "avg_rpe",
+    )
+    list_filter = ("week_start",)
+    search_fields = ("client__username", "client__email")
+    raw_id_fields = ("client",)
+    date_hierarchy = "week_start"
+
+
+@admin.register(DailyLeadStat)
+class DailyLeadStatAdmin(admin.ModelAdmin):
+    list_display = ("date", "coaching_option", "leads", "converted")
+    list_filter = ("coaching_option",)
+    date_hierarchy = "date"
+
+
+@admin.register(DailyTrainerStat)
+class DailyTrainerStatAdmin(admin.ModelAdmin):
+    list_display = ("date", "trainer", "active_clients")
+    list_filter = ("trainer",)
+    date_hierarchy = "date"
+
+
+@admin.register(DailySupportStat)
+class DailySupportStatAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "tickets_opened",
+        "tickets_answered",
+        "response_seconds",
+    )
+    date_hierarchy = "date"
+
+
+@admin.register(DailyTrainerSupportStat)
+class DailyTrainerSupportStatAdmin(admin.ModelAdmin):
+    list_display = (
+        "date",
+        "trainer",
+        "responses",
+        "breaches",
+        "resolutions",
+    )
+    list_filter = ("trainer",)
+    date_hierarchy = "date"
+
+
 @admin.register(BodyMetricEntry)
 class BodyMetricEntryAdmin(admin.ModelAdmin):
     list_display = (
@@ -107,10 +190,21 @@ class ProgrammeDayInline(admin.StackedInline):
     show_change_link = True
 
 
+class ProgrammeExerciseOverrideInline(admin.TabularInline):
+    model = ProgrammeExerciseOverride
+    extra = 0
+    raw_id_fields = ("exercise",)
+
+
 @admin.register(ProgrammeBlock)
 class ProgrammeBlockAdmin(admin.ModelAdmin):
-    list_display = ("name", "weeks", "created_by")
-    inlines = [ProgrammeDayInline]
+    list_display = ("name", "weeks", "created_by", "copy_on_write")
+    inlines = [ProgrammeDayInline, ProgrammeExerciseOverrideInline]
+
+    def delete_queryset(self, request, queryset):
+        # Per object so copy-on-write copies are materialised first.
+        for block in queryset:
+            block.delete()
 
 
 @admin.register(ProgrammeDay)
@@ -119,6 +213,11 @@ class ProgrammeDayAdmin(admin.ModelAdmin):
     inlines = [ProgrammeExerciseInline]
     ordering = ("block", "order")
 
+    def delete_queryset(self, request, queryset):
+        # Per object so copy-on-write copies are materialised first.
+        for day in queryset:
+            day.delete()
+
 
 @admin.register(ProgrammeExercise)
 class ProgrammeExerciseAdmin(admin.ModelAdmin):
@@ -132,6 +231,11 @@ class ProgrammeExerciseAdmin(admin.ModelAdmin):
     )
     ordering = ("day", "order")
 
+    def delete_queryset(self, request, queryset):
+        # Per object so copy-on-write copies are materialised first.
+        for exercise in queryset:
+            exercise.delete()
+
 
 @admin.register(ClientProgramme)
 class ClientProgrammeAdmin(admin.ModelAdmin):
@@ -141,8 +245,17 @@ class ClientProgrammeAdmin(admin.ModelAdmin):
 
 @admin.register(SupportTicket)
 class SupportTicketAdmin(admin.ModelAdmin):
-    list_display = ("subject", "client", "trainer", "status", "created_at")
+    list_display = (
+        "subject",
+        "client",
+        "trainer",
+        "status",
+        "created_at",
+        "first_response_at",
+        "resolved_at",
+    )
     list_filter = ("status", "trainer", "created_at")
+    readonly_fields = ("first_response_at", "resolved_at")
     search_fields = (
         "subject",
         "client__username",
@@ -158,3 +271,23 @@ class SupportMessageAdmin(admin.ModelAdmin):
     list_filter = ("created_at",)
     search_fields = ("ticket__subject", "sender__username", "body")
     ordering = ("-created_at",)
+
+
+@admin.register(IntakeSubmission)
+class IntakeSubmissionAdmin(admin.ModelAdmin):
+    list_display = ("kind", "created_at")
+    list_filter = ("kind",)
+    ordering = ("id",)
+    readonly_fields = ("kind", "payload", "created_at")
+
+
+class ExerciseAliasInline(admin.TabularInline):
+    model = ExerciseAlias
+    extra = 1
+
+
+@admin.register(Exercise)
+class ExerciseAdmin(admin.ModelAdmin):
+    list_display = ("name", "created_at")
+    search_fields = ("name", "aliases__name")
+    inlines = [ExerciseAliasInline]
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class TrainingConfig(AppConfig):
     name = 'training'
+
+    def ready(self):
+        from . import signals  # noqa: F401
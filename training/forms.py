@@ -1,5 +1,10 @@
 # training/forms.py
+import time
+
 from django import forms
+from django.conf import settings
+from django.core import signing
+from django.forms import BaseModelFormSet
 from django.utils import timezone
 
 from .models import (
@@ -8,9 +13,50 @@ from .models import (
     ContactQuery,
     WorkoutSession,
 )
+from .services.tailored_programmes import apply_overrides, save_overrides
+
+
+class SpamGuardForm(forms.Form):
+    """
+    Honeypot + timing check shared by the public intake forms.
+
+    `website` is hidden from people, so only bots fill it in. `started`
+    carries a signed timestamp from when the form was rendered; posts
+    that come back too quickly (or without it) are treated as bots.
+    """
+
+    SIGNING_SALT = "training.intake-form"
+
+    website = forms.CharField(
+        required=False,
+        widget=forms.TextInput(
+            attrs={"autocomplete": "off", "tabindex": "-1"}
+        ),
+    )
+    started = forms.CharField(required=False, widget=forms.HiddenInput)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["started"].initial = signing.dumps(
+            int(time.time()),
+            salt=self.SIGNING_SALT,
+        )
+
+    def is_probably_spam(self):
+        if (self.data.get("website") or "").strip():
+            return True
+        try:
+            started = signing.loads(
+                self.data.get("started") or "",
+                salt=self.SIGNING_SALT,
+                max_age=settings.INTAKE_FORM_MAX_AGE,
+            )
+        except signing.BadSignature:
+            return True
+        return time.time() - started < settings.INTAKE_MIN_FILL_SECONDS
 
 
-class ConsultationRequestForm(forms.ModelForm):
+class ConsultationRequestForm(SpamGuardForm, forms.ModelForm):
     """
     Handles validation for the 'Book a consultation' form.
     """
@@ -203,7 +249,7 @@ class BodyMetricEntryForm(forms.ModelForm):
         }
 
 
-class ContactQueryForm(forms.ModelForm):
+class ContactQueryForm(SpamGuardForm, forms.ModelForm):
     """
     Form for the public 'Contact us' submissions.
     """
@@ -254,3 +300,39 @@ class ContactQueryForm(forms.ModelForm):
                 "Please provide a bit more detail (at least 10 characters)."
             )
         return msg
+
+
+class TailoredExerciseFormSet(BaseModelFormSet):
+    """
+    Model formset for a tailored block's exercises.
+
+    For copy-on-write blocks the queryset holds the template's exercises:
+    forms show the block's overrides and saving writes override rows, so
+    the template itself is never changed.
+    """
+
+    def __init__(self, *args, block=None, overrides=None, **kwargs):
+        self.tailored_block = block
+        self.overrides = overrides
+        super().__init__(*args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not getattr(self, "_overrides_applied", False):
+            # Evaluates the queryset; forms index into the same objects.
+            apply_overrides(
+                self.tailored_block,
+                list(queryset),
+                self.overrides,
+            )
+            self._overrides_applied = True
+        return queryset
+
+    def save(self, commit=True):
+        block = self.tailored_block
+        if block is None or not block.copy_on_write:
+            return super().save(commit=commit)
+        instances = super().save(commit=False)
+        if commit:
+            save_overrides(block, instances)
+        return instances
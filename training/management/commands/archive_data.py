@@ -0,0 +1,63 @@
+"""Move data past ARCHIVE_AFTER_DAYS out of the hot tables."""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from training.services.archive import archive_old_data, table_sizes
+
+
+class Command(BaseCommand):
+    help = (
+        "Archive workout notes, closed tickets' messages and closed "
+        "contact queries older than ARCHIVE_AFTER_DAYS into the compressed "
+        "archive table, in batches of one short transaction each, then "
+        "report the space reclaimed and the table sizes. PostgreSQL reuses "
+        "the freed space after (auto)vacuum. Safe to run on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows archived per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to wait between batches.",
+        )
+        parser.add_argument(
+            "--report",
+            action="store_true",
+            help="Only report the table sizes.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if not options["report"]:
+            results = archive_old_data(
+                batch_size=options["batch_size"], pause=options["pause"]
+            )
+            for name, totals in results.items():
+                self.stdout.write(
+                    f"{name}: archived {totals['rows']} row(s); "
+                    f"{self._size(totals['moved'])} moved, stored as "
+                    f"{self._size(totals['stored'])}, "
+                    f"{self._size(totals['moved'] - totals['stored'])} "
+                    "reclaimed"
+                )
+        for table, rows, size in table_sizes():
+            size = self._size(size) if size is not None else "size unknown"
+            self.stdout.write(f"{table}: {rows} row(s), {size}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Archive horizon: "
+                f"{settings.ARCHIVE_AFTER_DAYS} day(s)."
+            )
+        )
+
+    def _size(self, size):
+        return filesizeformat(size).replace("\xa0", " ")
@@ -0,0 +1,107 @@
+"""Time request-shaped database work under each connection strategy."""
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+# Strategy -> settings overrides. CONN_MAX_AGE=0 without a pool is the
+# old behaviour: a new connection for every request.
+STRATEGIES = {
+    "connect-per-request": {"CONN_MAX_AGE": 0, "pool": None},
+    "persistent": {"CONN_MAX_AGE": 600, "pool": None},
+    "pool": {"CONN_MAX_AGE": 0, "pool": {"min_size": 1, "max_size": 1}},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate requests against a database alias (connection checks at "
+        "request start and end, one query in between) with a new "
+        "connection per request, persistent connections and psycopg's "
+        "pool, and report the latency of each. Point DATABASE_URL at a "
+        "local Postgres to see what connection setup costs a request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests to simulate per strategy.",
+        )
+        parser.add_argument(
+            "--query",
+            default="SELECT 1",
+            help="SQL each simulated request runs.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1.")
+        base = connections.settings[options["database"]]
+        for name, overrides in STRATEGIES.items():
+            if overrides["pool"] and not self._pool_available(base):
+                self.stdout.write(
+                    f"{name:>20}: skipped (needs PostgreSQL with "
+                    "psycopg_pool installed)"
+                )
+                continue
+            timings = self._run(base, overrides, options)
+            self.stdout.write(
+                f"{name:>20}: median {statistics.median(timings):.2f}ms, "
+                f"p95 {self._p95(timings):.2f}ms, "
+                f"first {timings[0]:.2f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS("Benchmark complete."))
+
+    def _pool_available(self, settings_dict):
+        if not settings_dict["ENGINE"].endswith("postgresql"):
+            return False
+        try:
+            import psycopg_pool  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _run(self, base, overrides, options):
+        db_options = {
+            key: value
+            for key, value in base["OPTIONS"].items()
+            if key != "pool"
+        }
+        if overrides["pool"]:
+            db_options["pool"] = overrides["pool"]
+        settings_dict = {
+            **base,
+            "CONN_MAX_AGE": overrides["CONN_MAX_AGE"],
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": db_options,
+        }
+        backend = load_backend(settings_dict["ENGINE"])
+        connection = backend.DatabaseWrapper(
+            settings_dict, options["database"]
+        )
+        timings = []
+        try:
+            for _ in range(options["requests"]):
+                started = time.perf_counter()
+                # What close_old_connections() does on request_started
+                # and request_finished.
+                connection.close_if_unusable_or_obsolete()
+                with connection.cursor() as cursor:
+                    cursor.execute(options["query"])
+                    cursor.fetchall()
+                connection.close_if_unusable_or_obsolete()
+                timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            connection.close()
+            if overrides["pool"]:
+                connection.close_pool()
+        return timings
+
+    def _p95(self, timings):
+        ordered = sorted(timings)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
@@ -0,0 +1,41 @@
+"""Consolidate duplicate consultation and contact submissions."""
+from django.core.management.base import BaseCommand
+
+from training.models import ConsultationRequest, ContactQuery
+from training.services.lead_intake import consolidate_duplicates
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge repeat untriaged consultation/contact submissions from the "
+        "same person and link the rest to their first submission. "
+        "Safe to run multiple times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Email fingerprints processed per transaction.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing.",
+        )
+
+    def handle(self, *args, **options):
+        for model in (ConsultationRequest, ContactQuery):
+            merged, linked = consolidate_duplicates(
+                model,
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+            )
+            label = model._meta.verbose_name_plural
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label}: merged {merged} duplicate(s), "
+                    f"linked {linked} repeat submission(s)."
+                )
+            )
@@ -0,0 +1,30 @@
+"""Insert queued public form submissions in batches."""
+from django.core.management.base import BaseCommand
+
+from training.services.lead_intake import flush_intake_queue
+
+
+class Command(BaseCommand):
+    help = (
+        "Write queued consultation/contact submissions (deferred intake "
+        "mode) to the lead tables in batches. Safe to run on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Submissions written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        saved, rejected = flush_intake_queue(
+            batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Saved {saved} queued submission(s) "
+                f"({rejected} failed validation)."
+            )
+        )
@@ -0,0 +1,54 @@
+"""Map free-text exercise names onto the exercise catalogue."""
+from django.core.management.base import BaseCommand
+
+from training.services.exercise_catalogue import (
+    DEFAULT_MATCH_CUTOFF,
+    backfill_exercises,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Link programme exercises and workout sets without a catalogue "
+        "exercise to one, matching names exactly or by the same words "
+        "(kept as an alias). Close spellings are listed for review and "
+        "left unlinked: add them as aliases in the admin and run again. "
+        "Other names become new catalogue entries. Safe to run multiple "
+        "times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Distinct names processed per transaction.",
+        )
+        parser.add_argument(
+            "--cutoff",
+            type=float,
+            default=DEFAULT_MATCH_CUTOFF,
+            help="Similarity (0-1) a spelling needs to be suggested.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would change without writing.",
+        )
+
+    def handle(self, *args, **options):
+        summary = backfill_exercises(
+            batch_size=options["batch_size"],
+            cutoff=options["cutoff"],
+            dry_run=options["dry_run"],
+        )
+        for name, matched in summary["review_pairs"]:
+            self.stdout.write(f"  review: {name!r} looks like {matched!r}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{summary['exact']} exact, {summary['aliased']} aliased, "
+                f"{summary['review']} to review, "
+                f"{summary['created']} new exercise(s); "
+                f"linked {summary['rows']} row(s)."
+            )
+        )
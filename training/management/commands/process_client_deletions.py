@@ -0,0 +1,55 @@
+"""Run queued client deletions in small transactions."""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.services.client_deletion import (
+    CHUNK_SIZE,
+    pending_deletions,
+    process_deletion,
+    sweep_orphaned_copies,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the data of clients the owner has deleted, in id-ordered "
+        "batches of one short transaction each, recording progress for "
+        "the clients page. Failed deletions are retried. Safe to run on a "
+        "schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Rows deleted per transaction.",
+        )
+        parser.add_argument(
+            "--sweep-orphans",
+            action="store_true",
+            help=(
+                "Also delete tailored programme copies no client is "
+                "assigned to, e.g. left by deletions before this command."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        done = failed = 0
+        for job in pending_deletions():
+            if process_deletion(job, chunk_size=batch_size):
+                done += 1
+            else:
+                failed += 1
+                job.refresh_from_db(fields=["error"])
+                self.stderr.write(f"{job.client_name}: {job.error}")
+        if options["sweep_orphans"]:
+            swept = sweep_orphaned_copies(chunk_size=batch_size)
+            self.stdout.write(f"Deleted {swept} orphaned programme row(s).")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Finished {done} client deletion(s); {failed} failed."
+            )
+        )
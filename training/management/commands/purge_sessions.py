@@ -0,0 +1,36 @@
+"""Delete expired sessions in small transactions."""
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.services.session_cleanup import purge_expired_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired database sessions in batches, one short "
+        "transaction each, instead of clearsessions' single DELETE. Safe "
+        "to run on a schedule."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Sessions deleted per transaction.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.0,
+            help="Seconds to wait between batches.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        deleted = purge_expired_sessions(
+            batch_size=options["batch_size"], pause=options["pause"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Deleted {deleted} expired session(s).")
+        )
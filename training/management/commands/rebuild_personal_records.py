@@ -0,0 +1,43 @@
+"""Recompute every client's personal records from their workout sets."""
+from django.core.management.base import BaseCommand
+
+from training.models import PersonalRecord, WorkoutSession
+from training.services.personal_records import rebuild_records
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the personal-record table from logged workout sets, "
+        "a batch of clients at a time. Safe to run multiple times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Clients rebuilt per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        # Clients with stored records too, so stale ones are cleared.
+        client_ids = sorted(
+            set(
+                WorkoutSession.objects.values_list("client_id", flat=True)
+                .distinct()
+            )
+            | set(
+                PersonalRecord.objects.values_list("client_id", flat=True)
+                .distinct()
+            )
+        )
+        written = 0
+        for start in range(0, len(client_ids), batch_size):
+            written += rebuild_records(client_ids[start:start + batch_size])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rebuilt {written} personal record(s) for "
+                f"{len(client_ids)} client(s)."
+            )
+        )
@@ -0,0 +1,70 @@
+"""Nightly catch-up for the weekly client training-load summaries."""
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from training.models import WeeklyClientSummary, WorkoutSession
+from training.services.weekly_summaries import refresh_weeks, week_start
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute weekly client summaries from workout sessions for the "
+        "last few weeks (or all history with --weeks 0), a batch of "
+        "clients at a time. Safe to run multiple times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--weeks",
+            type=int,
+            default=2,
+            help="Weeks back to refresh, this week included; 0 for all.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Clients refreshed per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        sessions = WorkoutSession.objects.all()
+        summaries = WeeklyClientSummary.objects.all()
+        if options["weeks"] > 0:
+            since = week_start(timezone.localdate()) - datetime.timedelta(
+                weeks=options["weeks"] - 1
+            )
+            sessions = sessions.filter(date__gte=since)
+            summaries = summaries.filter(week_start__gte=since)
+
+        # Stored weeks too, so ones whose sessions are gone are cleared.
+        pairs_by_client = {}
+        for client_id, date in sessions.values_list(
+            "client_id", "date"
+        ).distinct():
+            pairs_by_client.setdefault(client_id, set()).add(
+                (client_id, week_start(date))
+            )
+        for client_id, week in summaries.values_list(
+            "client_id", "week_start"
+        ):
+            pairs_by_client.setdefault(client_id, set()).add(
+                (client_id, week)
+            )
+
+        batch_size = options["batch_size"]
+        client_ids = sorted(pairs_by_client)
+        written = 0
+        for start in range(0, len(client_ids), batch_size):
+            pairs = set()
+            for client_id in client_ids[start:start + batch_size]:
+                pairs |= pairs_by_client[client_id]
+            written += refresh_weeks(pairs)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Refreshed {written} weekly summary(ies) for "
+                f"{len(client_ids)} client(s)."
+            )
+        )
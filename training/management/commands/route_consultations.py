@@ -0,0 +1,57 @@
+"""Route NEW 1:1/online consultations to the least-loaded trainer."""
+from django.core.management.base import BaseCommand
+
+from accounts.services.consultation_routing import route_new_consultations
+
+
+class Command(BaseCommand):
+    help = (
+        "Assign unassigned NEW 1:1/Online consultations to trainers, "
+        "balancing active programmes, open tickets and coaching fit. "
+        "Safe to run multiple times."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Consultations loaded and planned per batch.",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Route at most this many consultations.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Show the plan without assigning anything.",
+        )
+
+    def handle(self, *args, **options):
+        summary = route_new_consultations(
+            batch_size=options["batch_size"],
+            limit=options["limit"],
+            dry_run=options["dry_run"],
+        )
+
+        if options["dry_run"]:
+            for consultation_id, trainer_id in summary["pairs"]:
+                self.stdout.write(
+                    f"Consultation {consultation_id} -> trainer {trainer_id}"
+                )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Planned {len(summary['pairs'])} consultation(s)."
+                )
+            )
+            return
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Routed {summary['routed']} consultation(s) "
+                f"({summary['failed']} skipped)."
+            )
+        )
@@ -0,0 +1,117 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copies of training.models.normalise_email/normalise_phone as they
+# were when this migration was written, so later changes to those helpers
+# don't change what it does.
+def normalise_email(value):
+    email = (value or "").strip().lower()
+    local, sep, domain = email.partition("@")
+    if not sep:
+        return email
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}"
+
+
+def normalise_phone(value):
+    digits = "".join(ch for ch in (value or "") if ch.isdigit())
+    if len(digits) < 7:
+        return ""
+    return digits[-10:]
+
+
+def backfill_fingerprints(apps, schema_editor):
+    """Fill the normalised columns for existing rows in id-ordered batches."""
+    batch_size = 500
+    for model_name in ("ConsultationRequest", "ContactQuery"):
+        model = apps.get_model("training", model_name)
+        last_id = 0
+        while True:
+            rows = list(
+                model.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .only("id", "email", "phone")[:batch_size]
+            )
+            if not rows:
+                break
+            for row in rows:
+                row.email_normalised = normalise_email(row.email)
+                row.phone_normalised = normalise_phone(row.phone)
+            model.objects.bulk_update(
+                rows,
+                ["email_normalised", "phone_normalised"],
+            )
+            last_id = rows[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0016_alter_contactquery_options'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='consultationrequest',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier submission from the same person.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='training.consultationrequest'),
+        ),
+        migrations.AddField(
+            model_name='consultationrequest',
+            name='email_normalised',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='consultationrequest',
+            name='phone_normalised',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='consultationrequest',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=1, help_text='How many times this person submitted before triage.'),
+        ),
+        migrations.AddField(
+            model_name='contactquery',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Earlier submission from the same person.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='training.contactquery'),
+        ),
+        migrations.AddField(
+            model_name='contactquery',
+            name='email_normalised',
+            field=models.CharField(blank=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='contactquery',
+            name='phone_normalised',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='contactquery',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=1, help_text='How many times this person submitted before triage.'),
+        ),
+        migrations.RunPython(
+            backfill_fingerprints,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['email_normalised', 'status'], name='consult_email_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='consultationrequest',
+            index=models.Index(fields=['phone_normalised'], name='consult_phone_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactquery',
+            index=models.Index(fields=['email_normalised', 'status'], name='contact_email_norm_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactquery',
+            index=models.Index(fields=['phone_normalised'], name='contact_phone_norm_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0017_lead_fingerprints'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntakeSubmission',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('consultation', 'Consultation request'), ('contact', 'Contact query')], max_length=20)),
+                ('payload', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
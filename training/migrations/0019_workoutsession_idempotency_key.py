@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0018_intakesubmission'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workoutsession',
+            name='idempotency_key',
+            field=models.UUIDField(blank=True, editable=False, help_text='Generated by the client app so retried saves are stored once.', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='workoutsession',
+            constraint=models.UniqueConstraint(fields=('client', 'idempotency_key'), name='uniq_session_idempotency_key'),
+        ),
+    ]
@@ -0,0 +1,159 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+EDITABLE_FIELDS = (
+    "exercise_name",
+    "target_sets",
+    "target_reps",
+    "target_weight_kg",
+)
+
+
+def _tree(ProgrammeDay, block_id):
+    """[(day, [exercises])] for a block, in display order."""
+    days = (
+        ProgrammeDay.objects.filter(block_id=block_id)
+        .order_by("order", "id")
+        .prefetch_related("exercises")
+    )
+    return [
+        (day, sorted(day.exercises.all(), key=lambda ex: (ex.order, ex.id)))
+        for day in days
+    ]
+
+
+def _same_shape(template_tree, clone_tree):
+    if len(template_tree) != len(clone_tree):
+        return False
+    for (t_day, t_exercises), (c_day, c_exercises) in zip(
+        template_tree, clone_tree
+    ):
+        if (t_day.name, t_day.order) != (c_day.name, c_day.order):
+            return False
+        if len(t_exercises) != len(c_exercises):
+            return False
+    return True
+
+
+def collapse_clones(apps, schema_editor):
+    """
+    Turn deep-copied tailored blocks into copy-on-write blocks when their
+    days and exercises still line up one-to-one with the template.
+    Edited values become override rows; clones whose structure drifted
+    from the template are left as full copies.
+    """
+    ProgrammeBlock = apps.get_model("training", "ProgrammeBlock")
+    ProgrammeDay = apps.get_model("training", "ProgrammeDay")
+    Override = apps.get_model("training", "ProgrammeExerciseOverride")
+    WorkoutSession = apps.get_model("training", "WorkoutSession")
+
+    template_trees = {}
+    clones = ProgrammeBlock.objects.filter(
+        is_template=False,
+        copy_on_write=False,
+        parent_template__isnull=False,
+    ).values_list("id", "parent_template_id")
+
+    for clone_id, template_id in clones.iterator():
+        if template_id not in template_trees:
+            template_trees[template_id] = _tree(ProgrammeDay, template_id)
+        template_tree = template_trees[template_id]
+        clone_tree = _tree(ProgrammeDay, clone_id)
+        if not _same_shape(template_tree, clone_tree):
+            continue
+
+        overrides = []
+        for (t_day, t_exercises), (c_day, c_exercises) in zip(
+            template_tree, clone_tree
+        ):
+            WorkoutSession.objects.filter(programme_day_id=c_day.id).update(
+                programme_day_id=t_day.id
+            )
+            for t_ex, c_ex in zip(t_exercises, c_exercises):
+                values = {f: getattr(c_ex, f) for f in EDITABLE_FIELDS}
+                if any(getattr(t_ex, f) != v for f, v in values.items()):
+                    overrides.append(
+                        Override(block_id=clone_id, exercise_id=t_ex.id,
+                                 **values)
+                    )
+
+        Override.objects.bulk_create(overrides)
+        ProgrammeDay.objects.filter(block_id=clone_id).delete()
+        ProgrammeBlock.objects.filter(id=clone_id).update(copy_on_write=True)
+
+
+def materialise_blocks(apps, schema_editor):
+    """Reverse: give every copy-on-write block its own days again."""
+    ProgrammeBlock = apps.get_model("training", "ProgrammeBlock")
+    ProgrammeDay = apps.get_model("training", "ProgrammeDay")
+    ProgrammeExercise = apps.get_model("training", "ProgrammeExercise")
+    Override = apps.get_model("training", "ProgrammeExerciseOverride")
+    WorkoutSession = apps.get_model("training", "WorkoutSession")
+
+    blocks = ProgrammeBlock.objects.filter(copy_on_write=True)
+    for block in blocks.iterator():
+        overrides = {
+            o.exercise_id: o
+            for o in Override.objects.filter(block_id=block.id)
+        }
+        for t_day, t_exercises in _tree(
+            ProgrammeDay, block.parent_template_id
+        ):
+            day = ProgrammeDay.objects.create(
+                block_id=block.id,
+                name=t_day.name,
+                order=t_day.order,
+            )
+            ProgrammeExercise.objects.bulk_create(
+                [
+                    ProgrammeExercise(
+                        day_id=day.id,
+                        order=t_ex.order,
+                        **{
+                            f: getattr(overrides.get(t_ex.id, t_ex), f)
+                            for f in EDITABLE_FIELDS
+                        },
+                    )
+                    for t_ex in t_exercises
+                ]
+            )
+            WorkoutSession.objects.filter(
+                client_programme__block_id=block.id,
+                programme_day_id=t_day.id,
+            ).update(programme_day_id=day.id)
+        ProgrammeBlock.objects.filter(id=block.id).update(
+            copy_on_write=False
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0019_workoutsession_idempotency_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='programmeblock',
+            name='copy_on_write',
+            field=models.BooleanField(default=False, help_text="Tailored copy that reads the template's days and exercises and stores only per-client overrides."),
+        ),
+        migrations.CreateModel(
+            name='ProgrammeExerciseOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('exercise_name', models.CharField(max_length=120)),
+                ('target_sets', models.PositiveIntegerField()),
+                ('target_reps', models.PositiveIntegerField()),
+                ('target_weight_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True)),
+                ('block', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exercise_overrides', to='training.programmeblock')),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='overrides', to='training.programmeexercise')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('block', 'exercise'), name='uniq_override_per_block_exercise')],
+            },
+        ),
+        migrations.RunPython(collapse_clones, materialise_blocks),
+    ]
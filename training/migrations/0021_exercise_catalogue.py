@@ -0,0 +1,49 @@
+# Generated by Django 6.0.1 on 2026-10-19 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0020_copy_on_write_tailored_blocks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Exercise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('name_normalised', models.CharField(editable=False, max_length=120, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='programmeexercise',
+            name='exercise',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='programme_exercises', to='training.exercise'),
+        ),
+        migrations.AddField(
+            model_name='workoutset',
+            name='exercise',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='workout_sets', to='training.exercise'),
+        ),
+        migrations.CreateModel(
+            name='ExerciseAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=120)),
+                ('name_normalised', models.CharField(editable=False, max_length=120, unique=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='training.exercise')),
+            ],
+            options={
+                'verbose_name_plural': 'exercise aliases',
+                'ordering': ['name'],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0021_exercise_catalogue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PersonalRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_weight_kg', models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True)),
+                ('best_weight_reps', models.PositiveIntegerField(blank=True, help_text='Most reps done at the best weight.', null=True)),
+                ('best_weight_on', models.DateField(blank=True, null=True)),
+                ('best_e1rm_kg', models.DecimalField(blank=True, decimal_places=2, help_text='Best estimated one-rep max (Epley formula).', max_digits=6, null=True)),
+                ('best_e1rm_on', models.DateField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to=settings.AUTH_USER_MODEL)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_records', to='training.exercise')),
+            ],
+            options={
+                'ordering': ['client', 'exercise__name'],
+                'constraints': [models.UniqueConstraint(fields=('client', 'exercise'), name='uniq_record_per_client_exercise')],
+            },
+        ),
+    ]
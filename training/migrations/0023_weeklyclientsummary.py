@@ -0,0 +1,34 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0022_personalrecord'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeeklyClientSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('week_start', models.DateField(help_text='Monday of the week.')),
+                ('sessions_logged', models.PositiveIntegerField(default=0)),
+                ('sessions_planned', models.PositiveIntegerField(default=0)),
+                ('sessions_skipped', models.PositiveIntegerField(default=0)),
+                ('total_volume_kg', models.DecimalField(decimal_places=2, default=0, help_text="Sum of weight x reps over the week's logged sets.", max_digits=12)),
+                ('avg_rpe', models.DecimalField(blank=True, decimal_places=2, max_digits=4, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='weekly_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['client', '-week_start'],
+                'constraints': [models.UniqueConstraint(fields=('client', 'week_start'), name='uniq_summary_per_client_week')],
+            },
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0023_weeklyclientsummary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySupportStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('tickets_opened', models.PositiveIntegerField(default=0)),
+                ('tickets_answered', models.PositiveIntegerField(default=0)),
+                ('response_seconds', models.PositiveBigIntegerField(default=0, help_text='Total time to the first staff reply, answered tickets.')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyLeadStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('coaching_option', models.CharField(choices=[('1to1', '1:1 Personal Training'), ('small_group', 'Small Group Coaching'), ('large_group', 'Larger Group Classes'), ('online', 'Online Coaching')], max_length=20)),
+                ('leads', models.PositiveIntegerField(default=0)),
+                ('converted', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['-date', 'coaching_option'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'coaching_option'), name='uniq_lead_stat_per_day_option')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyTrainerStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('active_clients', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('trainer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date', 'trainer'],
+                'constraints': [models.UniqueConstraint(fields=('date', 'trainer'), name='uniq_trainer_stat_per_day')],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-19 18:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('training', '0024_daily_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyTrainerSupportStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('responses', models.PositiveIntegerField(default=0)),
+                ('response_seconds', models.PositiveBigIntegerField(default=0)),
+                ('breaches', models.PositiveIntegerField(default=0, help_text='First replies later than SUPPORT_SLA_HOURS.')),
+                ('resolutions', models.PositiveIntegerField(default=0)),
+                ('resolution_seconds', models.PositiveBigIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-date', 'trainer'],
+            },
+        ),
+        migrations.AddField(
+            model_name='supportticket',
+            name='first_response_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When staff first replied.', null=True),
+        ),
+        migrations.AddField(
+            model_name='supportticket',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, editable=False, help_text='When the ticket was last closed.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['first_response_at', 'created_at'], name='ticket_awaiting_reply_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailytrainersupportstat',
+            name='trainer',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_support_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='dailytrainersupportstat',
+            constraint=models.UniqueConstraint(fields=('date', 'trainer'), name='uniq_support_stat_per_trainer_day'),
+        ),
+    ]
@@ -3,7 +3,91 @@ from django.db import models
 from django.utils import timezone
 
 
-class ConsultationRequest(models.Model):
+def normalise_email(value):
+    """
+    Lowercase an email and drop any "+tag" so repeat submissions from the
+    same mailbox share one fingerprint.
+    """
+    email = (value or "").strip().lower()
+    local, sep, domain = email.partition("@")
+    if not sep:
+        return email
+    local = local.split("+", 1)[0]
+    return f"{local}@{domain}"
+
+
+def normalise_phone(value):
+    """
+    Reduce a phone number to its last 10 digits so "07700 900123" and
+    "+44 7700 900123" match. Short or empty values return "".
+    """
+    digits = "".join(ch for ch in (value or "") if ch.isdigit())
+    if len(digits) < 7:
+        return ""
+    return digits[-10:]
+
+
+def normalise_exercise_name(value):
+    """
+    Lowercase an exercise name and reduce punctuation to single spaces so
+    "Bench-Press", "bench press" and " Bench  Press " share one identity.
+    """
+    cleaned = "".join(
+        ch if ch.isalnum() else " " for ch in (value or "").lower()
+    )
+    return " ".join(cleaned.split())
+
+
+class LeadFingerprintMixin(models.Model):
+    """
+    Normalised contact columns shared by the public intake models so
+    repeat submitters can be found with an indexed lookup.
+    """
+
+    email_normalised = models.CharField(
+        max_length=254,
+        blank=True,
+        editable=False,
+    )
+    phone_normalised = models.CharField(
+        max_length=20,
+        blank=True,
+        editable=False,
+    )
+    submission_count = models.PositiveIntegerField(
+        default=1,
+        help_text="How many times this person submitted before triage.",
+    )
+    duplicate_of = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="duplicates",
+        help_text="Earlier submission from the same person.",
+    )
+
+    class Meta:
+        abstract = True
+
+    def refresh_fingerprint(self):
+        self.email_normalised = normalise_email(self.email)
+        self.phone_normalised = normalise_phone(self.phone)
+
+    def save(self, *args, **kwargs):
+        self.refresh_fingerprint()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and (
+            "email" in update_fields or "phone" in update_fields
+        ):
+            kwargs["update_fields"] = set(update_fields) | {
+                "email_normalised",
+                "phone_normalised",
+            }
+        super().save(*args, **kwargs)
+
+
+class ConsultationRequest(LeadFingerprintMixin):
     TRAINING_GOAL_CHOICES = [
         ("fat_loss", "Fat loss / body composition"),
         ("strength", "Strength & performance"),
@@ -89,12 +173,22 @@ class ConsultationRequest(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                fields=["email_normalised", "status"],
+                name="consult_email_norm_idx",
+            ),
+            models.Index(
+                fields=["phone_normalised"],
+                name="consult_phone_norm_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.last_name} - {self.email}"
 
 
-class ContactQuery(models.Model):
+class ContactQuery(LeadFingerprintMixin):
     COACHING_1TO1 = "1to1"
     COACHING_SMALL = "small_group"
     COACHING_LARGE = "large_group"
@@ -158,6 +252,16 @@ class ContactQuery(models.Model):
     class Meta:
         ordering = ["-created_at"]
         verbose_name_plural = "Contact queries"
+        indexes = [
+            models.Index(
+                fields=["email_normalised", "status"],
+                name="contact_email_norm_idx",
+            ),
+            models.Index(
+                fields=["phone_normalised"],
+                name="contact_phone_norm_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         created = (
@@ -198,11 +302,30 @@ class SupportTicket(models.Model):
         choices=STATUS_CHOICES,
         default=STATUS_OPEN,
     )
+    first_response_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When staff first replied.",
+    )
+    resolved_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="When the ticket was last closed.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Open tickets still waiting for a first reply.
+            models.Index(
+                fields=["first_response_at", "created_at"],
+                name="ticket_awaiting_reply_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return f"{self.subject} ({self.get_status_display()})"
@@ -234,6 +357,102 @@ class SupportMessage(models.Model):
         return f"Message on {self.ticket} by {self.sender} at {created}"
 
 
+class ExerciseManager(models.Manager):
+    def resolve(self, names, create=True):
+        """
+        Map exercise names to catalogue ids by normalised name, then alias.
+        Unknown names become new catalogue entries unless ``create`` is
+        False. Returns {name: exercise_id or None}.
+        """
+        keys = {name: normalise_exercise_name(name) for name in set(names)}
+        wanted = {key for key in keys.values() if key}
+        found = {}
+        if wanted:
+            found.update(
+                self.filter(name_normalised__in=wanted).values_list(
+                    "name_normalised", "id"
+                )
+            )
+        missing = wanted - set(found)
+        if missing:
+            found.update(
+                ExerciseAlias.objects.filter(
+                    name_normalised__in=missing
+                ).values_list("name_normalised", "exercise_id")
+            )
+            missing -= set(found)
+        if create and missing:
+            new = {}
+            for name, key in sorted(keys.items()):
+                if key in missing and key not in new:
+                    new[key] = Exercise(
+                        name=name.strip(),
+                        name_normalised=key,
+                    )
+            # Another request may add the same name; keep whichever won.
+            self.bulk_create(new.values(), ignore_conflicts=True)
+            found.update(
+                self.filter(name_normalised__in=missing).values_list(
+                    "name_normalised", "id"
+                )
+            )
+        return {name: found.get(key) for name, key in keys.items()}
+
+
+class Exercise(models.Model):
+    """
+    Catalogue entry giving one identity to an exercise, however its name
+    is spelled in programmes and workout logs.
+    """
+
+    name = models.CharField(max_length=120)
+    name_normalised = models.CharField(
+        max_length=120,
+        unique=True,
+        editable=False,
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ExerciseManager()
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        self.name_normalised = normalise_exercise_name(self.name)
+        super().save(*args, **kwargs)
+
+
+class ExerciseAlias(models.Model):
+    """Another spelling of a catalogue exercise."""
+
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="aliases",
+    )
+    name = models.CharField(max_length=120)
+    name_normalised = models.CharField(
+        max_length=120,
+        unique=True,
+        editable=False,
+    )
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "exercise aliases"
+
+    def __str__(self):
+        return f"{self.name} -> {self.exercise}"
+
+    def save(self, *args, **kwargs):
+        self.name_normalised = normalise_exercise_name(self.name)
+        super().save(*args, **kwargs)
+
+
 class WorkoutSession(models.Model):
     """
     One workout completed by a client on a given date.
@@ -280,6 +499,13 @@ class WorkoutSession(models.Model):
         default=STATUS_LOGGED,
     )
     notes = models.TextField(blank=True)
+    idempotency_key = models.UUIDField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Generated by the client app so retried saves are "
+        "stored once.",
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -294,7 +520,11 @@ class WorkoutSession(models.Model):
                     "week_number",
                 ],
                 name="uniq_session_per_week_day",
-            )
+            ),
+            models.UniqueConstraint(
+                fields=["client", "idempotency_key"],
+                name="uniq_session_idempotency_key",
+            ),
         ]
 
     def __str__(self) -> str:
@@ -312,6 +542,14 @@ class WorkoutSet(models.Model):
         related_name="sets",
     )
     exercise_name = models.CharField(max_length=120)
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="workout_sets",
+    )
     set_number = models.PositiveIntegerField()
     reps = models.PositiveIntegerField()
     weight_kg = models.DecimalField(
@@ -336,6 +574,225 @@ class WorkoutSet(models.Model):
         return f"{self.session} - {self.exercise_name} set {self.set_number}"
 
 
+class PersonalRecord(models.Model):
+    """
+    A client's best results for one catalogue exercise. Updated as sets
+    are saved, so showing PRs never scans WorkoutSet.
+    """
+
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="personal_records",
+    )
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="personal_records",
+    )
+    best_weight_kg = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    best_weight_reps = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Most reps done at the best weight.",
+    )
+    best_weight_on = models.DateField(null=True, blank=True)
+    best_e1rm_kg = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Best estimated one-rep max (Epley formula).",
+    )
+    best_e1rm_on = models.DateField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["client", "exercise__name"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "exercise"],
+                name="uniq_record_per_client_exercise",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.client} - {self.exercise}"
+
+
+class WeeklyClientSummary(models.Model):
+    """
+    One client's training load for one week (Monday to Sunday). Refreshed
+    when the client's sessions change and by a nightly catch-up, so
+    rosters read adherence without scanning WorkoutSession.
+    """
+
+    client = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="weekly_summaries",
+    )
+    week_start = models.DateField(help_text="Monday of the week.")
+    sessions_logged = models.PositiveIntegerField(default=0)
+    sessions_planned = models.PositiveIntegerField(default=0)
+    sessions_skipped = models.PositiveIntegerField(default=0)
+    total_volume_kg = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text="Sum of weight x reps over the week's logged sets.",
+    )
+    avg_rpe = models.DecimalField(
+        max_digits=4,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["client", "-week_start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["client", "week_start"],
+                name="uniq_summary_per_client_week",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.client} - week of {self.week_start}"
+
+    @property
+    def sessions_scheduled(self):
+        return (
+            self.sessions_logged
+            + self.sessions_planned
+            + self.sessions_skipped
+        )
+
+    @property
+    def adherence_pct(self):
+        """Logged sessions as a percentage of the week's sessions."""
+        if not self.sessions_scheduled:
+            return None
+        return round(100 * self.sessions_logged / self.sessions_scheduled)
+
+
+class DailyLeadStat(models.Model):
+    """
+    Consultation requests received on one day for one coaching option,
+    and how many of them have since become clients with a programme.
+    """
+
+    date = models.DateField()
+    coaching_option = models.CharField(
+        max_length=20,
+        choices=ConsultationRequest.COACHING_OPTION_CHOICES,
+    )
+    leads = models.PositiveIntegerField(default=0)
+    converted = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date", "coaching_option"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "coaching_option"],
+                name="uniq_lead_stat_per_day_option",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.coaching_option}: {self.leads} lead(s)"
+
+
+class DailyTrainerStat(models.Model):
+    """Active clients per trainer, as counted on one day."""
+
+    date = models.DateField()
+    trainer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_stats",
+    )
+    active_clients = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date", "trainer"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "trainer"],
+                name="uniq_trainer_stat_per_day",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.trainer}: {self.active_clients} client(s)"
+
+
+class DailySupportStat(models.Model):
+    """
+    Support tickets opened on one day and how quickly staff first
+    replied to them.
+    """
+
+    date = models.DateField(unique=True)
+    tickets_opened = models.PositiveIntegerField(default=0)
+    tickets_answered = models.PositiveIntegerField(default=0)
+    response_seconds = models.PositiveBigIntegerField(
+        default=0,
+        help_text="Total time to the first staff reply, answered tickets.",
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"{self.date}: {self.tickets_opened} ticket(s)"
+
+
+class DailyTrainerSupportStat(models.Model):
+    """
+    One trainer's support activity on one day: first replies (and how
+    many missed the SLA) and resolutions, with their total durations.
+    Rolling SLA figures sum a few of these rows.
+    """
+
+    date = models.DateField()
+    trainer = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="daily_support_stats",
+    )
+    responses = models.PositiveIntegerField(default=0)
+    response_seconds = models.PositiveBigIntegerField(default=0)
+    breaches = models.PositiveIntegerField(
+        default=0,
+        help_text="First replies later than SUPPORT_SLA_HOURS.",
+    )
+    resolutions = models.PositiveIntegerField(default=0)
+    resolution_seconds = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-date", "trainer"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "trainer"],
+                name="uniq_support_stat_per_trainer_day",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.trainer}: {self.responses} reply(ies)"
+
+
 class BodyMetricEntry(models.Model):
     """
     Periodic check-in metrics for a client.
@@ -406,6 +863,11 @@ class ProgrammeBlock(models.Model):
         on_delete=models.SET_NULL,
         related_name="tailored_copies",
     )
+    copy_on_write = models.BooleanField(
+        default=False,
+        help_text="Tailored copy that reads the template's days and "
+        "exercises and stores only per-client overrides.",
+    )
 
     class Meta:
         ordering = ["name"]
@@ -413,6 +875,33 @@ class ProgrammeBlock(models.Model):
     def __str__(self):
         return self.name
 
+    @property
+    def content_block_id(self):
+        """Id of the block whose days/exercises this block uses."""
+        if self.copy_on_write and self.parent_template_id:
+            return self.parent_template_id
+        return self.id
+
+    def programme_days(self):
+        """Days for this block (the template's for copy-on-write copies)."""
+        return ProgrammeDay.objects.filter(block_id=self.content_block_id)
+
+    def materialise_copies(self):
+        """
+        Give this template's copy-on-write copies their own days and
+        exercises. Called before any of the template's rows are deleted:
+        the copies read them, so the deletion would otherwise reach every
+        client and unlink their logged sessions.
+        """
+        from .services.tailored_programmes import materialise_block
+
+        for copy in self.tailored_copies.filter(copy_on_write=True):
+            materialise_block(copy)
+
+    def delete(self, *args, **kwargs):
+        self.materialise_copies()
+        return super().delete(*args, **kwargs)
+
 
 class ProgrammeDay(models.Model):
     block = models.ForeignKey(
@@ -429,6 +918,10 @@ class ProgrammeDay(models.Model):
     def __str__(self):
         return f"{self.block.name} - {self.name}"
 
+    def delete(self, *args, **kwargs):
+        self.block.materialise_copies()
+        return super().delete(*args, **kwargs)
+
 
 class ProgrammeExercise(models.Model):
     day = models.ForeignKey(
@@ -437,6 +930,14 @@ class ProgrammeExercise(models.Model):
         related_name="exercises",
     )
     exercise_name = models.CharField(max_length=120)
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name="programme_exercises",
+    )
     target_sets = models.PositiveIntegerField(default=3)
     target_reps = models.PositiveIntegerField(default=10)
     target_weight_kg = models.DecimalField(
@@ -457,6 +958,70 @@ class ProgrammeExercise(models.Model):
             f"({self.target_sets} x {self.target_reps})"
         )
 
+    def delete(self, *args, **kwargs):
+        self.day.block.materialise_copies()
+        return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Name as loaded, so save() only re-links the catalogue on a rename.
+        instance._loaded_name = instance.__dict__.get("exercise_name")
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded_name = getattr(self, "_loaded_name", None)
+        if self.exercise_id is None or (
+            loaded_name is not None and loaded_name != self.exercise_name
+        ):
+            self.exercise_id = Exercise.objects.resolve(
+                [self.exercise_name]
+            )[self.exercise_name]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "exercise_name" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"exercise"}
+        super().save(*args, **kwargs)
+        self._loaded_name = self.exercise_name
+
+
+class ProgrammeExerciseOverride(models.Model):
+    """
+    Per-client values for one template exercise inside a copy-on-write
+    tailored block. Holds every editable field; no row means the
+    template's values apply.
+    """
+
+    block = models.ForeignKey(
+        ProgrammeBlock,
+        on_delete=models.CASCADE,
+        related_name="exercise_overrides",
+    )
+    exercise = models.ForeignKey(
+        ProgrammeExercise,
+        on_delete=models.CASCADE,
+        related_name="overrides",
+    )
+    exercise_name = models.CharField(max_length=120)
+    target_sets = models.PositiveIntegerField()
+    target_reps = models.PositiveIntegerField()
+    target_weight_kg = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        null=True,
+        blank=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["block", "exercise"],
+                name="uniq_override_per_block_exercise",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.block} - {self.exercise_name}"
+
 
 class ClientProgramme(models.Model):
     client = models.ForeignKey(
@@ -494,3 +1059,55 @@ class ClientProgramme(models.Model):
 
     def __str__(self):
         return f"{self.client} - {self.block}"
+
+
+class IntakeSubmission(models.Model):
+    """
+    Raw public form submission waiting to be written to the lead tables.
+
+    Used when INTAKE_DEFERRED_WRITES is on: the table is append-only with
+    no foreign keys, so a burst of submissions does not contend with the
+    trainer dashboards reading ConsultationRequest/ContactQuery.
+    """
+
+    KIND_CONSULTATION = "consultation"
+    KIND_CONTACT = "contact"
+    KIND_CHOICES = [
+        (KIND_CONSULTATION, "Consultation request"),
+        (KIND_CONTACT, "Contact query"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["id"]
+
+    def __str__(self) -> str:
+        return f"{self.get_kind_display()} queued at {self.created_at}"
+
+
+class ArchivedRecord(models.Model):
+    """
+    Data moved out of a hot table by the ``archive_data`` command.
+
+    ``payload`` is zlib-compressed JSON: the archived text fields of a row
+    that stays in place, or every field of a row that was moved out whole.
+    """
+
+    model = models.CharField(max_length=100)
+    object_id = models.PositiveBigIntegerField()
+    payload = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["model", "object_id"],
+                name="archived_record_object_uniq",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} #{self.object_id}"
@@ -0,0 +1,254 @@
+"""
+Archival tier for old data.
+
+``archive_old_data`` moves data older than ARCHIVE_AFTER_DAYS out of the
+hot tables in batches, one short transaction each, into ArchivedRecord
+as zlib-compressed JSON. ``POLICIES`` says what goes. Workout sessions
+and support messages stay in place (sets, SLA figures and summaries
+refer to them) and only their free text, most of each row, is moved.
+Closed contact queries are moved out whole.
+
+History pages read through the archive: ``with_archived_text`` puts
+moved text back on the objects a page shows, and ``archived_instance``
+rebuilds a moved row. Saving either sends the data back to the hot
+table and drops the archived copy.
+"""
+
+import datetime
+import json
+import time
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+
+from ..models import (
+    ArchivedRecord,
+    ContactQuery,
+    SupportMessage,
+    SupportTicket,
+    WorkoutSession,
+)
+
+# Name -> what is archived. "fields" lists the text fields moved out of
+# rows that stay; None moves the whole row. Rows qualify once
+# "age_field" is past the horizon and they match "filters".
+POLICIES = {
+    "session_notes": {
+        "model": WorkoutSession,
+        "age_field": "created_at",
+        "fields": ["notes"],
+        "filters": {},
+    },
+    "support_messages": {
+        "model": SupportMessage,
+        "age_field": "created_at",
+        "fields": ["body"],
+        "filters": {"ticket__status": SupportTicket.STATUS_CLOSED},
+    },
+    "contact_queries": {
+        "model": ContactQuery,
+        "age_field": "updated_at",
+        "fields": None,
+        "filters": {"status": ContactQuery.STATUS_CLOSED},
+    },
+}
+
+
+def _label(model):
+    return model._meta.label_lower
+
+
+def _archived_fields(model):
+    for policy in POLICIES.values():
+        if policy["model"] is model:
+            return policy["fields"]
+    return None
+
+
+def _candidates(policy, cutoff):
+    queryset = policy["model"].objects.filter(
+        **{f"{policy['age_field']}__lt": cutoff}, **policy["filters"]
+    )
+    for field in policy["fields"] or ():
+        queryset = queryset.exclude(**{field: ""})
+    return queryset
+
+
+def archive_batch(policy, cutoff, batch_size):
+    """
+    Archive up to ``batch_size`` qualifying rows, oldest id first, in one
+    transaction. Returns (rows, bytes moved, bytes stored).
+    """
+    model = policy["model"]
+    ids = list(
+        _candidates(policy, cutoff)
+        .order_by("pk")
+        .values_list("pk", flat=True)[:batch_size]
+    )
+    if not ids:
+        return 0, 0, 0
+    fields = policy["fields"] or [
+        field.attname for field in model._meta.concrete_fields
+    ]
+    records = []
+    moved = stored = 0
+    with transaction.atomic():
+        rows = (
+            model.objects.filter(pk__in=ids)
+            .select_for_update()
+            .values_list("pk", *fields)
+        )
+        for pk, *values in rows:
+            data = json.dumps(
+                dict(zip(fields, values)), cls=DjangoJSONEncoder
+            ).encode()
+            payload = zlib.compress(data)
+            moved += len(data)
+            stored += len(payload)
+            records.append(
+                ArchivedRecord(
+                    model=_label(model), object_id=pk, payload=payload
+                )
+            )
+        # A row archived before, brought back and edited replaces its
+        # old copy.
+        ArchivedRecord.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["model", "object_id"],
+            update_fields=["payload", "archived_at"],
+        )
+        archived = model.objects.filter(
+            pk__in=[record.object_id for record in records]
+        )
+        if policy["fields"]:
+            archived.update(**{field: "" for field in policy["fields"]})
+        else:
+            archived.delete()
+    return len(records), moved, stored
+
+
+def archive_old_data(batch_size=500, pause=0.0, now=None):
+    """
+    Archive everything past the horizon. Returns {policy name: {"rows",
+    "moved", "stored"}}, the byte counts being the data's JSON size
+    before and after compression.
+    """
+    cutoff = (now or timezone.now()) - datetime.timedelta(
+        days=settings.ARCHIVE_AFTER_DAYS
+    )
+    results = {}
+    for name, policy in POLICIES.items():
+        totals = {"rows": 0, "moved": 0, "stored": 0}
+        while True:
+            rows, moved, stored = archive_batch(policy, cutoff, batch_size)
+            if not rows:
+                break
+            totals["rows"] += rows
+            totals["moved"] += moved
+            totals["stored"] += stored
+            if pause:
+                time.sleep(pause)
+        results[name] = totals
+    return results
+
+
+def _unpack(payload):
+    return json.loads(zlib.decompress(payload))
+
+
+def with_archived_text(objects):
+    """
+    Put archived text back on ``objects`` (instances of one archived
+    model) and return them as a list. Costs one query, and only when
+    some of them have a blank archived field.
+    """
+    objects = list(objects)
+    if not objects:
+        return objects
+    model = type(objects[0])
+    fields = _archived_fields(model)
+    blank = {
+        obj.pk: obj
+        for obj in objects
+        if any(not getattr(obj, field) for field in fields)
+    }
+    if blank:
+        archived = ArchivedRecord.objects.filter(
+            model=_label(model), object_id__in=blank
+        ).values_list("object_id", "payload")
+        for object_id, payload in archived:
+            obj = blank[object_id]
+            for field, value in _unpack(payload).items():
+                setattr(obj, field, value)
+            obj._from_archive = True
+    return objects
+
+
+def archived_instance(model, pk):
+    """
+    Rebuild a row that was moved out whole, or return None. Saving the
+    instance inserts it back into the hot table.
+    """
+    payload = (
+        ArchivedRecord.objects.filter(model=_label(model), object_id=pk)
+        .values_list("payload", flat=True)
+        .first()
+    )
+    if payload is None:
+        return None
+    data = _unpack(payload)
+    obj = model(
+        **{
+            field.attname: field.to_python(data[field.attname])
+            for field in model._meta.concrete_fields
+            if field.attname in data
+        }
+    )
+    obj._from_archive = True
+    return obj
+
+
+def drop_archived(obj):
+    """Forget the archived copy of ``obj`` once it is current again."""
+    ArchivedRecord.objects.filter(
+        model=_label(type(obj)), object_id=obj.pk
+    ).delete()
+
+
+def _table_bytes(table):
+    """On-disk size of a table and its indexes, where the database says."""
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT pg_total_relation_size(%s::regclass)", [table]
+            )
+        elif connection.vendor == "sqlite":
+            try:
+                cursor.execute(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name IN "
+                    "(SELECT name FROM sqlite_master WHERE tbl_name = %s)",
+                    [table],
+                )
+            except DatabaseError:
+                # SQLite built without the dbstat table.
+                return None
+        else:
+            return None
+        return cursor.fetchone()[0]
+
+
+def table_sizes():
+    """[(table, rows, bytes or None)] for the hot tables and the archive."""
+    models = [policy["model"] for policy in POLICIES.values()]
+    return [
+        (
+            model._meta.db_table,
+            model.objects.count(),
+            _table_bytes(model._meta.db_table),
+        )
+        for model in models + [ArchivedRecord]
+    ]
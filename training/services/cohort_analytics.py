@@ -0,0 +1,269 @@
+"""Daily rollups behind the owner analytics dashboard."""
+
+import datetime
+from collections import OrderedDict
+
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Exists,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Sum,
+)
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from precision_performance.db_routers import replica_reads
+from training.models import (
+    ClientProgramme,
+    ConsultationRequest,
+    DailyLeadStat,
+    DailySupportStat,
+    DailyTrainerStat,
+    SupportTicket,
+)
+
+from .weekly_summaries import week_start
+
+# Days recomputed on every run, so leads that convert and tickets that are
+# answered after the day they arrived are still counted.
+DEFAULT_LOOKBACK_DAYS = 35
+
+# Weeks of lead history shown on the dashboard.
+DASHBOARD_WEEKS = 8
+
+# Days of support tickets behind the dashboard's response time.
+SUPPORT_WINDOW_DAYS = 30
+
+
+def rollup_leads(start, end):
+    """
+    Rebuild DailyLeadStat rows for ``start``..``end`` (inclusive) in one
+    grouped query. Merged duplicate submissions are not counted; a lead is
+    converted once a client account with its email has a programme.
+    """
+    rows = (
+        ConsultationRequest.objects.filter(
+            created_at__date__range=(start, end),
+            duplicate_of__isnull=True,
+        )
+        .annotate(
+            day=TruncDate("created_at"),
+            has_programme=Exists(
+                ClientProgramme.objects.filter(
+                    client__email__iexact=OuterRef("email")
+                )
+            ),
+        )
+        .values("day", "coaching_option")
+        .annotate(
+            leads=Count("id"),
+            converted=Count("id", filter=Q(has_programme=True)),
+        )
+        .order_by()
+    )
+    stats = [
+        DailyLeadStat(
+            date=row["day"],
+            coaching_option=row["coaching_option"],
+            leads=row["leads"],
+            converted=row["converted"],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        DailyLeadStat.objects.filter(date__range=(start, end)).delete()
+        DailyLeadStat.objects.bulk_create(stats)
+    return len(stats)
+
+
+def rollup_trainers(day):
+    """
+    Record each trainer's active clients for ``day``. Assignments keep no
+    history, so this is a snapshot: only today's figures can be taken.
+    """
+    rows = (
+        ClientProgramme.objects.filter(
+            status="active",
+            trainer__isnull=False,
+        )
+        .values("trainer_id")
+        .annotate(active=Count("client_id", distinct=True))
+        .order_by()
+    )
+    stats = [
+        DailyTrainerStat(
+            date=day,
+            trainer_id=row["trainer_id"],
+            active_clients=row["active"],
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        DailyTrainerStat.objects.filter(date=day).delete()
+        DailyTrainerStat.objects.bulk_create(stats)
+    return len(stats)
+
+
+def rollup_support(start, end):
+    """
+    Rebuild DailySupportStat rows for tickets opened ``start``..``end``.
+    A ticket's response time runs to its stored first staff reply.
+    """
+    tickets = SupportTicket.objects.filter(
+        created_at__date__range=(start, end)
+    ).values_list("created_at", "first_response_at")
+    stats = {}
+    for created_at, first_reply_at in tickets.iterator(chunk_size=2000):
+        day = timezone.localdate(created_at)
+        stat = stats.get(day)
+        if stat is None:
+            stat = stats[day] = DailySupportStat(date=day)
+        stat.tickets_opened += 1
+        if first_reply_at is not None:
+            stat.tickets_answered += 1
+            stat.response_seconds += max(
+                int((first_reply_at - created_at).total_seconds()), 0
+            )
+    with transaction.atomic():
+        DailySupportStat.objects.filter(date__range=(start, end)).delete()
+        DailySupportStat.objects.bulk_create(stats.values())
+    return len(stats)
+
+
+def _first_source_day():
+    """Earliest day with a lead or a ticket, or None when there are none."""
+    days = [
+        value
+        for value in (
+            ConsultationRequest.objects.aggregate(
+                first=Min("created_at")
+            )["first"],
+            SupportTicket.objects.aggregate(first=Min("created_at"))["first"],
+        )
+        if value is not None
+    ]
+    return timezone.localdate(min(days)) if days else None
+
+
+def rollup_start(today, lookback_days=DEFAULT_LOOKBACK_DAYS):
+    """
+    First day the next run should recompute: the lookback window, reaching
+    back to the last stored day if runs were missed, or all history when
+    nothing has been rolled up yet.
+    """
+    stored = [
+        value
+        for value in (
+            DailyLeadStat.objects.aggregate(last=Max("date"))["last"],
+            DailySupportStat.objects.aggregate(last=Max("date"))["last"],
+        )
+        if value is not None
+    ]
+    if not stored:
+        return _first_source_day() or today
+    return min(today - datetime.timedelta(days=lookback_days), max(stored))
+
+
+def run_rollups(start=None, today=None):
+    """Recompute every rollup from ``start`` to today. Returns counts."""
+    today = today or timezone.localdate()
+    start = start or rollup_start(today)
+    return {
+        "start": start,
+        "leads": rollup_leads(start, today),
+        "support": rollup_support(start, today),
+        "trainers": rollup_trainers(today),
+    }
+
+
+def _rate(part, whole):
+    return round(100 * part / whole) if whole else None
+
+
+@replica_reads()
+def owner_summary(today=None, weeks=DASHBOARD_WEEKS):
+    """
+    Dashboard figures read from the rollups. Each part reads a fixed window
+    of rows, so the cost does not grow with history.
+    """
+    today = today or timezone.localdate()
+    since = week_start(today) - datetime.timedelta(weeks=weeks - 1)
+    options = ConsultationRequest.COACHING_OPTION_CHOICES
+
+    by_week = OrderedDict(
+        (
+            since + datetime.timedelta(weeks=n),
+            {value: 0 for value, _ in options},
+        )
+        for n in range(weeks)
+    )
+    conversion = {value: [0, 0] for value, _ in options}
+    for stat in DailyLeadStat.objects.filter(date__gte=since):
+        counts = by_week.get(week_start(stat.date))
+        if counts is None or stat.coaching_option not in counts:
+            continue
+        counts[stat.coaching_option] += stat.leads
+        conversion[stat.coaching_option][0] += stat.leads
+        conversion[stat.coaching_option][1] += stat.converted
+
+    lead_weeks = [
+        {
+            "week_start": week,
+            "counts": [counts[value] for value, _ in options],
+            "total": sum(counts.values()),
+        }
+        for week, counts in by_week.items()
+    ]
+    conversion_rows = [
+        {
+            "label": label,
+            "leads": conversion[value][0],
+            "converted": conversion[value][1],
+            "rate": _rate(conversion[value][1], conversion[value][0]),
+        }
+        for value, label in options
+    ]
+    total_leads = sum(row["leads"] for row in conversion_rows)
+    total_converted = sum(row["converted"] for row in conversion_rows)
+
+    trainer_day = DailyTrainerStat.objects.aggregate(last=Max("date"))["last"]
+    trainer_stats = list(
+        DailyTrainerStat.objects.filter(date=trainer_day)
+        .select_related("trainer")
+        .order_by("-active_clients", "trainer__username")
+    )
+
+    support = DailySupportStat.objects.filter(
+        date__gt=today - datetime.timedelta(days=SUPPORT_WINDOW_DAYS)
+    ).aggregate(
+        opened=Sum("tickets_opened"),
+        answered=Sum("tickets_answered"),
+        seconds=Sum("response_seconds"),
+    )
+    answered = support["answered"] or 0
+    avg_hours = (
+        round(support["seconds"] / answered / 3600, 1) if answered else None
+    )
+
+    return {
+        "lead_options": [label for _, label in options],
+        "lead_weeks": lead_weeks,
+        "conversion_rows": conversion_rows,
+        "conversion_total": {
+            "leads": total_leads,
+            "converted": total_converted,
+            "rate": _rate(total_converted, total_leads),
+        },
+        "trainer_day": trainer_day,
+        "trainer_stats": trainer_stats,
+        "support": {
+            "days": SUPPORT_WINDOW_DAYS,
+            "opened": support["opened"] or 0,
+            "answered": answered,
+            "avg_response_hours": avg_hours,
+        },
+    }
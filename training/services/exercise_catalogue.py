@@ -0,0 +1,166 @@
+"""Exercise catalogue linking and fuzzy mapping of free-text names."""
+
+import difflib
+
+from django.db import transaction
+
+from training.models import (
+    Exercise,
+    ExerciseAlias,
+    ProgrammeExercise,
+    WorkoutSet,
+    normalise_exercise_name,
+)
+
+# Similarity (0-1, difflib ratio) a name needs to be suggested for review
+# as a spelling of an existing entry. Close spellings are often different
+# lifts ("Incline" / "Decline Bench Press"), so they are never linked
+# automatically.
+DEFAULT_MATCH_CUTOFF = 0.85
+
+# Models whose free-text names are mapped onto the catalogue.
+LINKED_MODELS = (ProgrammeExercise, WorkoutSet)
+
+
+def link_catalogue(rows):
+    """
+    Fill the catalogue ``exercise_id`` of unsaved rows (programme
+    exercises or workout sets) that lack one, from their names. One lookup
+    for the batch; no queries when every row is already linked.
+    """
+    missing = {row.exercise_name for row in rows if row.exercise_id is None}
+    if missing:
+        ids = Exercise.objects.resolve(missing)
+        for row in rows:
+            if row.exercise_id is None:
+                row.exercise_id = ids[row.exercise_name]
+    return rows
+
+
+def catalogue_index():
+    """{normalised name or alias: exercise_id} for the whole catalogue."""
+    index = dict(
+        ExerciseAlias.objects.values_list("name_normalised", "exercise_id")
+    )
+    index.update(Exercise.objects.values_list("name_normalised", "id"))
+    return index
+
+
+def token_key(key):
+    """
+    Order-insensitive form of a normalised name with simple plurals
+    dropped, so "squats back" and "back squat" share one key.
+    """
+    tokens = set()
+    for token in key.split():
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return " ".join(sorted(tokens))
+
+
+def match_name(key, index, tokens, cutoff=DEFAULT_MATCH_CUTOFF):
+    """
+    Return (target, matched_key, exact) for a normalised name. An exact
+    catalogue hit or the same words (``tokens``: {token_key: target}) are
+    safe to link. Otherwise the closest spelling at or above ``cutoff`` is
+    only a suggestion (exact False).
+    """
+    if key in index:
+        return index[key], None, True
+    if token_key(key) in tokens:
+        return tokens[token_key(key)], None, True
+    close = difflib.get_close_matches(key, list(index), n=1, cutoff=cutoff)
+    if close:
+        return index[close[0]], close[0], False
+    return None, None, False
+
+
+def _exercise_id(target):
+    # Index values are ids, or Exercise instances created by this run.
+    return target.pk if isinstance(target, Exercise) else target
+
+
+def backfill_exercises(batch_size=200, cutoff=DEFAULT_MATCH_CUTOFF,
+                       dry_run=False):
+    """
+    Link unmapped programme exercises and workout sets to the catalogue.
+
+    Distinct names are handled ``batch_size`` at a time, one transaction
+    per batch. Exact matches link directly; the same words in another
+    order or plural link and are kept as aliases. Close spellings are
+    left unlinked for review: add the alias in the admin (or not) and run
+    again. Anything else starts a new catalogue entry. Returns a summary
+    dict of counts, plus the (name, suggested match) pairs to review.
+    """
+    summary = {
+        "exact": 0,
+        "aliased": 0,
+        "review": 0,
+        "created": 0,
+        "rows": 0,
+        "review_pairs": [],
+    }
+    index = catalogue_index()
+    tokens = {token_key(key): target for key, target in index.items()}
+
+    names = set()
+    for model in LINKED_MODELS:
+        names.update(
+            model.objects.filter(exercise__isnull=True)
+            .values_list("exercise_name", flat=True)
+            .distinct()
+        )
+    names = sorted(name for name in names if normalise_exercise_name(name))
+
+    for start in range(0, len(names), batch_size):
+        chunk = names[start:start + batch_size]
+        targets = {}
+        new_exercises = []
+        new_aliases = []
+        for name in chunk:
+            key = normalise_exercise_name(name)
+            target, matched, exact = match_name(key, index, tokens, cutoff)
+            if matched:
+                summary["review"] += 1
+                summary["review_pairs"].append((name, matched))
+                continue
+            if target is None:
+                target = Exercise(name=name.strip(), name_normalised=key)
+                new_exercises.append(target)
+                summary["created"] += 1
+            elif key not in index:
+                new_aliases.append((name.strip(), key, target))
+                summary["aliased"] += 1
+            else:
+                summary["exact"] += 1
+            index[key] = target
+            tokens.setdefault(token_key(key), target)
+            targets[name] = target
+
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            Exercise.objects.bulk_create(new_exercises)
+            ExerciseAlias.objects.bulk_create(
+                [
+                    ExerciseAlias(
+                        exercise_id=_exercise_id(target),
+                        name=name,
+                        name_normalised=key,
+                    )
+                    for name, key, target in new_aliases
+                ]
+            )
+            by_exercise = {}
+            for name, target in targets.items():
+                by_exercise.setdefault(_exercise_id(target), []).append(name)
+            for exercise_id, exercise_names in by_exercise.items():
+                for model in LINKED_MODELS:
+                    summary["rows"] += model.objects.filter(
+                        exercise__isnull=True,
+                        exercise_name__in=exercise_names,
+                    ).update(exercise_id=exercise_id)
+
+    return summary
@@ -0,0 +1,276 @@
+"""Service helpers for public lead intake and duplicate handling."""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from training.forms import ConsultationRequestForm, ContactQueryForm
+from training.models import (
+    ConsultationRequest,
+    ContactQuery,
+    IntakeSubmission,
+    normalise_email,
+    normalise_phone,
+)
+
+# Queue kind -> form used to re-validate a deferred submission.
+INTAKE_FORMS = {
+    IntakeSubmission.KIND_CONSULTATION: ConsultationRequestForm,
+    IntakeSubmission.KIND_CONTACT: ContactQueryForm,
+}
+
+# Rows still waiting for triage; repeat submissions merge into these.
+OPEN_STATUSES = {
+    ConsultationRequest: [ConsultationRequest.STATUS_NEW],
+    ContactQuery: [ContactQuery.STATUS_NEW, ContactQuery.STATUS_IN_PROGRESS],
+}
+
+# Consultation fields refreshed from a repeat submission when non-blank.
+CONSULTATION_MERGE_FIELDS = [
+    "first_name",
+    "last_name",
+    "phone",
+    "training_goal",
+    "coaching_option",
+    "preferred_date",
+    "preferred_time_window",
+    "availability_notes",
+    "training_background",
+]
+
+# Columns written back when consolidating historical rows.
+MERGE_UPDATE_FIELDS = {
+    ConsultationRequest: CONSULTATION_MERGE_FIELDS + [
+        "contact_consent",
+        "submission_count",
+        "duplicate_of",
+    ],
+    ContactQuery: [
+        "message",
+        "phone",
+        "contact_consent",
+        "submission_count",
+        "duplicate_of",
+    ],
+}
+
+
+def _match_filter(email_norm, phone_norm, last_name):
+    """
+    Earlier submissions by the same email, or by the same phone and
+    surname. Only email matches are merged (see find_previous_lead).
+    """
+    match = Q()
+    if email_norm:
+        match |= Q(email_normalised=email_norm)
+    if phone_norm and last_name:
+        match |= Q(phone_normalised=phone_norm, last_name__iexact=last_name)
+    return match
+
+
+def find_previous_lead(model, instance):
+    """
+    Return (open_row, latest_row) for earlier submissions by the same
+    person. Either may be None. Only an email match gives an open row to
+    merge into: household members can share a phone number and surname,
+    so a phone match is only linked as the latest row.
+    """
+    email_norm = normalise_email(instance.email)
+    match = _match_filter(
+        email_norm,
+        normalise_phone(instance.phone),
+        (instance.last_name or "").strip(),
+    )
+    if not match:
+        return None, None
+
+    previous = model.objects.filter(match)
+    if instance.pk:
+        previous = previous.exclude(pk=instance.pk)
+
+    if email_norm:
+        open_row = (
+            previous.filter(
+                email_normalised=email_norm,
+                status__in=OPEN_STATUSES[model],
+            )
+            .order_by("-created_at", "-id")
+            .first()
+        )
+        if open_row:
+            return open_row, open_row
+    return None, previous.order_by("-created_at", "-id").first()
+
+
+def _merge_consultation(target, incoming):
+    for field in CONSULTATION_MERGE_FIELDS:
+        value = getattr(incoming, field)
+        if value not in (None, ""):
+            setattr(target, field, value)
+    target.contact_consent = target.contact_consent or incoming.contact_consent
+
+
+def _merge_contact(target, incoming):
+    sent_at = incoming.created_at or timezone.now()
+    stamp = timezone.localtime(sent_at).strftime("%d %b %Y %H:%M")
+    target.message = (
+        f"{target.message}\n\n--- Follow-up {stamp} ---\n{incoming.message}"
+    )
+    if incoming.phone:
+        target.phone = incoming.phone
+    target.contact_consent = target.contact_consent or incoming.contact_consent
+
+
+def save_lead(form):
+    """
+    Save a ConsultationRequestForm/ContactQueryForm submission.
+
+    A repeat submission from an email with an untriaged row is merged into
+    that row; otherwise the new row is linked to their latest earlier one.
+    Returns (instance, merged).
+    """
+    incoming = form.save(commit=False)
+    model = type(incoming)
+    merge = (
+        _merge_consultation
+        if model is ConsultationRequest
+        else _merge_contact
+    )
+
+    with transaction.atomic():
+        open_row, latest = find_previous_lead(model, incoming)
+        if open_row:
+            target = model.objects.select_for_update().get(pk=open_row.pk)
+            merge(target, incoming)
+            target.submission_count = F("submission_count") + 1
+            target.save()
+            target.refresh_from_db(fields=["submission_count"])
+            return target, True
+
+        incoming.duplicate_of = latest
+        incoming.save()
+        return incoming, False
+
+
+def submit_lead(form, kind):
+    """
+    Store a valid intake form now, or queue it when deferred writes are
+    enabled. Returns True when the submission was queued.
+    """
+    if not settings.INTAKE_DEFERRED_WRITES:
+        save_lead(form)
+        return False
+
+    model_fields = form._meta.fields
+    payload = {
+        name: form.data.get(name, "")
+        for name in model_fields
+        if name in form.data
+    }
+    IntakeSubmission.objects.create(kind=kind, payload=payload)
+    return True
+
+
+def flush_intake_queue(batch_size=100):
+    """
+    Write queued submissions to the lead tables, oldest first, one
+    transaction per batch. Returns (saved, rejected).
+    """
+    saved = 0
+    rejected = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                IntakeSubmission.objects.select_for_update()
+                .order_by("id")[:batch_size]
+            )
+            if not batch:
+                break
+            for item in batch:
+                form = INTAKE_FORMS[item.kind](item.payload)
+                if form.is_valid():
+                    save_lead(form)
+                    saved += 1
+                else:
+                    rejected += 1
+            IntakeSubmission.objects.filter(
+                id__in=[item.id for item in batch]
+            ).delete()
+    return saved, rejected
+
+
+def consolidate_duplicates(model, batch_size=200, dry_run=False):
+    """
+    Consolidate historical rows, fingerprint by fingerprint in batches.
+
+    Later open rows are merged into the earliest open row and deleted;
+    every other repeat is linked to the person's first submission.
+    Returns (merged_rows, linked_rows).
+    """
+    merge = (
+        _merge_consultation
+        if model is ConsultationRequest
+        else _merge_contact
+    )
+    update_fields = MERGE_UPDATE_FIELDS[model]
+    open_statuses = OPEN_STATUSES[model]
+    fingerprints = list(
+        model.objects.exclude(email_normalised="")
+        .values("email_normalised")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .order_by("email_normalised")
+        .values_list("email_normalised", flat=True)
+    )
+
+    merged = 0
+    linked = 0
+    for start in range(0, len(fingerprints), batch_size):
+        chunk = fingerprints[start:start + batch_size]
+        groups = {}
+        for row in model.objects.filter(
+            email_normalised__in=chunk
+        ).order_by("created_at", "id"):
+            groups.setdefault(row.email_normalised, []).append(row)
+
+        to_update = {}
+        to_delete = []
+        for rows in groups.values():
+            first = rows[0]
+            canonical = next(
+                (r for r in rows if r.status in open_statuses),
+                None,
+            )
+            for row in rows[1:]:
+                if row is canonical:
+                    continue
+                if canonical and row.status in open_statuses:
+                    merge(canonical, row)
+                    canonical.submission_count += row.submission_count
+                    to_update[canonical.pk] = canonical
+                    to_delete.append(row.pk)
+                elif row.duplicate_of_id != first.pk:
+                    row.duplicate_of = first
+                    to_update[row.pk] = row
+                    linked += 1
+            if canonical and canonical is not first:
+                if canonical.duplicate_of_id != first.pk:
+                    canonical.duplicate_of = first
+                    to_update[canonical.pk] = canonical
+                    linked += 1
+
+        merged += len(to_delete)
+        if dry_run:
+            continue
+
+        with transaction.atomic():
+            if to_update:
+                model.objects.bulk_update(
+                    list(to_update.values()),
+                    update_fields,
+                )
+            if to_delete:
+                model.objects.filter(pk__in=to_delete).delete()
+
+    return merged, linked
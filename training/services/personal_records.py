@@ -0,0 +1,146 @@
+"""Per-client personal records, kept current as workout sets are saved."""
+
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from training.models import PersonalRecord, WorkoutSet
+
+# Columns rewritten when a record improves.
+RECORD_FIELDS = [
+    "best_weight_kg",
+    "best_weight_reps",
+    "best_weight_on",
+    "best_e1rm_kg",
+    "best_e1rm_on",
+    "updated_at",
+]
+
+
+def estimate_1rm(weight, reps):
+    """Epley estimate of a one-rep max; a single rep is the weight itself."""
+    if weight is None or not reps:
+        return None
+    if reps == 1:
+        return weight
+    return (weight * (1 + Decimal(reps) / 30)).quantize(Decimal("0.01"))
+
+
+def _merge(record, weight, reps, date):
+    """Fold one set into ``record``. Returns True when a best improved."""
+    changed = False
+    best = record.best_weight_kg
+    if best is None or weight > best:
+        record.best_weight_kg = weight
+        record.best_weight_reps = reps
+        record.best_weight_on = date
+        changed = True
+    elif weight == best and reps > (record.best_weight_reps or 0):
+        record.best_weight_reps = reps
+        record.best_weight_on = date
+        changed = True
+
+    e1rm = estimate_1rm(weight, reps)
+    if record.best_e1rm_kg is None or e1rm > record.best_e1rm_kg:
+        record.best_e1rm_kg = e1rm
+        record.best_e1rm_on = date
+        changed = True
+    return changed
+
+
+def _counts(workout_set):
+    # Sets without a catalogue exercise or a weight don't set records.
+    return (
+        workout_set.exercise_id is not None
+        and workout_set.weight_kg is not None
+        and workout_set.reps
+    )
+
+
+def record_sets(client_id, sets):
+    """
+    Fold newly saved ``sets`` (with their session attached) into the
+    client's records: one locked read of the affected records, then
+    bulk writes of the ones that improved.
+    """
+    sets = [s for s in sets if _counts(s)]
+    if not sets:
+        return
+    exercise_ids = {s.exercise_id for s in sets}
+    try:
+        with transaction.atomic():
+            records = {
+                record.exercise_id: record
+                for record in PersonalRecord.objects.select_for_update()
+                .filter(client_id=client_id, exercise_id__in=exercise_ids)
+            }
+            new = {}
+            changed = set()
+            for workout_set in sets:
+                record = records.get(workout_set.exercise_id)
+                if record is None:
+                    record = PersonalRecord(
+                        client_id=client_id,
+                        exercise_id=workout_set.exercise_id,
+                    )
+                    records[workout_set.exercise_id] = record
+                    new[workout_set.exercise_id] = record
+                if _merge(
+                    record,
+                    workout_set.weight_kg,
+                    workout_set.reps,
+                    workout_set.session.date,
+                ):
+                    changed.add(workout_set.exercise_id)
+            improved = [records[e] for e in changed if e not in new]
+            now = timezone.now()
+            for record in improved:
+                record.updated_at = now
+            PersonalRecord.objects.bulk_create(new.values())
+            PersonalRecord.objects.bulk_update(improved, RECORD_FIELDS)
+    except IntegrityError:
+        # Another save created one of these records first.
+        rebuild_records([client_id], exercise_ids)
+
+
+def rebuild_records(client_ids, exercise_ids=None):
+    """
+    Recompute records for ``client_ids`` (optionally only some exercises)
+    from their workout sets and replace the stored rows. Returns the
+    number of records written.
+    """
+    sets = WorkoutSet.objects.filter(
+        session__client_id__in=client_ids,
+        exercise__isnull=False,
+        weight_kg__isnull=False,
+        reps__gt=0,
+    )
+    stale = PersonalRecord.objects.filter(client_id__in=client_ids)
+    if exercise_ids is not None:
+        sets = sets.filter(exercise_id__in=exercise_ids)
+        stale = stale.filter(exercise_id__in=exercise_ids)
+
+    records = {}
+    rows = sets.order_by("session__date", "id").values_list(
+        "session__client_id",
+        "exercise_id",
+        "weight_kg",
+        "reps",
+        "session__date",
+    )
+    for client_id, exercise_id, weight, reps, date in rows.iterator(
+        chunk_size=2000
+    ):
+        record = records.get((client_id, exercise_id))
+        if record is None:
+            record = records[(client_id, exercise_id)] = PersonalRecord(
+                client_id=client_id,
+                exercise_id=exercise_id,
+            )
+        _merge(record, weight, reps, date)
+
+    with transaction.atomic():
+        stale.delete()
+        PersonalRecord.objects.bulk_create(records.values())
+    return len(records)
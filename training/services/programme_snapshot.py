@@ -0,0 +1,199 @@
+"""Cached snapshots of programme blocks (days, exercises, targets)."""
+
+import copy
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from training.models import ProgrammeBlock, ProgrammeDay
+
+from .tailored_programmes import apply_overrides, override_map
+
+# Bump when the snapshot shape changes so old cache entries are ignored.
+SNAPSHOT_VERSION = 1
+
+# Snapshots are replaced when the block changes. That only reaches other
+# workers through a shared cache; with per-process caches they expire
+# quickly instead, so other workers catch up within a minute.
+SHARED_SNAPSHOT_TIMEOUT = 60 * 60 * 24
+PROCESS_SNAPSHOT_TIMEOUT = 60
+
+# Blocks and days changed in this thread's open transaction.
+_pending = threading.local()
+
+
+def _timeout():
+    if settings.SHARED_CACHE:
+        return SHARED_SNAPSHOT_TIMEOUT
+    return PROCESS_SNAPSHOT_TIMEOUT
+
+
+def _key(block_id):
+    return f"programme-snapshot:v{SNAPSHOT_VERSION}:{block_id}"
+
+
+def build_snapshot(block, days):
+    """
+    Plain-data copy of a block with its days and exercises, in display
+    order. ``days`` have their exercises prefetched (and overrides
+    applied for copy-on-write blocks).
+    """
+    return {
+        "id": block.id,
+        "name": block.name,
+        "description": block.description,
+        "weeks": block.weeks,
+        "days": [
+            {
+                "id": day.id,
+                "block_id": block.id,
+                "name": day.name,
+                "order": day.order,
+                "exercises": [
+                    {
+                        "id": ex.id,
+                        "exercise_name": ex.exercise_name,
+                        "target_sets": ex.target_sets,
+                        "target_reps": ex.target_reps,
+                        "target_weight_kg": (
+                            None
+                            if ex.target_weight_kg is None
+                            else str(ex.target_weight_kg)
+                        ),
+                        "order": ex.order,
+                    }
+                    for ex in exercises
+                ],
+            }
+            for day, exercises in days
+        ],
+    }
+
+
+def _build(block_ids):
+    """
+    Build snapshots for several blocks: blocks, days, exercises and
+    overrides are one query each, whatever the number of blocks.
+    """
+    blocks = list(ProgrammeBlock.objects.filter(id__in=block_ids))
+    if not blocks:
+        return {}
+
+    days_by_block = defaultdict(list)
+    for day in (
+        ProgrammeDay.objects.filter(
+            block_id__in={block.content_block_id for block in blocks}
+        )
+        .order_by("order", "id")
+        .prefetch_related("exercises")
+    ):
+        days_by_block[day.block_id].append(day)
+
+    overrides = override_map(
+        [block.id for block in blocks if block.copy_on_write]
+    )
+    snapshots = {}
+    for block in blocks:
+        days = [
+            (
+                day,
+                apply_overrides(
+                    block,
+                    # Copies: overrides are applied in memory and one
+                    # template's days can be shared by several blocks.
+                    [copy.copy(ex) for ex in day.exercises.all()],
+                    overrides,
+                ),
+            )
+            for day in days_by_block[block.content_block_id]
+        ]
+        snapshots[block.id] = build_snapshot(block, days)
+    return snapshots
+
+
+def get_snapshots(block_ids):
+    """
+    {block_id: snapshot} for the given blocks from one cache read.
+    Misses are built together (four queries) and cached.
+    """
+    block_ids = list(dict.fromkeys(block_ids))
+    if not block_ids:
+        return {}
+
+    keys = {_key(block_id): block_id for block_id in block_ids}
+    snapshots = {
+        keys[key]: snapshot
+        for key, snapshot in cache.get_many(list(keys)).items()
+    }
+    missing = [b for b in block_ids if b not in snapshots]
+    if missing:
+        built = _build(missing)
+        for block_id, snapshot in built.items():
+            # add() so a refresh written meanwhile is never overwritten
+            # by this (possibly older) read.
+            cache.add(_key(block_id), snapshot, _timeout())
+        snapshots.update(built)
+    return snapshots
+
+
+def refresh_snapshots(block_ids):
+    """
+    Rebuild the blocks' snapshots (and those of copy-on-write copies that
+    read from them), dropping those of blocks that are gone.
+    """
+    block_ids = set(block_ids)
+    block_ids.update(
+        ProgrammeBlock.objects.filter(
+            parent_template_id__in=block_ids,
+            copy_on_write=True,
+        ).values_list("id", flat=True)
+    )
+    built = _build(block_ids)
+    cache.set_many(
+        {_key(b): snapshot for b, snapshot in built.items()},
+        _timeout(),
+    )
+    cache.delete_many([_key(b) for b in block_ids if b not in built])
+
+
+def _pending_ids():
+    if not hasattr(_pending, "blocks"):
+        _pending.blocks, _pending.days = set(), set()
+    return _pending
+
+
+def schedule_refresh(block_id=None, day_id=None):
+    """
+    Refresh a block, or a day's block, once the current transaction
+    commits. However many rows a transaction saves, each block is rebuilt
+    once and the days are looked up together.
+    """
+    if not (block_id or day_id):
+        return
+    pending = _pending_ids()
+    if block_id:
+        pending.blocks.add(block_id)
+    if day_id:
+        pending.days.add(day_id)
+    transaction.on_commit(_refresh_pending)
+
+
+def _refresh_pending():
+    # The first callback after a commit refreshes everything pending;
+    # the rest find nothing left to do. Ids left by a rolled-back
+    # transaction are refreshed with the next commit, which is harmless.
+    pending = _pending_ids()
+    block_ids, day_ids = pending.blocks, pending.days
+    if not (block_ids or day_ids):
+        return
+    pending.blocks, pending.days = set(), set()
+    if day_ids:
+        block_ids.update(
+            ProgrammeDay.objects.filter(id__in=day_ids).values_list(
+                "block_id", flat=True
+            )
+        )
+    refresh_snapshots(block_ids)
@@ -0,0 +1,57 @@
+"""Cache-backed sliding-window rate limiting for public endpoints."""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request):
+    """
+    Best-effort client IP. Behind Heroku's router the real address is the
+    last X-Forwarded-For entry, so only trust it when configured to.
+    """
+    if settings.TRUST_X_FORWARDED_FOR:
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+        if hops:
+            return hops[-1]
+    return request.META.get("REMOTE_ADDR", "") or "unknown"
+
+
+def hit(key, limit, window, now=None):
+    """
+    Record one hit for ``key`` and return True while under ``limit``.
+
+    Uses the sliding-window counter approximation: the previous fixed
+    window's count is weighted by how much of it still overlaps the
+    sliding window. Two cache keys per client, atomic via add/incr.
+    """
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    current_key = f"ratelimit:{key}:{bucket}"
+    previous_key = f"ratelimit:{key}:{bucket - 1}"
+
+    cache.add(current_key, 0, timeout=window * 2)
+    try:
+        current = cache.incr(current_key)
+    except ValueError:
+        # Key expired between add and incr; start the window again.
+        cache.set(current_key, 1, timeout=window * 2)
+        current = 1
+    previous = cache.get(previous_key, 0)
+
+    overlap = 1 - (now % window) / window
+    return previous * overlap + current <= limit
+
+
+def intake_allowed(request, email, scope):
+    """Apply the intake limit per client IP and per submitted email."""
+    limit = settings.INTAKE_RATE_LIMIT
+    window = settings.INTAKE_RATE_WINDOW
+    keys = [f"{scope}:ip:{client_ip(request)}"]
+    if email:
+        keys.append(f"{scope}:email:{email.strip().lower()}")
+    # Record every key so a blocked IP cannot reset its email budget.
+    results = [hit(key, limit, window) for key in keys]
+    return all(results)
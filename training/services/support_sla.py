@@ -0,0 +1,278 @@
+"""First-response and resolution times for support tickets (SLA)."""
+
+import datetime
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from precision_performance.db_routers import replica_reads
+from training.models import (
+    DailyTrainerSupportStat,
+    SupportMessage,
+    SupportTicket,
+)
+
+# Days behind the owner's SLA report.
+REPORT_DAYS = 30
+
+# Counters on DailyTrainerSupportStat, summed by the report.
+STAT_FIELDS = (
+    "responses",
+    "response_seconds",
+    "breaches",
+    "resolutions",
+    "resolution_seconds",
+)
+
+
+def sla_seconds():
+    return settings.SUPPORT_SLA_HOURS * 3600
+
+
+def _seconds(start, end):
+    return max(int((end - start).total_seconds()), 0)
+
+
+def _bump(trainer_id, when, **deltas):
+    """
+    Add ``deltas`` to the trainer's stat row for the day of ``when``.
+    Counters stop at zero: a reopen can land on a row that never counted
+    the resolution (the ticket changed trainer, or predates the stats).
+    """
+    if not trainer_id:
+        return
+    stat, _ = DailyTrainerSupportStat.objects.get_or_create(
+        trainer_id=trainer_id,
+        date=timezone.localdate(when),
+    )
+    DailyTrainerSupportStat.objects.filter(pk=stat.pk).update(
+        **{
+            field: Greatest(F(field) + value, 0)
+            for field, value in deltas.items()
+        }
+    )
+
+
+def record_message(ticket, message):
+    """
+    Stamp the ticket's first response when ``message`` is the first one
+    not sent by the client, and count it for the ticket's trainer.
+    """
+    if ticket.first_response_at or message.sender_id == ticket.client_id:
+        return
+    with transaction.atomic():
+        # Conditional update so two replies racing count once.
+        claimed = SupportTicket.objects.filter(
+            pk=ticket.pk,
+            first_response_at__isnull=True,
+        ).update(first_response_at=message.created_at)
+        ticket.first_response_at = message.created_at
+        if claimed:
+            seconds = _seconds(ticket.created_at, message.created_at)
+            _bump(
+                ticket.trainer_id,
+                message.created_at,
+                responses=1,
+                response_seconds=seconds,
+                breaches=int(seconds > sla_seconds()),
+            )
+
+
+def set_status(ticket, status):
+    """
+    Change a ticket's status and save it. Closing stamps ``resolved_at``
+    and counts the resolution; reopening takes it back off.
+    """
+    fields = ["status", "updated_at"]
+    with transaction.atomic():
+        if status == SupportTicket.STATUS_CLOSED:
+            if ticket.resolved_at is None:
+                ticket.resolved_at = timezone.now()
+                fields.append("resolved_at")
+                _bump(
+                    ticket.trainer_id,
+                    ticket.resolved_at,
+                    resolutions=1,
+                    resolution_seconds=_seconds(
+                        ticket.created_at, ticket.resolved_at
+                    ),
+                )
+        elif ticket.resolved_at is not None:
+            _bump(
+                ticket.trainer_id,
+                ticket.resolved_at,
+                resolutions=-1,
+                resolution_seconds=-_seconds(
+                    ticket.created_at, ticket.resolved_at
+                ),
+            )
+            ticket.resolved_at = None
+            fields.append("resolved_at")
+        ticket.status = status
+        ticket.save(update_fields=fields)
+
+
+def backfill_tickets(batch_size=500):
+    """
+    Fill ``first_response_at`` and ``resolved_at`` on tickets that lack
+    them, streaming threads in ticket id order, ``batch_size`` tickets per
+    transaction. Closed tickets without a resolution time get their last
+    update, the best record there is. Returns the number of tickets
+    changed.
+    """
+    changed = 0
+    last_id = 0
+    pending = SupportTicket.objects.filter(
+        Q(first_response_at__isnull=True)
+        | Q(status=SupportTicket.STATUS_CLOSED, resolved_at__isnull=True)
+    ).order_by("id")
+    while True:
+        tickets = list(pending.filter(id__gt=last_id)[:batch_size])
+        if not tickets:
+            return changed
+        last_id = tickets[-1].id
+
+        clients = {ticket.id: ticket.client_id for ticket in tickets}
+        first_reply = {}
+        replies = (
+            SupportMessage.objects.filter(ticket_id__in=clients)
+            .order_by("ticket_id", "created_at", "id")
+            .values_list("ticket_id", "sender_id", "created_at")
+        )
+        for ticket_id, sender_id, created_at in replies:
+            if sender_id != clients[ticket_id]:
+                first_reply.setdefault(ticket_id, created_at)
+
+        updated = []
+        for ticket in tickets:
+            before = (ticket.first_response_at, ticket.resolved_at)
+            if ticket.first_response_at is None:
+                ticket.first_response_at = first_reply.get(ticket.id)
+            if (
+                ticket.status == SupportTicket.STATUS_CLOSED
+                and ticket.resolved_at is None
+            ):
+                ticket.resolved_at = ticket.updated_at
+            if (ticket.first_response_at, ticket.resolved_at) != before:
+                updated.append(ticket)
+        with transaction.atomic():
+            SupportTicket.objects.bulk_update(
+                updated, ["first_response_at", "resolved_at"]
+            )
+        changed += len(updated)
+
+
+def rebuild_stats():
+    """
+    Recompute every trainer's daily support stats from the tickets' stored
+    times. Returns the number of rows written.
+    """
+    limit = sla_seconds()
+    stats = {}
+    tickets = SupportTicket.objects.filter(
+        trainer__isnull=False,
+    ).values_list(
+        "trainer_id",
+        "created_at",
+        "first_response_at",
+        "resolved_at",
+    )
+    for trainer_id, created_at, responded, resolved in tickets.iterator(
+        chunk_size=2000
+    ):
+        for when, is_response in ((responded, True), (resolved, False)):
+            if when is None:
+                continue
+            key = (trainer_id, timezone.localdate(when))
+            stat = stats.get(key)
+            if stat is None:
+                stat = stats[key] = DailyTrainerSupportStat(
+                    trainer_id=trainer_id,
+                    date=key[1],
+                )
+            seconds = _seconds(created_at, when)
+            if is_response:
+                stat.responses += 1
+                stat.response_seconds += seconds
+                stat.breaches += int(seconds > limit)
+            else:
+                stat.resolutions += 1
+                stat.resolution_seconds += seconds
+
+    with transaction.atomic():
+        DailyTrainerSupportStat.objects.all().delete()
+        DailyTrainerSupportStat.objects.bulk_create(stats.values())
+    return len(stats)
+
+
+def _hours(seconds, count):
+    return round(seconds / count / 3600, 1) if count else None
+
+
+@replica_reads()
+def sla_report(days=REPORT_DAYS, now=None):
+    """
+    Per-trainer SLA figures for the last ``days`` days, from the daily
+    stats (one grouped read) plus a count of open tickets already past the
+    SLA without a reply (one indexed read). Returns the window, the SLA
+    target in hours and the rows.
+    """
+    now = now or timezone.now()
+    since = timezone.localdate(now) - datetime.timedelta(days=days - 1)
+    totals = {
+        row[0]: dict(zip(STAT_FIELDS, row[1:]))
+        for row in DailyTrainerSupportStat.objects.filter(date__gte=since)
+        .values("trainer_id")
+        .annotate(**{f"total_{field}": Sum(field) for field in STAT_FIELDS})
+        .order_by()
+        .values_list("trainer_id", *(f"total_{f}" for f in STAT_FIELDS))
+    }
+    overdue = dict(
+        SupportTicket.objects.filter(
+            first_response_at__isnull=True,
+            created_at__lt=now - datetime.timedelta(seconds=sla_seconds()),
+            trainer__isnull=False,
+        )
+        .exclude(status=SupportTicket.STATUS_CLOSED)
+        .values("trainer_id")
+        .annotate(count=Count("id"))
+        .order_by()
+        .values_list("trainer_id", "count")
+    )
+    trainers = get_user_model().objects.in_bulk(set(totals) | set(overdue))
+
+    rows = []
+    for trainer_id, trainer in trainers.items():
+        row = totals.get(trainer_id) or dict.fromkeys(STAT_FIELDS, 0)
+        responses = row["responses"]
+        rows.append(
+            {
+                "trainer": trainer,
+                "responses": responses,
+                "avg_response_hours": _hours(
+                    row["response_seconds"], responses
+                ),
+                "within_sla_pct": (
+                    round(100 * (responses - row["breaches"]) / responses)
+                    if responses
+                    else None
+                ),
+                "resolutions": row["resolutions"],
+                "avg_resolution_hours": _hours(
+                    row["resolution_seconds"], row["resolutions"]
+                ),
+                "overdue": overdue.get(trainer_id, 0),
+            }
+        )
+    rows.sort(
+        key=lambda r: (r["trainer"].get_full_name() or r["trainer"].username)
+    )
+    return {
+        "days": days,
+        "hours": settings.SUPPORT_SLA_HOURS,
+        "rows": rows,
+    }
@@ -0,0 +1,155 @@
+"""Copy-on-write tailored programme blocks and their exercise overrides."""
+
+from django.db import transaction
+
+from training.models import (
+    ProgrammeBlock,
+    ProgrammeDay,
+    ProgrammeExercise,
+    ProgrammeExerciseOverride,
+    WorkoutSession,
+)
+from training.services.exercise_catalogue import link_catalogue
+
+# ProgrammeExercise fields a tailored block may change per client.
+EDITABLE_FIELDS = (
+    "exercise_name",
+    "target_sets",
+    "target_reps",
+    "target_weight_kg",
+)
+
+
+def create_tailored_block(template_block, trainer_user, client_user):
+    """
+    Create a client's tailored copy of a template. The copy reads the
+    template's days and exercises; nothing is duplicated until a trainer
+    edits a value, which is stored as an override.
+    """
+    return ProgrammeBlock.objects.create(
+        name=(
+            f"{template_block.name} "
+            f"(Tailored for "
+            f"{client_user.get_full_name() or client_user.username})"
+        ),
+        description=template_block.description,
+        weeks=template_block.weeks,
+        created_by=trainer_user,
+        is_template=False,
+        parent_template=template_block,
+        copy_on_write=True,
+    )
+
+
+def override_map(block_ids):
+    """{(block_id, exercise_id): override} for the given blocks."""
+    return {
+        (o.block_id, o.exercise_id): o
+        for o in ProgrammeExerciseOverride.objects.filter(
+            block_id__in=block_ids
+        )
+    }
+
+
+def apply_overrides(block, exercises, overrides=None):
+    """
+    Show ``exercises`` (template rows) with ``block``'s per-client values.
+    Instances are changed in memory only and returned for chaining.
+    """
+    if block is None or not block.copy_on_write:
+        return exercises
+    if overrides is None:
+        overrides = override_map([block.id])
+    for ex in exercises:
+        override = overrides.get((block.id, ex.id))
+        if override:
+            if override.exercise_name != ex.exercise_name:
+                # Renamed for this client: the catalogue link no longer
+                # applies; callers resolve the new name when they need it.
+                ex.exercise_id = None
+            for field in EDITABLE_FIELDS:
+                setattr(ex, field, getattr(override, field))
+    return exercises
+
+
+def save_overrides(block, exercises):
+    """
+    Store edited values of template ``exercises`` as overrides for
+    ``block``. Values matching the template drop the override again.
+    """
+    if not exercises:
+        return
+    originals = {
+        ex.id: ex
+        for ex in ProgrammeExercise.objects.filter(
+            id__in=[ex.id for ex in exercises]
+        )
+    }
+    with transaction.atomic():
+        for ex in exercises:
+            values = {field: getattr(ex, field) for field in EDITABLE_FIELDS}
+            template = originals.get(ex.id)
+            if template and all(
+                getattr(template, field) == value
+                for field, value in values.items()
+            ):
+                ProgrammeExerciseOverride.objects.filter(
+                    block=block,
+                    exercise_id=ex.id,
+                ).delete()
+                continue
+            ProgrammeExerciseOverride.objects.update_or_create(
+                block=block,
+                exercise_id=ex.id,
+                defaults=values,
+            )
+
+
+def materialise_block(block):
+    """
+    Give a copy-on-write block its own days and exercises (overrides
+    applied) and move its logged sessions onto them. Used before the
+    template it reads from is deleted.
+    """
+    if not block.copy_on_write:
+        return
+    template_days = (
+        ProgrammeDay.objects.filter(block_id=block.parent_template_id)
+        .order_by("order", "id")
+        .prefetch_related("exercises")
+    )
+    overrides = override_map([block.id])
+
+    with transaction.atomic():
+        for template_day in template_days:
+            day = ProgrammeDay.objects.create(
+                block=block,
+                name=template_day.name,
+                order=template_day.order,
+            )
+            exercises = link_catalogue(
+                apply_overrides(
+                    block,
+                    list(template_day.exercises.all()),
+                    overrides,
+                )
+            )
+            ProgrammeExercise.objects.bulk_create(
+                [
+                    ProgrammeExercise(
+                        day=day,
+                        order=ex.order,
+                        exercise_id=ex.exercise_id,
+                        **{f: getattr(ex, f) for f in EDITABLE_FIELDS},
+                    )
+                    for ex in exercises
+                ]
+            )
+            WorkoutSession.objects.filter(
+                client_programme__block=block,
+                programme_day=template_day,
+            ).update(programme_day=day)
+
+        block.exercise_overrides.all().delete()
+        block.copy_on_write = False
+        block.save(update_fields=["copy_on_write"])
@@ -0,0 +1,161 @@
+"""Per-client weekly training-load summaries, refreshed from sessions."""
+
+import datetime
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncWeek
+from django.utils import timezone
+
+from training.models import WeeklyClientSummary, WorkoutSession, WorkoutSet
+
+# Columns rewritten when a stored week is refreshed.
+SUMMARY_FIELDS = [
+    "sessions_logged",
+    "sessions_planned",
+    "sessions_skipped",
+    "total_volume_kg",
+    "avg_rpe",
+    "updated_at",
+]
+
+
+def week_start(value):
+    """Monday of the week containing ``value`` (a date or datetime)."""
+    if isinstance(value, datetime.datetime):
+        if timezone.is_aware(value):
+            value = timezone.localdate(value)
+        else:
+            value = value.date()
+    return value - datetime.timedelta(days=value.weekday())
+
+
+def _aggregate(client_ids, first_week, last_week):
+    """
+    {(client_id, week_start): counts} for the clients' sessions between
+    two Mondays (inclusive). One query for sessions, one for sets.
+    """
+    dates = (first_week, last_week + datetime.timedelta(days=6))
+    totals = {}
+    sessions = (
+        WorkoutSession.objects.filter(
+            client_id__in=client_ids,
+            date__range=dates,
+        )
+        .annotate(week=TruncWeek("date"))
+        .values("client_id", "week")
+        .annotate(
+            logged=Count(
+                "id", filter=Q(status=WorkoutSession.STATUS_LOGGED)
+            ),
+            planned=Count(
+                "id", filter=Q(status=WorkoutSession.STATUS_PLANNED)
+            ),
+            skipped=Count(
+                "id", filter=Q(status=WorkoutSession.STATUS_SKIPPED)
+            ),
+        )
+        .order_by()
+    )
+    for row in sessions:
+        totals[(row["client_id"], row["week"])] = {
+            "sessions_logged": row["logged"],
+            "sessions_planned": row["planned"],
+            "sessions_skipped": row["skipped"],
+            "total_volume_kg": Decimal("0"),
+            "avg_rpe": None,
+        }
+
+    sets = (
+        WorkoutSet.objects.filter(
+            session__client_id__in=client_ids,
+            session__date__range=dates,
+            session__status=WorkoutSession.STATUS_LOGGED,
+        )
+        .annotate(week=TruncWeek("session__date"))
+        .values("session__client_id", "week")
+        .annotate(
+            volume=Sum(
+                F("weight_kg") * F("reps"),
+                output_field=DecimalField(max_digits=12, decimal_places=2),
+            ),
+            rpe=Avg("rpe"),
+        )
+        .order_by()
+    )
+    for row in sets:
+        week = totals.get((row["session__client_id"], row["week"]))
+        if week is None:
+            continue
+        if row["volume"] is not None:
+            week["total_volume_kg"] = Decimal(str(row["volume"])).quantize(
+                Decimal("0.01")
+            )
+        if row["rpe"] is not None:
+            week["avg_rpe"] = Decimal(str(row["rpe"])).quantize(
+                Decimal("0.01")
+            )
+    return totals
+
+
+def refresh_weeks(pairs):
+    """
+    Recompute the summaries for ``pairs`` of (client_id, week_start) and
+    upsert them; weeks left with no sessions lose their row. Returns the
+    number of summaries written.
+    """
+    pairs = {(client_id, week_start(week)) for client_id, week in pairs}
+    if not pairs:
+        return 0
+    weeks = [week for _, week in pairs]
+    totals = _aggregate(
+        {client_id for client_id, _ in pairs},
+        min(weeks),
+        max(weeks),
+    )
+    rows = [
+        WeeklyClientSummary(client_id=client_id, week_start=week, **values)
+        for (client_id, week), values in totals.items()
+        if (client_id, week) in pairs
+    ]
+    empty = Q()
+    for client_id, week in pairs - set(totals):
+        empty |= Q(client_id=client_id, week_start=week)
+
+    with transaction.atomic():
+        if empty:
+            WeeklyClientSummary.objects.filter(empty).delete()
+        WeeklyClientSummary.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["client", "week_start"],
+            update_fields=SUMMARY_FIELDS,
+        )
+    return len(rows)
+
+
+def schedule_week_refresh(*keys):
+    """
+    Refresh the weeks of ``keys`` (client_id, date) once the current
+    transaction commits, so sets saved alongside a session are counted.
+    """
+    pairs = {
+        (client_id, week_start(date))
+        for client_id, date in keys
+        if client_id and date
+    }
+    if pairs:
+        transaction.on_commit(lambda: refresh_weeks(pairs))
+
+
+def current_week_summaries(client_ids, today=None):
+    """{client_id: summary} for this week, in one indexed lookup."""
+    week = week_start(today or timezone.localdate())
+    return {
+        summary.client_id: summary
+        for summary in WeeklyClientSummary.objects.filter(
+            client_id__in=client_ids,
+            week_start=week,
+        )
+    }
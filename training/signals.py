@@ -0,0 +1,78 @@
+"""Signal handlers keeping cached snapshots and summaries current."""
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .models import (
+    ContactQuery,
+    ProgrammeBlock,
+    ProgrammeDay,
+    ProgrammeExercise,
+    ProgrammeExerciseOverride,
+    SupportMessage,
+    WorkoutSession,
+)
+from .services.archive import drop_archived
+from .services.programme_snapshot import schedule_refresh
+from .services.weekly_summaries import schedule_week_refresh
+
+
+@receiver(post_save, sender=ProgrammeBlock)
+@receiver(post_delete, sender=ProgrammeBlock)
+def refresh_block_snapshot(sender, instance, **kwargs):
+    schedule_refresh(instance.pk)
+
+
+@receiver(post_save, sender=ProgrammeDay)
+@receiver(post_delete, sender=ProgrammeDay)
+def refresh_day_snapshot(sender, instance, **kwargs):
+    schedule_refresh(instance.block_id)
+
+
+@receiver(post_save, sender=ProgrammeExercise)
+@receiver(post_delete, sender=ProgrammeExercise)
+def refresh_exercise_snapshot(sender, instance, **kwargs):
+    # By day id, resolved to the block after commit: during a cascade
+    # delete the day row may already be gone (the block handler covers
+    # that case).
+    schedule_refresh(day_id=instance.day_id)
+
+
+@receiver(post_save, sender=ProgrammeExerciseOverride)
+@receiver(post_delete, sender=ProgrammeExerciseOverride)
+def refresh_override_snapshot(sender, instance, **kwargs):
+    schedule_refresh(instance.block_id)
+
+
+@receiver(post_init, sender=WorkoutSession)
+def remember_session_week(sender, instance, **kwargs):
+    # Read from __dict__ so deferred fields aren't loaded here.
+    instance._summary_key = (
+        instance.__dict__.get("client_id"),
+        instance.__dict__.get("date"),
+    )
+
+
+@receiver(post_save, sender=WorkoutSession)
+@receiver(post_delete, sender=WorkoutSession)
+def refresh_session_week(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The week it was loaded in too, in case the date or client changed.
+    schedule_week_refresh(
+        instance._summary_key,
+        (instance.client_id, instance.date),
+    )
+    instance._summary_key = (instance.client_id, instance.date)
+
+
+@receiver(post_save, sender=WorkoutSession)
+@receiver(post_save, sender=SupportMessage)
+@receiver(post_save, sender=ContactQuery)
+def forget_archived_copy(sender, instance, raw=False, **kwargs):
+    # Data read back from the archive and saved lives in the hot table
+    # again; the saved version wins (even if a field was cleared).
+    if raw or not getattr(instance, "_from_archive", False):
+        return
+    drop_archived(instance)
+    instance._from_archive = False
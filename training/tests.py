@@ -1,13 +1,50 @@
-from django.db import IntegrityError
-from django.test import TestCase
+import datetime
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
 
+from .forms import ConsultationRequestForm
+from .management.commands.fetch_fonts import Command as FetchFontsCommand
 from .models import (
+    ArchivedRecord,
     ClientProgramme,
+    ConsultationRequest,
+    ContactQuery,
+    DailyLeadStat,
+    DailySupportStat,
+    DailyTrainerStat,
+    DailyTrainerSupportStat,
+    Exercise,
+    ExerciseAlias,
+    IntakeSubmission,
+    PersonalRecord,
     ProgrammeBlock,
     ProgrammeDay,
+    ProgrammeExercise,
+    SupportMessage,
+    SupportTicket,
+    WeeklyClientSummary,
     WorkoutSession,
+    WorkoutSet,
 )
+from .services.archive import archived_instance, with_archived_text
+from .services.cohort_analytics import owner_summary
+from .services import programme_snapshot
+from .services.programme_snapshot import get_snapshots
+from .services.tailored_programmes import create_tailored_block
+from .services.weekly_summaries import week_start
 
 
 class WorkoutSessionDuplicateTest(TestCase):
@@ -52,3 +89,743 @@ class WorkoutSessionDuplicateTest(TestCase):
                 week_number=1,
                 name="Week 1 - Day 1 duplicate",
             )
+
+
+def consultation_data(email, **extra):
+    data = {
+        "first_name": "Sam",
+        "last_name": "Lee",
+        "email": email,
+        "phone": "07700 900123",
+        "coaching_option": "1to1",
+        "contact_consent": "on",
+        "started": ConsultationRequestForm().fields["started"].initial,
+    }
+    data.update(extra)
+    return data
+
+
+@override_settings(INTAKE_MIN_FILL_SECONDS=0)
+class LeadDedupeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _consultation_post(self, email, **extra):
+        return self.client.post(
+            reverse("consultation_request"),
+            consultation_data(email, **extra),
+        )
+
+    def test_repeat_consultation_merges_into_open_request(self):
+        self._consultation_post("Sam@Example.com")
+        self._consultation_post(
+            "sam+gym@example.com",
+            coaching_option="online",
+        )
+
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+        lead = ConsultationRequest.objects.get()
+        self.assertEqual(lead.submission_count, 2)
+        self.assertEqual(lead.coaching_option, "online")
+        self.assertEqual(lead.email_normalised, "sam@example.com")
+
+    def test_phone_match_is_linked_not_merged(self):
+        self._consultation_post("sam@example.com")
+        self._consultation_post("alex@example.com", first_name="Alex")
+
+        first, second = ConsultationRequest.objects.order_by("id")
+        self.assertEqual(first.first_name, "Sam")
+        self.assertEqual(first.submission_count, 1)
+        self.assertEqual(second.email, "alex@example.com")
+        self.assertEqual(second.duplicate_of, first)
+
+    def test_repeat_after_triage_is_linked(self):
+        self._consultation_post("sam@example.com")
+        first = ConsultationRequest.objects.get()
+        first.status = ConsultationRequest.STATUS_CLOSED
+        first.save()
+
+        self._consultation_post("sam@example.com")
+
+        latest = ConsultationRequest.objects.exclude(pk=first.pk).get()
+        self.assertEqual(latest.duplicate_of, first)
+
+    def test_dedupe_command_consolidates_history(self):
+        for n in range(3):
+            ContactQuery.objects.create(
+                first_name="Sam",
+                last_name="Lee",
+                email="SAM@example.com",
+                coaching_option="online",
+                message=f"Message number {n}",
+                preferred_contact_method="email",
+            )
+
+        call_command("dedupe_leads", stdout=StringIO())
+
+        query = ContactQuery.objects.get()
+        self.assertEqual(query.submission_count, 3)
+        self.assertIn("Message number 2", query.message)
+
+
+@override_settings(INTAKE_MIN_FILL_SECONDS=0, INTAKE_RATE_LIMIT=2)
+class IntakeGuardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("consultation_request")
+
+    def test_honeypot_and_missing_token_store_nothing(self):
+        self.client.post(
+            self.url,
+            consultation_data("bot@example.com", website="http://spam"),
+        )
+        self.client.post(
+            self.url,
+            consultation_data("bot2@example.com", started=""),
+        )
+
+        self.assertFalse(ConsultationRequest.objects.exists())
+
+    def test_burst_from_one_ip_is_rate_limited(self):
+        for n in range(2):
+            response = self.client.post(
+                self.url,
+                consultation_data(f"lead{n}@example.com", phone=""),
+            )
+            self.assertEqual(response.status_code, 302)
+
+        response = self.client.post(
+            self.url,
+            consultation_data("lead9@example.com"),
+        )
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(ConsultationRequest.objects.count(), 2)
+
+    @override_settings(INTAKE_DEFERRED_WRITES=True)
+    def test_deferred_mode_queues_until_flushed(self):
+        self.client.post(self.url, consultation_data("lead@example.com"))
+
+        self.assertFalse(ConsultationRequest.objects.exists())
+        self.assertEqual(IntakeSubmission.objects.count(), 1)
+
+        call_command("flush_intake_queue", stdout=StringIO())
+
+        self.assertEqual(ConsultationRequest.objects.count(), 1)
+        self.assertFalse(IntakeSubmission.objects.exists())
+
+
+class ProgrammeSnapshotTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            username="client", password="test"
+        )
+        self.block = ProgrammeBlock.objects.create(name="Block A", weeks=4)
+        day = ProgrammeDay.objects.create(block=self.block, name="Day 1")
+        self.exercise = ProgrammeExercise.objects.create(
+            day=day, exercise_name="Squat", target_reps=5
+        )
+        ClientProgramme.objects.create(client=self.user, block=self.block)
+        self.client.force_login(self.user)
+
+    def test_library_renders_from_cached_snapshot(self):
+        url = reverse("accounts:client_programme_library")
+        self.client.get(url)
+
+        # Session, user and the assignments; the tree is one cache read.
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, "Squat")
+
+    def test_exercise_edit_rebuilds_snapshot(self):
+        get_snapshots([self.block.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.exercise.exercise_name = "Front Squat"
+            self.exercise.save()
+
+        with self.assertNumQueries(0):
+            snapshot = get_snapshots([self.block.id])[self.block.id]
+        self.assertEqual(
+            snapshot["days"][0]["exercises"][0]["exercise_name"],
+            "Front Squat",
+        )
+
+    def test_formset_save_rebuilds_each_block_once(self):
+        day = self.exercise.day
+        with mock.patch(
+            "training.services.programme_snapshot._build",
+            wraps=programme_snapshot._build,
+        ) as build:
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    for order in range(2, 6):
+                        ProgrammeExercise.objects.create(
+                            day=day, exercise_name=f"Lift {order}"
+                        )
+                    self.exercise.target_reps = 3
+                    self.exercise.save()
+
+        build.assert_called_once()
+        snapshot = get_snapshots([self.block.id])[self.block.id]
+        self.assertEqual(len(snapshot["days"][0]["exercises"]), 5)
+
+
+class TailoredProgrammeTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.trainer = User.objects.create_user(
+            username="trainer", password="test", is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username="client", password="test"
+        )
+        self.template = ProgrammeBlock.objects.create(
+            name="Block A", weeks=4, is_template=True
+        )
+        self.day = ProgrammeDay.objects.create(
+            block=self.template, name="Day 1"
+        )
+        self.exercise = ProgrammeExercise.objects.create(
+            day=self.day, exercise_name="Squat", target_reps=5
+        )
+        self.block = create_tailored_block(
+            self.template, self.trainer, self.user
+        )
+        self.assignment = ClientProgramme.objects.create(
+            client=self.user, block=self.block, trainer=self.trainer
+        )
+
+    def _save_exercise(self, **values):
+        data = {
+            "ex-TOTAL_FORMS": "1",
+            "ex-INITIAL_FORMS": "1",
+            "ex-0-id": str(self.exercise.id),
+            "ex-0-exercise_name": "Squat",
+            "ex-0-target_sets": "3",
+            "ex-0-target_reps": "5",
+            "ex-0-target_weight_kg": "",
+            "save_exercises": "1",
+        }
+        data.update({f"ex-0-{k}": v for k, v in values.items()})
+        self.client.force_login(self.trainer)
+        url = reverse(
+            "accounts:trainer_tailored_programme_detail",
+            args=[self.block.id],
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(url, data)
+
+    def test_assignment_shares_the_template_rows(self):
+        self.assertFalse(self.block.days.exists())
+        self.assertEqual(
+            list(self.block.programme_days()), [self.day]
+        )
+
+    def test_edit_is_stored_as_an_override(self):
+        self._save_exercise(target_reps="8")
+
+        self.exercise.refresh_from_db()
+        self.assertEqual(self.exercise.target_reps, 5)
+        override = self.block.exercise_overrides.get()
+        self.assertEqual(override.target_reps, 8)
+        snapshot = get_snapshots([self.block.id])[self.block.id]
+        self.assertEqual(snapshot["days"][0]["exercises"][0]["target_reps"], 8)
+
+        # Back to the template's values drops the override again.
+        self._save_exercise(target_reps="5")
+        self.assertFalse(self.block.exercise_overrides.exists())
+
+    def test_deleting_template_materialises_copies(self):
+        self._save_exercise(exercise_name="Box Squat")
+        session = WorkoutSession.objects.create(
+            client=self.user,
+            client_programme=self.assignment,
+            programme_day=self.day,
+            name="Week 1 - Day 1",
+        )
+
+        self.template.delete()
+
+        self.block.refresh_from_db()
+        self.assertFalse(self.block.copy_on_write)
+        day = self.block.days.get()
+        self.assertEqual(day.exercises.get().exercise_name, "Box Squat")
+        session.refresh_from_db()
+        self.assertEqual(session.programme_day, day)
+
+    def test_deleting_a_template_exercise_materialises_copies(self):
+        self.exercise.delete()
+
+        self.block.refresh_from_db()
+        self.assertFalse(self.block.copy_on_write)
+        day = self.block.days.get()
+        self.assertEqual(day.exercises.get().exercise_name, "Squat")
+        self.assertFalse(self.day.exercises.exists())
+
+    def test_admin_deleting_template_days_materialises_copies(self):
+        session = WorkoutSession.objects.create(
+            client=self.user,
+            client_programme=self.assignment,
+            programme_day=self.day,
+            name="Week 1 - Day 1",
+        )
+        model_admin = admin.site.get_model_admin(ProgrammeDay)
+
+        model_admin.delete_queryset(
+            None, ProgrammeDay.objects.filter(pk=self.day.pk)
+        )
+
+        session.refresh_from_db()
+        self.assertEqual(session.programme_day, self.block.days.get())
+
+
+class ExerciseCatalogueTest(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            username="client", password="test"
+        )
+        self.session = WorkoutSession.objects.create(
+            client=user, name="Legacy"
+        )
+
+    def _set(self, name):
+        return WorkoutSet.objects.create(
+            session=self.session, exercise_name=name, set_number=1, reps=5
+        )
+
+    def test_programme_exercises_share_a_normalised_identity(self):
+        day = ProgrammeDay.objects.create(
+            block=ProgrammeBlock.objects.create(name="Block"), name="Day 1"
+        )
+        first = ProgrammeExercise.objects.create(
+            day=day, exercise_name="Bench Press"
+        )
+        second = ProgrammeExercise.objects.create(
+            day=day, exercise_name=" bench-press "
+        )
+
+        self.assertIsNotNone(first.exercise_id)
+        self.assertEqual(first.exercise_id, second.exercise_id)
+        self.assertEqual(Exercise.objects.count(), 1)
+
+    def test_programme_exercise_relinks_only_on_rename(self):
+        day = ProgrammeDay.objects.create(
+            block=ProgrammeBlock.objects.create(name="Block"), name="Day 1"
+        )
+        ProgrammeExercise.objects.create(day=day, exercise_name="Squat")
+        exercise = ProgrammeExercise.objects.get()
+        squat_id = exercise.exercise_id
+
+        exercise.target_reps = 5
+        with self.assertNumQueries(1):
+            exercise.save()
+
+        exercise.exercise_name = "Front Squat"
+        exercise.save()
+        self.assertNotEqual(exercise.exercise_id, squat_id)
+
+    def test_rebuild_personal_records_command(self):
+        squat = Exercise.objects.create(name="Back Squat")
+        for weight, reps in (("100", 5), ("110", 1), ("100", 8)):
+            WorkoutSet.objects.create(
+                session=self.session,
+                exercise=squat,
+                exercise_name="Back Squat",
+                set_number=1,
+                reps=reps,
+                weight_kg=weight,
+            )
+
+        call_command("rebuild_personal_records", stdout=StringIO())
+
+        record = PersonalRecord.objects.get(exercise=squat)
+        self.assertEqual(record.best_weight_kg, 110)
+        self.assertEqual(record.best_weight_reps, 1)
+        self.assertEqual(str(record.best_e1rm_kg), "126.67")
+
+    def test_backfill_maps_spelling_variants(self):
+        squat = Exercise.objects.create(name="Back Squat")
+        rows = [
+            self._set(name)
+            for name in ("back squat", "Back Squats", "Deadlift")
+        ]
+
+        call_command("map_exercise_names", "--dry-run", stdout=StringIO())
+        self.assertFalse(
+            WorkoutSet.objects.filter(exercise__isnull=False).exists()
+        )
+
+        out = StringIO()
+        call_command("map_exercise_names", "--batch-size", "2", stdout=out)
+
+        for row in rows:
+            row.refresh_from_db()
+        self.assertEqual(rows[0].exercise, squat)
+        self.assertEqual(rows[1].exercise, squat)
+        self.assertEqual(rows[2].exercise.name, "Deadlift")
+        self.assertTrue(
+            ExerciseAlias.objects.filter(
+                exercise=squat, name="Back Squats"
+            ).exists()
+        )
+        self.assertIn("1 exact, 1 aliased, 0 to review", out.getvalue())
+
+    def test_backfill_leaves_close_spellings_for_review(self):
+        Exercise.objects.create(name="Decline Bench Press")
+        row = self._set("Incline Bench Press")
+
+        out = StringIO()
+        call_command("map_exercise_names", stdout=out)
+
+        row.refresh_from_db()
+        self.assertIsNone(row.exercise_id)
+        self.assertFalse(ExerciseAlias.objects.exists())
+        self.assertIn(
+            "'Incline Bench Press' looks like 'decline bench press'",
+            out.getvalue(),
+        )
+
+
+class WeeklyClientSummaryTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            username="weekly", password="test"
+        )
+        self.monday = week_start(timezone.localdate())
+
+    def _session(self, date, status=WorkoutSession.STATUS_LOGGED):
+        return WorkoutSession.objects.create(
+            client=self.user, date=date, name="Session", status=status
+        )
+
+    def test_moving_a_session_refreshes_both_weeks(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            session = self._session(self.monday)
+            self._session(self.monday, WorkoutSession.STATUS_PLANNED)
+
+        summary = WeeklyClientSummary.objects.get(week_start=self.monday)
+        self.assertEqual(summary.sessions_scheduled, 2)
+        self.assertEqual(summary.adherence_pct, 50)
+
+        last_week = self.monday - datetime.timedelta(days=4)
+        with self.captureOnCommitCallbacks(execute=True):
+            session.date = last_week
+            session.save()
+
+        summary.refresh_from_db()
+        self.assertEqual(summary.sessions_logged, 0)
+        self.assertEqual(
+            WeeklyClientSummary.objects.get(
+                week_start=week_start(last_week)
+            ).sessions_logged,
+            1,
+        )
+
+    def test_catch_up_command_fills_and_clears_weeks(self):
+        session = self._session(self.monday)
+        WorkoutSet.objects.create(
+            session=session,
+            exercise_name="Deadlift",
+            set_number=1,
+            reps=5,
+            weight_kg="100",
+            rpe="8",
+        )
+        stale = WeeklyClientSummary.objects.create(
+            client=self.user,
+            week_start=self.monday - datetime.timedelta(weeks=1),
+            sessions_logged=3,
+        )
+
+        call_command("refresh_weekly_summaries", stdout=StringIO())
+
+        summary = WeeklyClientSummary.objects.get(week_start=self.monday)
+        self.assertEqual(summary.sessions_logged, 1)
+        self.assertEqual(summary.total_volume_kg, 500)
+        self.assertEqual(str(summary.avg_rpe), "8.00")
+        self.assertFalse(
+            WeeklyClientSummary.objects.filter(pk=stale.pk).exists()
+        )
+
+
+class CohortAnalyticsTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.trainer = User.objects.create_user(
+            username="coach", password="test", is_staff=True
+        )
+        client_user = User.objects.create_user(
+            username="member", password="test", email="member@example.com"
+        )
+        for n, option in enumerate(("online", "online", "1to1")):
+            ConsultationRequest.objects.create(
+                first_name="Lead",
+                last_name=str(n),
+                email="MEMBER@example.com" if n == 0 else f"l{n}@x.com",
+                coaching_option=option,
+            )
+        ClientProgramme.objects.create(
+            client=client_user,
+            trainer=self.trainer,
+            block=ProgrammeBlock.objects.create(name="Block"),
+        )
+        ticket = SupportTicket.objects.create(
+            client=client_user, trainer=self.trainer, subject="Help"
+        )
+        SupportMessage.objects.create(
+            ticket=ticket, sender=client_user, body="Question"
+        )
+        reply = SupportMessage.objects.create(
+            ticket=ticket, sender=self.trainer, body="Answer"
+        )
+        SupportMessage.objects.filter(pk=reply.pk).update(
+            created_at=ticket.created_at + datetime.timedelta(hours=3)
+        )
+
+    def test_command_rolls_up_and_summary_reads_rollups(self):
+        call_command("backfill_support_sla", stdout=StringIO())
+        call_command("rollup_analytics", stdout=StringIO())
+        # A second run replaces the window rather than adding to it.
+        call_command("rollup_analytics", stdout=StringIO())
+
+        online = DailyLeadStat.objects.get(coaching_option="online")
+        self.assertEqual((online.leads, online.converted), (2, 1))
+        self.assertEqual(
+            DailyTrainerStat.objects.get(trainer=self.trainer).active_clients,
+            1,
+        )
+        support = DailySupportStat.objects.get()
+        self.assertEqual(support.tickets_answered, 1)
+        self.assertEqual(support.response_seconds, 3 * 3600)
+
+        summary = owner_summary()
+        self.assertEqual(summary["lead_weeks"][-1]["total"], 3)
+        self.assertEqual(summary["conversion_total"]["rate"], 33)
+        self.assertEqual(summary["support"]["avg_response_hours"], 3.0)
+
+    def test_backfill_support_sla_stamps_tickets_and_stats(self):
+        closed = SupportTicket.objects.create(
+            client=self.trainer,
+            trainer=self.trainer,
+            subject="Old",
+            status=SupportTicket.STATUS_CLOSED,
+        )
+
+        call_command(
+            "backfill_support_sla", "--batch-size", "1", stdout=StringIO()
+        )
+
+        ticket = SupportTicket.objects.get(subject="Help")
+        self.assertEqual(
+            ticket.first_response_at - ticket.created_at,
+            datetime.timedelta(hours=3),
+        )
+        closed.refresh_from_db()
+        self.assertEqual(closed.resolved_at, closed.updated_at)
+        self.assertIsNone(closed.first_response_at)
+
+        stat = DailyTrainerSupportStat.objects.get(
+            date=timezone.localdate(ticket.first_response_at)
+        )
+        self.assertEqual(stat.responses, 1)
+        self.assertEqual(stat.resolutions, 1)
+
+
+class FetchFontsTest(TestCase):
+    API_CSS = """
+/* cyrillic */
+@font-face {
+  font-family: 'Open Sans';
+  font-style: normal;
+  src: url(https://fonts.example/open-sans-cyrillic.woff2) format('woff2');
+}
+/* latin */
+@font-face {
+  font-family: 'Open Sans';
+  font-style: normal;
+  src: url(https://fonts.example/open-sans-latin.woff2) format('woff2');
+}
+"""
+
+    def test_keeps_only_configured_subsets(self):
+        responses = {
+            "https://fonts.example/open-sans-latin.woff2": b"wOF2",
+        }
+
+        def fake_get(command, url):
+            return responses.get(url, self.API_CSS.encode())
+
+        with tempfile.TemporaryDirectory() as dest:
+            with mock.patch.object(FetchFontsCommand, "_get", fake_get):
+                call_command("fetch_fonts", "--dest", dest, stdout=StringIO())
+
+            fonts = Path(dest, "fonts")
+            self.assertEqual(
+                [path.name for path in fonts.iterdir()],
+                ["open-sans-normal-latin.woff2"],
+            )
+            stylesheet = Path(dest, "css", "fonts.css").read_text()
+        self.assertIn("url(../fonts/open-sans-normal-latin.woff2)", stylesheet)
+        self.assertNotIn("fonts.example", stylesheet)
+
+
+class BenchmarkDbConnectionsTest(TestCase):
+    def test_reports_each_strategy(self):
+        out = StringIO()
+        call_command("benchmark_db_connections", "--requests", "3", stdout=out)
+
+        report = out.getvalue()
+        self.assertRegex(report, r"connect-per-request: median [\d.]+ms")
+        self.assertRegex(report, r"persistent: median [\d.]+ms")
+        # The test database is SQLite, which has no pool.
+        self.assertIn("pool: skipped", report)
+
+
+class PurgeSessionsTest(TestCase):
+    def test_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for n in range(5):
+            Session.objects.create(
+                session_key=f"expired{n}",
+                session_data="",
+                expire_date=now - datetime.timedelta(days=1),
+            )
+        Session.objects.create(
+            session_key="live",
+            session_data="",
+            expire_date=now + datetime.timedelta(days=1),
+        )
+        out = StringIO()
+
+        with CaptureQueriesContext(connection) as ctx:
+            call_command("purge_sessions", "--batch-size", "2", stdout=out)
+
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)),
+            ["live"],
+        )
+        self.assertIn("Deleted 5 expired session(s).", out.getvalue())
+        deletes = [q for q in ctx if q["sql"].startswith("DELETE")]
+        self.assertEqual(len(deletes), 3)
+
+
+@override_settings(ARCHIVE_AFTER_DAYS=365)
+class ArchiveDataTest(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_superuser(
+            username="owner", email="owner@example.com", password="test"
+        )
+        member = self.member = User.objects.create_user(
+            username="member", password="x"
+        )
+        old = timezone.now() - datetime.timedelta(days=400)
+        self.old_session = WorkoutSession.objects.create(
+            client=member, notes="Felt strong. " * 20
+        )
+        self.new_session = WorkoutSession.objects.create(
+            client=member, notes="Recent notes"
+        )
+        ticket = SupportTicket.objects.create(
+            client=member,
+            subject="Help",
+            status=SupportTicket.STATUS_CLOSED,
+        )
+        self.message = SupportMessage.objects.create(
+            ticket=ticket, sender=member, body="Old question"
+        )
+        self.old_query = self._query("Old", ContactQuery.STATUS_CLOSED)
+        self.open_query = self._query("Open", ContactQuery.STATUS_NEW)
+        WorkoutSession.objects.filter(pk=self.old_session.pk).update(
+            created_at=old
+        )
+        SupportMessage.objects.update(created_at=old)
+        ContactQuery.objects.update(updated_at=old)
+
+    def _query(self, name, status):
+        return ContactQuery.objects.create(
+            first_name=name,
+            last_name="Lead",
+            email=f"{name.lower()}@example.com",
+            coaching_option="online",
+            message=f"{name} message",
+            preferred_contact_method="email",
+            status=status,
+        )
+
+    def test_archives_old_rows_in_batches(self):
+        out = StringIO()
+        call_command("archive_data", "--batch-size", "1", stdout=out)
+
+        self.old_session.refresh_from_db()
+        self.new_session.refresh_from_db()
+        self.message.refresh_from_db()
+        self.assertEqual(self.old_session.notes, "")
+        self.assertEqual(self.new_session.notes, "Recent notes")
+        self.assertEqual(self.message.body, "")
+        self.assertEqual(
+            list(ContactQuery.objects.values_list("pk", flat=True)),
+            [self.open_query.pk],
+        )
+        self.assertEqual(ArchivedRecord.objects.count(), 3)
+        self.assertIn("session_notes: archived 1 row(s)", out.getvalue())
+        self.assertIn("reclaimed", out.getvalue())
+        self.assertIn("training_workoutsession:", out.getvalue())
+
+        # A second run has nothing left to move.
+        out = StringIO()
+        call_command("archive_data", stdout=out)
+        self.assertIn("contact_queries: archived 0 row(s)", out.getvalue())
+
+    def test_reads_through_the_archive(self):
+        call_command("archive_data", stdout=StringIO())
+
+        session, recent = with_archived_text(
+            WorkoutSession.objects.order_by("pk")
+        )
+        self.assertEqual(session.notes, "Felt strong. " * 20)
+        self.assertEqual(recent.notes, "Recent notes")
+
+        self.client.force_login(self.owner)
+        url = reverse("accounts:owner_query_detail", args=[self.old_query.pk])
+        self.assertContains(self.client.get(url), "Old message")
+
+        # Saving an archived row moves it back into the hot table.
+        query = archived_instance(ContactQuery, self.old_query.pk)
+        query.status = ContactQuery.STATUS_IN_PROGRESS
+        query.save()
+        self.assertEqual(
+            ContactQuery.objects.get(pk=self.old_query.pk).message,
+            "Old message",
+        )
+        self.assertFalse(
+            ArchivedRecord.objects.filter(
+                object_id=self.old_query.pk, model="training.contactquery"
+            ).exists()
+        )
+
+    def test_client_edits_keep_archived_notes(self):
+        call_command("archive_data", stdout=StringIO())
+        self.client.force_login(self.member)
+
+        response = self.client.post(
+            reverse(
+                "accounts:client_workout_api_update",
+                args=[self.old_session.pk],
+            ),
+            {"status": "skipped"},
+            content_type="application/json",
+        )
+
+        notes = "Felt strong. " * 20
+        self.assertEqual(response.json()["session"]["notes"], notes)
+        self.old_session.refresh_from_db()
+        self.assertEqual(self.old_session.notes, notes)
+        self.assertFalse(
+            ArchivedRecord.objects.filter(
+                object_id=self.old_session.pk, model="training.workoutsession"
+            ).exists()
+        )
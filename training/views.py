@@ -2,10 +2,19 @@
 from django.shortcuts import redirect, render
 
 from .forms import ConsultationRequestForm, ContactQueryForm
+from .models import IntakeSubmission
+from .services.lead_intake import submit_lead
+from .services.rate_limit import intake_allowed
 
 
 # Create views here.
 
+RATE_LIMITED_MESSAGE = (
+    "We've received several messages from you in a short time. "
+    "Please try again a little later."
+)
+
+
 def consultation(request):
     """
     Handles the 'Book a consultation' page.
@@ -13,18 +22,39 @@ def consultation(request):
     - GET  -> show an empty form
     - POST -> validate and save the consultation request
     """
+    success_message = (
+        "Thank you - your consultation request has been received. "
+        "A coach will get back to you shortly."
+    )
 
     if request.method == "POST":
         form = ConsultationRequestForm(request.POST)
 
-        if form.is_valid():
-            form.save()  # creates a ConsultationRequest in the DB
+        if form.is_probably_spam():
+            # Look successful so bots get no signal; nothing is stored.
+            messages.success(request, success_message)
+            return redirect("consultation_request")
 
-            messages.success(
+        if form.is_valid():
+            if not intake_allowed(
                 request,
-                "Thank you - your consultation request has been received. "
-                "A coach will get back to you shortly.",
-            )
+                form.cleaned_data.get("email"),
+                scope="consultation",
+            ):
+                messages.error(request, RATE_LIMITED_MESSAGE)
+                return render(
+                    request,
+                    "training/consultation.html",
+                    {"form": form},
+                    status=429,
+                )
+
+            # Creates a ConsultationRequest, or merges a repeat submission
+            # into the person's untriaged request. Queued instead when
+            # deferred intake writes are switched on.
+            submit_lead(form, IntakeSubmission.KIND_CONSULTATION)
+
+            messages.success(request, success_message)
 
             # PRG pattern to avoid form re-submissions.
             return redirect("consultation_request")
@@ -51,19 +81,37 @@ def contact_us(request):
     - GET  -> empty ContactQueryForm
     - POST -> validate and save, then redirect (PRG)
     """
+    success_message = (
+        "Thanks - your message has been sent. A coach will get "
+        "back to you shortly."
+    )
+
     if request.method == "POST":
         form = ContactQueryForm(request.POST)
-        if form.is_valid():
-            # Store the contact so owners/trainers can follow up later.
-            form.save()
+        if form.is_probably_spam():
+            # Look successful so bots get no signal; nothing is stored.
+            messages.success(request, success_message)
+            return redirect("contact_us")
 
-            messages.success(
+        if form.is_valid():
+            if not intake_allowed(
                 request,
-                (
-                    "Thanks - your message has been sent. A coach will get "
-                    "back to you shortly."
-                ),
-            )
+                form.cleaned_data.get("email"),
+                scope="contact",
+            ):
+                messages.error(request, RATE_LIMITED_MESSAGE)
+                return render(
+                    request,
+                    "training/contact.html",
+                    {"form": form},
+                    status=429,
+                )
+
+            # Store the contact so owners/trainers can follow up later;
+            # repeat messages are appended to the open query.
+            submit_lead(form, IntakeSubmission.KIND_CONTACT)
+
+            messages.success(request, success_message)
             return redirect("contact_us")
         messages.error(
             request,